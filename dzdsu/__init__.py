@@ -1,11 +1,20 @@
-"""DayZ dedicated server utilities."""
+"""DayZ dedicated server utilities.
 
-from dzdsu.constants import JSON_FILE
-from dzdsu.mission import Mission
-from dzdsu.mods import Mod, InstalledMod, mods_str, print_mods
-from dzdsu.params import ServerParams
-from dzdsu.server import Server, load_servers
-from dzdsu.update import Updater
+Exported names and submodules are imported lazily on first access,
+to keep the startup of the command line tools fast.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from dzdsu.constants import JSON_FILE
+    from dzdsu.mission import Mission
+    from dzdsu.mods import Mod, InstalledMod, mods_str, print_mods
+    from dzdsu.params import ServerParams
+    from dzdsu.registry import ServerRegistry, load_servers
+    from dzdsu.server import Server
+    from dzdsu.update import Updater
 
 
 __all__ = [
@@ -15,8 +24,44 @@ __all__ = [
     "Mod",
     "Server",
     "ServerParams",
+    "ServerRegistry",
     "Updater",
     "load_servers",
     "mods_str",
     "print_mods",
 ]
+
+
+_EXPORTS = {
+    "JSON_FILE": "dzdsu.constants",
+    "InstalledMod": "dzdsu.mods",
+    "Mission": "dzdsu.mission",
+    "Mod": "dzdsu.mods",
+    "Server": "dzdsu.server",
+    "ServerParams": "dzdsu.params",
+    "ServerRegistry": "dzdsu.registry",
+    "Updater": "dzdsu.update",
+    "load_servers": "dzdsu.registry",
+    "mods_str": "dzdsu.mods",
+    "print_mods": "dzdsu.mods",
+}
+
+
+def __getattr__(name: str):
+    """Lazily imports exported names and submodules."""
+
+    if (module := _EXPORTS.get(name)) is not None:
+        value = globals()[name] = getattr(import_module(module), name)
+        return value
+
+    try:
+        return import_module(f"{__name__}.{name}")
+    except ModuleNotFoundError as error:
+        if error.name != f"{__name__}.{name}":
+            raise
+
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,108 @@
+"""Steam A2S_INFO server queries."""
+
+from __future__ import annotations
+from asyncio import DatagramProtocol, DatagramTransport, Future
+from asyncio import get_running_loop, wait_for
+from asyncio import TimeoutError as AsyncTimeoutError
+from typing import NamedTuple
+
+
+__all__ = ["ServerInfo", "query_info"]
+
+
+PREFIX = b"\xff\xff\xff\xff"
+A2S_INFO = PREFIX + b"TSource Engine Query\x00"
+S2A_INFO = 0x49
+S2C_CHALLENGE = 0x41
+
+
+class ServerInfo(NamedTuple):
+    """Information returned by an A2S_INFO query."""
+
+    protocol: int
+    name: str
+    map: str
+    folder: str
+    game: str
+    app_id: int
+    players: int
+    max_players: int
+    bots: int
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> ServerInfo:
+        """Parses the payload of an S2A_INFO response."""
+        protocol, offset = payload[0], 1
+        strings = []
+
+        for _ in range(4):
+            end = payload.index(b"\x00", offset)
+            strings.append(payload[offset:end].decode("utf-8", errors="replace"))
+            offset = end + 1
+
+        return cls(
+            protocol,
+            *strings,
+            int.from_bytes(payload[offset : offset + 2], "little"),
+            *payload[offset + 2 : offset + 5],
+        )
+
+    def to_bytes(self) -> bytes:
+        """Returns the S2A_INFO payload."""
+        return b"".join(
+            (
+                bytes((self.protocol,)),
+                *(
+                    string.encode("utf-8") + b"\x00"
+                    for string in (self.name, self.map, self.folder, self.game)
+                ),
+                (self.app_id & 0xFFFF).to_bytes(2, "little"),
+                bytes((self.players, self.max_players, self.bots)),
+                b"dlv\x00",
+            )
+        )
+
+
+class _Query(DatagramProtocol):
+    """A single A2S_INFO query, answering a challenge if requested."""
+
+    def __init__(self, future: Future):
+        self.future = future
+        self.transport: DatagramTransport | None = None
+
+    def connection_made(self, transport: DatagramTransport) -> None:
+        self.transport = transport
+        transport.sendto(A2S_INFO)
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        if self.future.done() or len(data) < 5 or data[:4] != PREFIX:
+            return
+
+        if data[4] == S2C_CHALLENGE:
+            self.transport.sendto(A2S_INFO + data[5:9])
+        elif data[4] == S2A_INFO:
+            try:
+                self.future.set_result(ServerInfo.from_bytes(data[5:]))
+            except (ValueError, IndexError, TypeError) as error:
+                self.future.set_exception(ValueError(f"Invalid response: {error}"))
+
+    def error_received(self, exc: Exception) -> None:
+        if not self.future.done():
+            self.future.set_exception(exc)
+
+
+async def query_info(host: str, port: int, timeout: float = 0.5) -> ServerInfo:
+    """Queries the server information."""
+
+    loop = get_running_loop()
+    future = loop.create_future()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: _Query(future), remote_addr=(host, port)
+    )
+
+    try:
+        return await wait_for(future, timeout)
+    except AsyncTimeoutError:
+        raise TimeoutError(f"No A2S response from {host}:{port}.") from None
+    finally:
+        transport.close()
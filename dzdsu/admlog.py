@@ -0,0 +1,376 @@
+"""Incremental index of admin logs."""
+
+from __future__ import annotations
+from datetime import date, datetime, time, timedelta
+from logging import getLogger
+from pathlib import Path
+from re import compile
+from typing import Iterator, NamedTuple, Optional
+
+
+__all__ = ["AdmEvent", "AdmIndex", "Session", "parse_adm_line"]
+
+
+LOGGER = getLogger("dzdsu")
+HEADER = compile(r"AdminLog started on (\d{4}-\d{2}-\d{2}) at (\d{1,2}:\d{2}:\d{2})")
+LINE = compile(r"(\d{1,2}):(\d{2}):(\d{2}) \| (.*)")
+PLAYER = compile(r'Player "(?P<name>[^"]*)"[^("]*(?:\(DEAD\)\s*)?\(id=(?P<guid>[^ )]*)')
+BATCH_SIZE = 10000
+KINDS = (
+    ("is connected", "connect"),
+    ("has been disconnected", "disconnect"),
+    ("killed by Player", "kill"),
+    ("hit by Player", "hit"),
+    ("committed suicide", "suicide"),
+    ("died.", "death"),
+)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    day TEXT,
+    last INTEGER
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    guid TEXT NOT NULL,
+    name TEXT NOT NULL,
+    connected INTEGER NOT NULL,
+    disconnected INTEGER
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    time INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    guid TEXT NOT NULL,
+    name TEXT NOT NULL,
+    other_guid TEXT,
+    other_name TEXT,
+    detail TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_guid ON sessions (guid, connected);
+CREATE INDEX IF NOT EXISTS sessions_name ON sessions (name COLLATE NOCASE, connected);
+CREATE INDEX IF NOT EXISTS sessions_open ON sessions (disconnected)
+    WHERE disconnected IS NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS events_unique
+    ON events (time, kind, guid, detail);
+CREATE INDEX IF NOT EXISTS events_time ON events (time);
+CREATE INDEX IF NOT EXISTS events_guid ON events (guid, time);
+CREATE INDEX IF NOT EXISTS events_name ON events (name COLLATE NOCASE, time);
+CREATE INDEX IF NOT EXISTS events_other_guid ON events (other_guid, time);
+CREATE INDEX IF NOT EXISTS events_other_name
+    ON events (other_name COLLATE NOCASE, time);
+"""
+
+
+class AdmEvent(NamedTuple):
+    """A player event from an admin log."""
+
+    time: datetime
+    kind: str
+    guid: str
+    name: str
+    other_guid: Optional[str]
+    other_name: Optional[str]
+    detail: str
+
+    def __str__(self) -> str:
+        return f"{self.time:%Y-%m-%d %H:%M:%S} {self.kind:<10} {self.detail}"
+
+    @classmethod
+    def from_row(cls, row: tuple) -> AdmEvent:
+        """Creates an event from a database row."""
+        return cls(datetime.fromtimestamp(row[0]), *row[1:])
+
+    def to_row(self) -> tuple:
+        """Returns a database row."""
+        return (int(self.time.timestamp()), *self[1:])
+
+
+class Session(NamedTuple):
+    """A player session."""
+
+    guid: str
+    name: str
+    connected: datetime
+    disconnected: Optional[datetime]
+
+    def __str__(self) -> str:
+        end = "online" if self.disconnected is None else f"{self.disconnected:%H:%M:%S}"
+        return f"{self.connected:%Y-%m-%d %H:%M:%S} - {end}  {self.name} ({self.guid})"
+
+    @classmethod
+    def from_row(cls, row: tuple) -> Session:
+        """Creates a session from a database row."""
+        guid, name, connected, disconnected = row
+        return cls(
+            guid,
+            name,
+            datetime.fromtimestamp(connected),
+            None if disconnected is None else datetime.fromtimestamp(disconnected),
+        )
+
+
+def parse_adm_line(line: str, day: date) -> AdmEvent | None:
+    """Parses a player event from an admin log line."""
+
+    if (match := LINE.match(line)) is None:
+        return None
+
+    *clock, text = match.groups()
+
+    if not (players := list(PLAYER.finditer(text))):
+        return None
+
+    for marker, kind in KINDS:
+        if marker in text:
+            break
+    else:
+        return None
+
+    subject, other = players[0], players[1] if len(players) > 1 else None
+    return AdmEvent(
+        datetime.combine(day, time(*map(int, clock))),
+        kind,
+        subject["guid"].rstrip("="),
+        subject["name"],
+        None if other is None else other["guid"].rstrip("="),
+        None if other is None else other["name"],
+        text,
+    )
+
+
+class AdmIndex:
+    """SQLite index of player sessions and events from admin logs.
+
+    Each log file is parsed from the byte offset at which indexing last
+    stopped, so that only appended lines are processed. Truncated or
+    replaced logs are parsed again, skipping already indexed events.
+    """
+
+    def __init__(self, database: Path):
+        from sqlite3 import connect
+
+        self.connection = connect(database)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.connection.close()
+
+    def update(self, directory: Path) -> int:
+        """Indexes new lines of all admin logs in the directory.
+
+        Returns the amount of indexed events.
+        """
+        files = sorted(directory.glob("*.ADM"), key=lambda file: file.stat().st_mtime)
+        return sum(self.update_file(file) for file in files)
+
+    def update_file(self, file: Path) -> int:
+        """Indexes new lines of the given admin log."""
+        stat = file.stat()
+        row = self.connection.execute(
+            "SELECT inode, offset, day, last FROM files WHERE path = ?", (str(file),)
+        ).fetchone()
+
+        if row is None or row[0] != stat.st_ino or row[1] > stat.st_size:
+            offset, day, last = 0, None, None
+        else:
+            _, offset, day, last = row
+            day = None if day is None else date.fromisoformat(day)
+
+            if offset == stat.st_size:
+                return 0
+
+        events: list[AdmEvent | datetime] = []
+        count = 0
+
+        with file.open("rb") as log:
+            log.seek(offset)
+
+            for raw in log:
+                if not raw.endswith(b"\n"):
+                    break
+
+                offset += len(raw)
+                line = raw.decode("utf-8", errors="replace").strip()
+
+                if (header := HEADER.search(line)) is not None:
+                    day = date.fromisoformat(header[1])
+                    started = datetime.combine(day, _clock(header[2]))
+                    last = int(started.timestamp())
+                    events.append(started)
+                    continue
+
+                if day is None or (event := parse_adm_line(line, day)) is None:
+                    continue
+
+                # Admin logs only contain times of day.
+                if last is not None and event.time.timestamp() < last - 43200:
+                    day += timedelta(days=1)
+                    event = event._replace(time=event.time + timedelta(days=1))
+
+                last = int(event.time.timestamp())
+                events.append(event)
+
+                if len(events) >= BATCH_SIZE:
+                    count += self._commit(
+                        events, (file, stat.st_ino, offset, day, last)
+                    )
+                    events.clear()
+
+        count += self._commit(events, (file, stat.st_ino, offset, day, last))
+        LOGGER.debug("Indexed %i events from %s.", count, file)
+        return count
+
+    def follow(self, directory: Path, interval: float = 5.0) -> Iterator[int]:
+        """Indexes the admin logs as they grow."""
+        from time import sleep
+
+        while True:
+            yield self.update(directory)
+            sleep(interval)
+
+    def sessions(
+        self,
+        player: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> Iterator[Session]:
+        """Yields sessions of the player, matched by GUID or name."""
+        query, params = _filter(
+            "SELECT guid, name, connected, disconnected FROM sessions",
+            player,
+            since,
+            until,
+            "connected",
+        )
+
+        for row in self.connection.execute(query + " ORDER BY connected", params):
+            yield Session.from_row(row)
+
+    def events(
+        self,
+        player: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> Iterator[AdmEvent]:
+        """Yields events involving the player, matched by GUID or name."""
+        query, params = _filter(
+            "SELECT time, kind, guid, name, other_guid, other_name, detail FROM events",
+            player,
+            since,
+            until,
+            "time",
+            other=True,
+        )
+
+        for row in self.connection.execute(query + " ORDER BY time", params):
+            yield AdmEvent.from_row(row)
+
+    def _commit(self, events: list[AdmEvent | datetime], position: tuple) -> int:
+        """Stores the events and the file position in one transaction.
+
+        Returns the amount of stored events.
+        """
+        file, inode, offset, day, last = position
+        count = 0
+
+        with self.connection:
+            for event in events:
+                if isinstance(event, datetime):
+                    self._close_sessions(event)
+                else:
+                    count += self._apply(event)
+
+            self.connection.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                (str(file), inode, offset, day and day.isoformat(), last),
+            )
+
+        return count
+
+    def _apply(self, event: AdmEvent) -> bool:
+        """Stores the event and updates the player's sessions.
+
+        Returns False if the event has already been stored.
+        """
+        if not self.connection.execute(
+            "INSERT OR IGNORE INTO events (time, kind, guid, name, other_guid, "
+            "other_name, detail) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            event.to_row(),
+        ).rowcount:
+            return False
+
+        timestamp = int(event.time.timestamp())
+
+        if event.kind == "connect":
+            self.connection.execute(
+                "INSERT INTO sessions (guid, name, connected) VALUES (?, ?, ?)",
+                (event.guid, event.name, timestamp),
+            )
+        elif event.kind == "disconnect":
+            self.connection.execute(
+                "UPDATE sessions SET disconnected = ? WHERE id = ("
+                "SELECT MAX(id) FROM sessions "
+                "WHERE guid = ? AND disconnected IS NULL)",
+                (timestamp, event.guid),
+            )
+
+        return True
+
+    def _close_sessions(self, timestamp: datetime) -> None:
+        """Closes all sessions opened before the server restarted."""
+        self.connection.execute(
+            "UPDATE sessions SET disconnected = ?1 "
+            "WHERE disconnected IS NULL AND connected < ?1",
+            (int(timestamp.timestamp()),),
+        )
+
+
+def _clock(text: str) -> time:
+    """Parses a time of day."""
+
+    return time(*map(int, text.split(":")))
+
+
+def _filter(
+    query: str,
+    player: str | None,
+    since: datetime | None,
+    until: datetime | None,
+    column: str,
+    *,
+    other: bool = False,
+) -> tuple[str, list]:
+    """Adds WHERE clauses for the player and time range to the query."""
+
+    clauses, params = [], []
+
+    if player is not None:
+        # GUIDs are stored without their base64 padding.
+        columns = ["guid = ?", "name = ? COLLATE NOCASE"]
+        values = [player.rstrip("="), player]
+
+        if other:
+            columns += ["other_guid = ?", "other_name = ? COLLATE NOCASE"]
+            values *= 2
+
+        clauses.append(f"({' OR '.join(columns)})")
+        params.extend(values)
+
+    if since is not None:
+        clauses.append(f"{column} >= ?")
+        params.append(int(since.timestamp()))
+
+    if until is not None:
+        clauses.append(f"{column} < ?")
+        params.append(int(until.timestamp()))
+
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+
+    return query, params
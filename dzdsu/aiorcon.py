@@ -0,0 +1,323 @@
+"""Asynchronous BattlEye RCon client."""
+
+from __future__ import annotations
+from asyncio import DatagramProtocol, DatagramTransport, Future, Semaphore
+from asyncio import Task, gather, get_running_loop, shield, sleep, wait_for
+from asyncio import TimeoutError as AsyncTimeoutError
+from logging import getLogger
+from re import compile
+from typing import Callable, Iterator
+
+from rcon.battleye.proto import HEADER_SIZE
+from rcon.battleye.proto import CommandRequest
+from rcon.battleye.proto import Header
+from rcon.battleye.proto import LoginRequest
+from rcon.battleye.proto import ServerMessageAck
+from rcon.exceptions import WrongPassword
+
+
+__all__ = ["RCON_ERRORS", "AsyncClient", "countdown_schedule"]
+
+
+LOGGER = getLogger("dzdsu.rcon")
+RCON_ERRORS = (OSError, TimeoutError, ValueError, WrongPassword)
+MAX_SEQ = 256
+PLAYERS_TOTAL = compile(r"\((\d+) players in total\)")
+
+MessageHandler = Callable[[str], None]
+
+
+def log_message(message: str) -> None:
+    """Default handler, logging the server message."""
+
+    LOGGER.debug("Server message: %s", message)
+
+
+def countdown_schedule(
+    countdown: int, *, every: int = 10, always_below: int = 30
+) -> Iterator[int]:
+    """Yields the remaining seconds at which to announce a countdown."""
+
+    for passed in range(countdown):
+        remaining = countdown - passed
+
+        if passed == 0 or remaining % every == 0 or remaining < always_below:
+            yield remaining
+
+
+class _Command:
+    """A pending command awaiting its possibly fragmented response."""
+
+    def __init__(self, future: Future):
+        self.future = future
+        self.fragments: dict[int, bytes] = {}
+        self.total: int | None = None
+
+    def feed(self, payload: bytes) -> None:
+        """Feeds a response payload (without sequence number)."""
+        if self.future.done():
+            return
+
+        if len(payload) >= 3 and payload[0] == 0x00:
+            self.total = payload[1]
+            self.fragments[payload[2]] = payload[3:]
+        else:
+            self.total = 1
+            self.fragments[0] = payload
+
+        if len(self.fragments) >= self.total:
+            self.future.set_result(
+                b"".join(self.fragments[index] for index in sorted(self.fragments))
+            )
+
+
+class _Protocol(DatagramProtocol):
+    """Datagram protocol forwarding packets to the client."""
+
+    def __init__(self, client: AsyncClient):
+        self.client = client
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.client.datagram_received(data)
+
+    def error_received(self, exc: Exception) -> None:
+        self.client.connection_failed(exc)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        if exc is not None:
+            self.client.connection_failed(exc)
+
+
+class AsyncClient:
+    """BattlEye RCon client multiplexing commands over one UDP session."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        passwd: str | None = None,
+        timeout: float | None = 1.0,
+        retries: int = 2,
+        keepalive: float = 30.0,
+        message_handler: MessageHandler = log_message,
+    ):
+        self.host = host
+        self.port = port
+        self.passwd = passwd
+        self.timeout = timeout
+        self.retries = retries
+        self.keepalive = keepalive
+        self.message_handler = message_handler
+        self._transport: DatagramTransport | None = None
+        self._login: Future | None = None
+        self._commands: dict[int, _Command] = {}
+        self._slots = Semaphore(MAX_SEQ)
+        self._seq = 0
+        self._last_sent = 0.0
+        self._keepalive_task: Task | None = None
+
+    async def __aenter__(self) -> AsyncClient:
+        await self.connect(login=True)
+        return self
+
+    async def __aexit__(self, typ, value, traceback) -> None:
+        self.close()
+
+    @property
+    def connected(self) -> bool:
+        """Determines whether the UDP session is open."""
+        return self._transport is not None and not self._transport.is_closing()
+
+    async def connect(self, login: bool = False) -> None:
+        """Opens the UDP session and attempts a login if requested."""
+        self._transport, _ = await get_running_loop().create_datagram_endpoint(
+            lambda: _Protocol(self), remote_addr=(self.host, self.port)
+        )
+
+        if login and self.passwd is not None:
+            await self.login(self.passwd)
+
+        if self.keepalive:
+            self._keepalive_task = get_running_loop().create_task(self._keep_alive())
+
+    def close(self) -> None:
+        """Closes the UDP session."""
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+        self.connection_failed(ConnectionResetError("Session closed."))
+
+    def send(self, packet: bytes) -> None:
+        """Sends a raw packet."""
+        if not self.connected:
+            raise ConnectionResetError("Not connected.")
+
+        self._transport.sendto(packet)
+        self._last_sent = get_running_loop().time()
+
+    def datagram_received(self, data: bytes) -> None:
+        """Dispatches a received packet."""
+        try:
+            header = Header.from_bytes(data[:HEADER_SIZE])
+        except ValueError as error:
+            LOGGER.debug("Discarding invalid packet: %s", error)
+            return
+
+        payload = data[HEADER_SIZE:]
+
+        if header.type == 0x00 and self._login is not None:
+            if not self._login.done():
+                self._login.set_result(payload[:1] == b"\x01")
+        elif header.type == 0x01 and payload:
+            if (command := self._commands.get(payload[0])) is not None:
+                command.feed(payload[1:])
+        elif header.type == 0x02 and payload:
+            try:
+                self.send(bytes(ServerMessageAck(payload[0])))
+            except OSError as error:
+                LOGGER.debug("Cannot acknowledge server message: %s", error)
+
+            self.message_handler(payload[1:].decode("ascii", errors="replace"))
+
+    def connection_failed(self, exc: Exception) -> None:
+        """Fails all pending requests with the given exception."""
+        futures = [command.future for command in self._commands.values()]
+
+        if self._login is not None:
+            futures.append(self._login)
+
+        for future in futures:
+            if not future.done():
+                future.set_exception(exc)
+
+    async def login(self, passwd: str) -> bool:
+        """Logs in the user."""
+        self._login = get_running_loop().create_future()
+        packet = bytes(LoginRequest(passwd))
+
+        try:
+            if not await self._transact(self._login, packet):
+                raise WrongPassword()
+        finally:
+            self._login = None
+
+        return True
+
+    async def run(self, command: str, *args: str) -> str:
+        """Executes a command and returns the text message."""
+        async with self._slots:
+            seq = self._next_seq()
+            self._commands[seq] = pending = _Command(get_running_loop().create_future())
+            packet = bytes(
+                CommandRequest.from_command(command, *args)._replace(seq=seq)
+            )
+
+            try:
+                response = await self._transact(pending.future, packet)
+            finally:
+                del self._commands[seq]
+
+        return response.decode("ascii", errors="replace")
+
+    async def broadcast(self, message: str) -> str:
+        """Broadcasts a message to all players."""
+        return await self.say(-1, message)
+
+    async def countdown(
+        self,
+        template: str,
+        countdown: int,
+        *,
+        every: int = 10,
+        always_below: int = 30,
+        tick: float = 1.0,
+    ) -> None:
+        """Notify users about shutdown."""
+        loop = get_running_loop()
+        start = loop.time()
+
+        for remaining in countdown_schedule(
+            countdown, every=every, always_below=always_below
+        ):
+            await sleep(start + (countdown - remaining) * tick - loop.time())
+            await self.broadcast(template.format(remaining))
+
+        await sleep(start + countdown * tick - loop.time())
+
+    async def kick(self, player: int | str, reason: str | None = None) -> str:
+        """Kicks the respective player."""
+        if reason is None:
+            return await self.run(f"kick {player}")
+
+        return await self.run(f"kick {player} {reason}")
+
+    async def kick_all(self, max_players: int, reason: str | None = None) -> None:
+        """Kicks all player slots concurrently.
+
+        Waits for all kicks and raises the first error, if any.
+        """
+        for result in await gather(
+            *(self.kick(player, reason) for player in range(max_players)),
+            return_exceptions=True,
+        ):
+            if isinstance(result, BaseException):
+                raise result
+
+    async def players(self) -> int:
+        """Returns the amount of connected players."""
+        response = await self.run("players")
+
+        if (match := PLAYERS_TOTAL.search(response)) is None:
+            raise ValueError(f"Unexpected player list: {response!r}")
+
+        return int(match[1])
+
+    async def say(self, player: int | str, message: str) -> str:
+        """Say something to a player."""
+        return await self.run(f"say {player} {message}")
+
+    async def shutdown(self) -> str:
+        """Shutdown the server."""
+        return await self.run("#shutdown")
+
+    def _next_seq(self) -> int:
+        """Returns the next free sequence number."""
+        while self._seq in self._commands:
+            self._seq = (self._seq + 1) % MAX_SEQ
+
+        seq, self._seq = self._seq, (self._seq + 1) % MAX_SEQ
+        return seq
+
+    async def _transact(self, future: Future, packet: bytes):
+        """Sends a packet and awaits the future, resending on timeouts."""
+        for attempt in range(self.retries + 1):
+            self.send(packet)
+
+            try:
+                return await wait_for(shield(future), self.timeout)
+            except AsyncTimeoutError:
+                LOGGER.debug("Timeout on attempt %i.", attempt + 1)
+
+        future.cancel()
+        raise TimeoutError(f"No response from {self.host}:{self.port}.")
+
+    async def _keep_alive(self) -> None:
+        """Sends empty commands to keep the session alive."""
+        loop = get_running_loop()
+
+        while self.connected:
+            if (delay := self._last_sent + self.keepalive - loop.time()) > 0:
+                await sleep(delay)
+                continue
+
+            try:
+                await self.run("")
+            except (ConnectionError, TimeoutError) as error:
+                LOGGER.warning("Keepalive failed: %s", error)
+                return
@@ -0,0 +1,99 @@
+"""BattlEye RCon configuration."""
+
+from __future__ import annotations
+from os import scandir
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+from dzdsu.constants import BATTLEYE_GLOB
+from dzdsu.parsers import parse_battleye_cfg
+
+
+__all__ = ["BattlEyeConfig", "load_battleye_cfg", "resolve_battleye_cfg"]
+
+
+_CONFIGS: dict[Path, tuple[tuple[int, int], BattlEyeConfig]] = {}
+_FILES: dict[Path, tuple[int, dict[str, tuple[int, int]], Path]] = {}
+
+
+class BattlEyeConfig(NamedTuple):
+    """BattlEye RCon settings."""
+
+    password: str
+    port: int = 2302
+    ip: str = "127.0.0.1"
+    restrict_rcon: bool = False
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> BattlEyeConfig:
+        """Creates a BattlEye config from the lines of a config file."""
+        config = dict(parse_battleye_cfg(lines))
+        return cls(
+            config["RConPassword"],
+            config.get("RConPort", 2302),
+            config.get("RConIP", "127.0.0.1"),
+            config.get("RestrictRCon", False),
+        )
+
+
+def load_battleye_cfg(file: Path) -> BattlEyeConfig:
+    """Loads a BattlEye config, cached by the file's modification time and size."""
+
+    key = _key(file)
+
+    if (cached := _CONFIGS.get(file)) is not None and cached[0] == key:
+        return cached[1]
+
+    with file.open("r", encoding="utf-8") as lines:
+        config = BattlEyeConfig.from_lines(lines)
+
+    _CONFIGS[file] = (key, config)
+    return config
+
+
+def resolve_battleye_cfg(directory: Path) -> Path:
+    """Returns the current BattlEye config file in the given directory.
+
+    While the server is running, BattlEye renames its config to
+    beserver_x64_active_<random>.cfg and may leave stale copies behind.
+    The newest active file is preferred, falling back to the newest
+    inactive one. The result is cached until the directory or one of
+    the candidate files changes.
+    """
+
+    mtime = directory.stat().st_mtime_ns
+
+    if (
+        (cached := _FILES.get(directory)) is not None
+        and cached[0] == mtime
+        and all(_key(directory / name) == key for name, key in cached[1].items())
+    ):
+        return cached[2]
+
+    candidates = {}
+
+    with scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and Path(entry.name).match(BATTLEYE_GLOB):
+                stat = entry.stat()
+                candidates[entry.name] = (stat.st_mtime_ns, stat.st_size)
+
+    if not candidates:
+        raise FileNotFoundError(directory / BATTLEYE_GLOB)
+
+    file = directory / max(
+        candidates, key=lambda name: ("_active_" in name, candidates[name][0], name)
+    )
+    _FILES[directory] = (mtime, candidates, file)
+    return file
+
+
+def _key(file: Path) -> tuple[int, int]:
+    """Returns the modification time and size of the file for caching."""
+
+    try:
+        stat = file.stat()
+    except FileNotFoundError:
+        return (0, -1)
+
+    return (stat.st_mtime_ns, stat.st_size)
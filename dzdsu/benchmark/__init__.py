@@ -0,0 +1,182 @@
+"""Benchmarks of the server utilities."""
+
+from argparse import ArgumentParser, Namespace
+from logging import DEBUG, INFO, WARNING, basicConfig, getLogger
+from pathlib import Path
+
+from dzdsu.benchmark.rcon import benchmark_rcon
+from dzdsu.benchmark.result import Result, compare, dump_results, load_results
+from dzdsu.benchmark.startup import IMPORT_BUDGET, benchmark_startup, over_budget
+from dzdsu.benchmark.tree import TreeSpec, benchmark_tree
+from dzdsu.emulator import NetworkConditions
+
+
+__all__ = [
+    "main",
+    "Result",
+    "TreeSpec",
+    "benchmark_rcon",
+    "benchmark_startup",
+    "benchmark_tree",
+    "compare",
+]
+
+
+DEFAULT_SPEC = TreeSpec()
+SUITES = ("rcon", "startup", "tree")
+
+
+LOGGER = getLogger("dzdsb")
+
+
+def get_args(description: str = __doc__) -> Namespace:
+    """Return the parsed command line arguments."""
+
+    parser = ArgumentParser(description=description)
+    parser.add_argument(
+        "-s",
+        "--suite",
+        action="append",
+        choices=SUITES,
+        help="benchmark suite to run, may be repeated (default: all)",
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, metavar="file", help="write results to file"
+    )
+    parser.add_argument(
+        "-b",
+        "--baseline",
+        type=Path,
+        metavar="file",
+        help="compare results to a saved baseline",
+    )
+    parser.add_argument(
+        "-t",
+        "--tolerance",
+        type=float,
+        default=0.25,
+        metavar="ratio",
+        help="allowed timing regression relative to the baseline",
+    )
+    parser.add_argument(
+        "-r", "--rounds", type=int, default=5, metavar="n", help="rounds per benchmark"
+    )
+    parser.add_argument(
+        "-p",
+        "--players",
+        type=int,
+        default=30,
+        metavar="n",
+        help="simulated players",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        metavar="seconds",
+        help="simulated network latency",
+    )
+    parser.add_argument(
+        "--loss",
+        type=float,
+        default=0.0,
+        metavar="ratio",
+        help="simulated packet loss",
+    )
+    parser.add_argument(
+        "--mods",
+        type=int,
+        default=DEFAULT_SPEC.mods,
+        metavar="n",
+        help="mods of the synthetic server tree",
+    )
+    parser.add_argument(
+        "--pbos",
+        type=int,
+        default=DEFAULT_SPEC.pbos,
+        metavar="n",
+        help="PBOs per mod",
+    )
+    parser.add_argument(
+        "--pbo-size",
+        type=int,
+        default=DEFAULT_SPEC.pbo_size // 1024,
+        metavar="KiB",
+        help="size of each PBO",
+    )
+    parser.add_argument(
+        "--storage-files",
+        type=int,
+        default=DEFAULT_SPEC.storage_files,
+        metavar="n",
+        help="persistence files in the mission's storage",
+    )
+    parser.add_argument(
+        "--lower-case",
+        action="store_true",
+        help="generate lower-case mod paths only",
+    )
+    parser.add_argument(
+        "--import-budget",
+        type=float,
+        default=IMPORT_BUDGET,
+        metavar="seconds",
+        help="maximum import time of the command line tools",
+    )
+    parser.add_argument(
+        "-d", "--debug", action="store_true", help="show debug messages"
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="suppress info messages"
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    """Runs the benchmarks."""
+
+    args = get_args()
+    basicConfig(level=DEBUG if args.debug else WARNING if args.quiet else INFO)
+    suites = set(args.suite or SUITES)
+    results = []
+
+    if "rcon" in suites:
+        results += benchmark_rcon(
+            rounds=args.rounds,
+            players=args.players,
+            conditions=NetworkConditions(latency=args.latency, loss=args.loss),
+        )
+
+    if "startup" in suites:
+        results += benchmark_startup(rounds=args.rounds)
+
+    if "tree" in suites:
+        results += benchmark_tree(
+            rounds=args.rounds,
+            spec=TreeSpec(
+                mods=args.mods,
+                pbos=args.pbos,
+                pbo_size=args.pbo_size * 1024,
+                storage_files=args.storage_files,
+                mixed_case=not args.lower_case,
+            ),
+        )
+
+    for result in results:
+        print(
+            f"{result.name:<32}{result.seconds * 1000:>10.3f} ms",
+            *(f"{key}={value}" for key, value in result.counters.items()),
+        )
+
+    if args.output:
+        dump_results(results, args.output)
+
+    regressions = list(over_budget(results, args.import_budget))
+
+    if args.baseline is not None:
+        regressions += compare(results, load_results(args.baseline), args.tolerance)
+
+    for regression in regressions:
+        LOGGER.error("Regression: %s", regression)
+
+    return 1 if regressions else 0
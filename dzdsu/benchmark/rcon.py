@@ -0,0 +1,143 @@
+"""End-to-end RCon benchmarks against the BattlEye emulator."""
+
+from asyncio import run
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Awaitable, Callable
+
+from dzdsu.benchmark.result import Result
+from dzdsu.emulator import BattlEyeEmulator, NetworkConditions
+from dzdsu.server import Server
+from dzdsu.utility.shutdown import shutdown_async
+
+
+__all__ = ["benchmark_rcon"]
+
+
+PASSWD = "benchmark"
+TEMPLATE = "Server is going down for benchmarking in {}!"
+
+
+def benchmark_rcon(
+    *,
+    rounds: int = 5,
+    players: int = 30,
+    max_players: int = 60,
+    countdown: int = 30,
+    tick: float = 0.001,
+    conditions: NetworkConditions = NetworkConditions(),
+) -> list[Result]:
+    """Benchmarks countdown, kick_all and shutdown over RCon.
+
+    A countdown second lasts tick seconds, so that the
+    countdown measures round trips rather than sleeping.
+    """
+
+    emulator = BattlEyeEmulator(
+        PASSWD, max_players=max_players, conditions=conditions, seed=0
+    )
+
+    with TemporaryDirectory() as tmp:
+        server = make_server(Path(tmp), max_players)
+        return run(
+            _benchmark(
+                emulator,
+                server,
+                {
+                    "rcon.login": lambda: _login(server),
+                    "rcon.countdown": lambda: _countdown(server, countdown, tick),
+                    "rcon.kick_all": lambda: _kick_all(server),
+                    "rcon.shutdown": lambda: _shutdown(server),
+                    "rcon.shutdown_sequence": lambda: shutdown_async(
+                        server, TEMPLATE, 0
+                    ),
+                },
+                rounds=rounds,
+                players=players,
+            )
+        )
+
+
+def make_server(base_dir: Path, max_players: int) -> Server:
+    """Creates a minimal server tree in the given directory."""
+
+    (base_dir / "battleye").mkdir()
+    (base_dir / "serverDZ.cfg").write_text(
+        f'hostname = "Benchmark";\nmaxPlayers = {max_players};\n', encoding="utf-8"
+    )
+    return Server.from_json("benchmark", {"basedir": str(base_dir)})
+
+
+async def _benchmark(
+    emulator: BattlEyeEmulator,
+    server: Server,
+    benchmarks: dict[str, Callable[[], Awaitable]],
+    *,
+    rounds: int,
+    players: int,
+) -> list[Result]:
+    """Runs the benchmarks against the emulator on the running event loop."""
+
+    await emulator.start()
+    (server.battleye_dir / "beserver_x64.cfg").write_text(
+        f"RConPassword {PASSWD}\nRConIP 127.0.0.1\nRConPort {emulator.port}\n",
+        encoding="utf-8",
+    )
+    results = []
+
+    try:
+        for name, benchmark in benchmarks.items():
+            timings = []
+
+            for _ in range(rounds):
+                emulator.populate(players)
+                emulator.forget_clients()
+                emulator.reset_stats()
+                start = perf_counter()
+                await benchmark()
+                timings.append(perf_counter() - start)
+
+            results.append(
+                Result.from_timings(
+                    name,
+                    timings,
+                    {
+                        "client_packets": emulator.received,
+                        "server_packets": emulator.sent,
+                        "commands": sum(emulator.commands.values()),
+                    },
+                )
+            )
+    finally:
+        emulator.close()
+
+    return results
+
+
+async def _login(server: Server) -> None:
+    """Opens and closes an RCon session."""
+
+    async with server.rcon_session():
+        pass
+
+
+async def _countdown(server: Server, countdown: int, tick: float) -> None:
+    """Runs a countdown."""
+
+    async with server.rcon_session() as rcon:
+        await rcon.countdown(TEMPLATE, countdown, tick=tick)
+
+
+async def _kick_all(server: Server) -> None:
+    """Kicks all players."""
+
+    async with server.rcon_session() as rcon:
+        await rcon.kick_all(server.max_players, reason="Benchmark.")
+
+
+async def _shutdown(server: Server) -> None:
+    """Shuts the server down."""
+
+    async with server.rcon_session() as rcon:
+        await rcon.shutdown()
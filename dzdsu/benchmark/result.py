@@ -0,0 +1,84 @@
+"""Benchmark results and baseline comparison."""
+
+from __future__ import annotations
+from json import dump, load
+from pathlib import Path
+from statistics import median
+from typing import Iterable, Iterator, NamedTuple
+
+
+__all__ = ["Result", "compare", "load_results", "dump_results"]
+
+
+class Result(NamedTuple):
+    """Result of a single benchmark."""
+
+    name: str
+    seconds: float
+    rounds: int
+    counters: dict[str, int]
+
+    @classmethod
+    def from_timings(
+        cls, name: str, timings: list[float], counters: dict[str, int]
+    ) -> Result:
+        """Creates a result from the timings of several rounds."""
+        return cls(name, median(timings), len(timings), counters)
+
+    @classmethod
+    def from_json(cls, json: dict) -> Result:
+        """Creates a result from a JSON-ish dict."""
+        return cls(
+            json["name"], json["seconds"], json["rounds"], json.get("counters", {})
+        )
+
+    def to_json(self) -> dict:
+        """Returns a JSON-ish dict."""
+        return {
+            "name": self.name,
+            "seconds": self.seconds,
+            "rounds": self.rounds,
+            "counters": self.counters,
+        }
+
+    def regressions(self, baseline: Result, tolerance: float) -> Iterator[str]:
+        """Yields regressions compared to the baseline."""
+        if self.seconds > baseline.seconds * (1 + tolerance):
+            yield (
+                f"{self.name}: {self.seconds:.6f} s "
+                f"(baseline {baseline.seconds:.6f} s)"
+            )
+
+        for counter, value in self.counters.items():
+            if (old := baseline.counters.get(counter)) is not None and value > old:
+                yield f"{self.name}: {counter} = {value} (baseline {old})"
+
+
+def compare(
+    results: Iterable[Result], baseline: Iterable[Result], tolerance: float = 0.25
+) -> Iterator[str]:
+    """Yields regressions of the results compared to the baseline.
+
+    Timings may exceed the baseline by the given tolerance,
+    counters such as round trips must not exceed it at all.
+    """
+
+    baseline = {result.name: result for result in baseline}
+
+    for result in results:
+        if (old := baseline.get(result.name)) is not None:
+            yield from result.regressions(old, tolerance)
+
+
+def load_results(file: Path) -> list[Result]:
+    """Loads results from a JSON file."""
+
+    with file.open("rb") as json:
+        return [Result.from_json(result) for result in load(json)]
+
+
+def dump_results(results: Iterable[Result], file: Path) -> None:
+    """Writes results to a JSON file."""
+
+    with file.open("w", encoding="utf-8") as json:
+        dump([result.to_json() for result in results], json, indent=2)
@@ -0,0 +1,96 @@
+"""Import time benchmarks of the command line tools."""
+
+from subprocess import run
+from sys import executable
+from typing import Iterable, Iterator
+
+from dzdsu.benchmark.result import Result
+
+
+__all__ = ["ENTRY_MODULES", "HEAVY_MODULES", "benchmark_startup", "over_budget"]
+
+
+ENTRY_MODULES = ("dzdsu.utility", "dzdsu.wrapper")
+HEAVY_MODULES = frozenset(
+    {
+        "asyncio",
+        "configparser",
+        "hashlib",
+        "json",
+        "psutil",
+        "rcon",
+        "sqlite3",
+        "tarfile",
+    }
+)
+IMPORT_BUDGET = 0.1
+
+
+def benchmark_startup(
+    rounds: int = 5, modules: Iterable[str] = ENTRY_MODULES
+) -> list[Result]:
+    """Measures the import time of the given modules with -X importtime."""
+
+    results = []
+    interpreter = set(import_times("pass"))
+
+    for module in modules:
+        timings = []
+
+        for _ in range(rounds):
+            times = import_times(f"import {module}")
+            timings.append(times[module])
+
+        imported = set(times) - interpreter
+        results.append(
+            Result.from_timings(
+                f"startup.{module}",
+                timings,
+                {
+                    "modules": len(imported),
+                    "heavy_modules": len(
+                        HEAVY_MODULES & {name.split(".")[0] for name in imported}
+                    ),
+                },
+            )
+        )
+
+    return results
+
+
+def import_times(code: str) -> dict[str, float]:
+    """Returns the cumulative import times in seconds by module name."""
+
+    process = run(
+        [executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times = {}
+
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        _, cumulative, name = line.split("|")
+
+        try:
+            times[name.strip()] = int(cumulative) / 1_000_000
+        except ValueError:
+            continue  # Header line.
+
+    return times
+
+
+def over_budget(
+    results: Iterable[Result], budget: float = IMPORT_BUDGET
+) -> Iterator[str]:
+    """Yields startup results exceeding the import time budget."""
+
+    for result in results:
+        if result.name.startswith("startup.") and result.seconds > budget:
+            yield (
+                f"{result.name}: {result.seconds * 1000:.1f} ms "
+                f"exceeds budget of {budget * 1000:.1f} ms"
+            )
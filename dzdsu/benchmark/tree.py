@@ -0,0 +1,167 @@
+"""Benchmarks of file operations on synthetic server trees."""
+
+from pathlib import Path
+from random import Random
+from shutil import rmtree
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Callable, NamedTuple
+
+from dzdsu.benchmark.result import Result
+from dzdsu.constants import CONFIG_FILE, MODS_DIR, SERVER_EXECUTABLE
+from dzdsu.server import Server
+from dzdsu.utility.backup import backup
+from dzdsu.utility.mods import fix_mod_paths, install_keys
+from dzdsu.utility.wipe import wipe
+
+
+__all__ = ["TreeSpec", "benchmark_tree", "make_tree"]
+
+
+MISSION = "dayzOffline.chernarusplus"
+FIRST_MOD_ID = 1_000_000
+
+
+class TreeSpec(NamedTuple):
+    """Shape of a synthetic server tree."""
+
+    mods: int = 50
+    pbos: int = 5
+    pbo_size: int = 256 * 1024
+    storage_files: int = 2000
+    storage_size: int = 4096
+    mixed_case: bool = True
+    seed: int = 0
+
+
+def make_tree(base_dir: Path, spec: TreeSpec = TreeSpec()) -> Server:
+    """Creates a server with installed mods and a mission in the directory."""
+
+    random = Random(spec.seed)
+    (base_dir / "keys").mkdir(parents=True)
+    (base_dir / "battleye").mkdir()
+    (base_dir / SERVER_EXECUTABLE).write_bytes(random.randbytes(1024 * 1024))
+    (base_dir / CONFIG_FILE).write_text(
+        f'hostname = "Benchmark";\nmaxPlayers = 60;\ntemplate = "{MISSION}";\n',
+        encoding="utf-8",
+    )
+    mods = list(range(FIRST_MOD_ID, FIRST_MOD_ID + spec.mods))
+
+    for ident in mods:
+        _make_mod(base_dir / MODS_DIR / str(ident), ident, spec, random)
+
+    make_storage(base_dir / "mpmissions" / MISSION / "storage_1", spec)
+    server = Server.from_json("benchmark", {"basedir": str(base_dir), "mods": mods})
+    server.update_hashes()
+    return server
+
+
+def make_storage(storage: Path, spec: TreeSpec) -> None:
+    """Fills a mission's storage with persistence files."""
+
+    random = Random(spec.seed)
+    (data := storage / "data").mkdir(parents=True, exist_ok=True)
+    (storage / "players.db").write_bytes(random.randbytes(spec.storage_size))
+
+    for index in range(spec.storage_files):
+        (data / f"dynamic_{index:03d}.bin").write_bytes(
+            random.randbytes(spec.storage_size)
+        )
+
+
+def benchmark_tree(*, rounds: int = 5, spec: TreeSpec = TreeSpec()) -> list[Result]:
+    """Times the file operations of the utility on a synthetic tree.
+
+    Each round starts from the same state, so that operations which
+    change the tree are measured doing their full work.
+    """
+
+    from dzdsu.hash import DIGESTS
+
+    with TemporaryDirectory() as tmp:
+        server = make_tree(Path(tmp) / "server", spec)
+        backups = Path(tmp) / "backups"
+        storage = server.mission(MISSION).storage_1
+        benchmarks: dict[str, tuple[Callable[[], None], Callable[[], object]]] = {
+            "tree.installed_mods": (_nothing, lambda: len(list(server.installed_mods))),
+            "tree.needs_restart": (DIGESTS.clear, lambda: server.needs_restart),
+            "tree.needs_restart.cached": (_nothing, lambda: server.needs_restart),
+            "tree.fix_paths": (
+                lambda: _remove_symlinks(server.mods_dir),
+                lambda: fix_mod_paths(server),
+            ),
+            "tree.install_keys": (
+                lambda: _clear(server.base_dir / "keys"),
+                lambda: install_keys(server),
+            ),
+            "tree.backup": (
+                lambda: _clear(backups),
+                lambda: backup(server, {MISSION}, backups),
+            ),
+            "tree.wipe": (
+                lambda: make_storage(storage, spec),
+                lambda: wipe(server, {MISSION}),
+            ),
+        }
+        results = []
+
+        for name, (reset, benchmark) in benchmarks.items():
+            timings = []
+
+            for _ in range(rounds):
+                reset()
+                start = perf_counter()
+                benchmark()
+                timings.append(perf_counter() - start)
+
+            results.append(
+                Result.from_timings(
+                    name, timings, {"mods": spec.mods, "files": _count(server)}
+                )
+            )
+
+    return results
+
+
+def _make_mod(path: Path, ident: int, spec: TreeSpec, random: Random) -> None:
+    """Creates an installed mod."""
+
+    addons = path / ("Addons" if spec.mixed_case else "addons")
+    keys = path / ("Keys" if spec.mixed_case else "keys")
+    addons.mkdir(parents=True)
+    keys.mkdir()
+    (path / "meta.cpp").write_text(
+        f'protocol = 1;\npublishedid = {ident};\nname = "Mod {ident}";\n',
+        encoding="utf-8",
+    )
+    (keys / f"mod_{ident}.bikey").write_bytes(random.randbytes(256))
+
+    for index in range(spec.pbos):
+        stem = f"Data_{index}" if spec.mixed_case else f"data_{index}"
+        (addons / f"{stem}.pbo").write_bytes(random.randbytes(spec.pbo_size))
+        (addons / f"{stem}.pbo.mod_{ident}.bisign").write_bytes(random.randbytes(64))
+
+
+def _clear(directory: Path) -> None:
+    """Removes the directory's content."""
+
+    rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True)
+
+
+def _count(server: Server) -> int:
+    """Counts the files of the server tree."""
+
+    return sum(1 for _ in server.base_dir.rglob("*"))
+
+
+def _nothing() -> None:
+    """Does not reset anything."""
+
+
+def _remove_symlinks(directory: Path) -> None:
+    """Removes the lower-case links created by fixing paths."""
+
+    for path in list(directory.rglob("*")):
+        if path.is_symlink():
+            path.unlink()
@@ -7,9 +7,11 @@ from pathlib import Path
 __all__ = [
     "BATTLEYE_GLOB",
     "BACKUPS_DIR",
+    "CACHE_DIR",
     "CONFIG_FILE",
     "DAYZ_APP_ID",
     "DAYZ_SERVER_APP_ID",
+    "DOWNLOADS_DIR",
     "STRIKETHROUGH",
     "JSON_FILE",
     "LINK",
@@ -18,7 +20,9 @@ __all__ = [
     "MODS_DIR",
     "PROCESS_NAME",
     "SERVER_EXECUTABLE",
+    "SOCKET_FILE",
     "STEAMCMD",
+    "STEAM_QUERY_PORT",
     "UNSUPPORTED_OS",
     "WORKSHOP_URL",
 ]
@@ -28,11 +32,13 @@ BATTLEYE_GLOB = "beserver_x64*.cfg"
 CONFIG_FILE = "serverDZ.cfg"
 DAYZ_APP_ID = 221100
 DAYZ_SERVER_APP_ID = 223350
+DOWNLOADS_DIR = Path("steamapps/workshop/downloads") / str(DAYZ_APP_ID)
 MESSAGE_TEMPLATE_SHUTDOWN = "Server is going down for maintenance in {}!"
 MESSAGE_TEMPLATE_UPDATE = "Server is going down for updates in {}!"
 MODS_DIR = Path("steamapps/workshop/content") / str(DAYZ_APP_ID)
 UNSUPPORTED_OS = OSError("Unsupported operating system.")
 STEAMCMD = "steamcmd"
+STEAM_QUERY_PORT = 27016
 WORKSHOP_URL = "https://steamcommunity.com/sharedfiles/filedetails/?id={}"
 
 STRIKETHROUGH = "\033[9m{}\033[0m"
@@ -41,12 +47,16 @@ LINK = "\x1b]8;;{url}\x1b\\{text}\x1b]8;;\x1b\\"
 if name == "nt":
     _CONFIG_DIR = Path(getenv("PROGRAMFILES")) / "dzsrv"
     BACKUPS_DIR = _CONFIG_DIR / "backups"
+    CACHE_DIR = _CONFIG_DIR / "cache"
     JSON_FILE = _CONFIG_DIR / "servers.json"
     PROCESS_NAME = SERVER_EXECUTABLE = "DayZServer_x64.exe"
+    SOCKET_FILE = _CONFIG_DIR / "dzdsud.sock"
 elif name == "posix":
     BACKUPS_DIR = Path("/var/lib/dzbackups")
+    CACHE_DIR = Path(getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "dzdsu"
     JSON_FILE = Path("/etc/dzservers.json")
     PROCESS_NAME = "enfMain"
     SERVER_EXECUTABLE = "DayZServer"
+    SOCKET_FILE = Path(getenv("XDG_RUNTIME_DIR") or "/run") / "dzdsud.sock"
 else:
     raise UNSUPPORTED_OS
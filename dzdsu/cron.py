@@ -0,0 +1,134 @@
+"""Cron-like restart schedules."""
+
+from __future__ import annotations
+from datetime import date, datetime, time, timedelta
+from typing import NamedTuple, Optional
+
+
+__all__ = ["CronExpression", "RestartSchedule"]
+
+
+ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12))
+DEFAULT_WARNINGS = (900, 300, 60)
+MAX_YEARS = 8
+
+
+class CronExpression(NamedTuple):
+    """A parsed five-field cron expression in local time."""
+
+    minutes: tuple[int, ...]
+    hours: tuple[int, ...]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]
+    any_day: bool = True
+    any_weekday: bool = True
+
+    @classmethod
+    def parse(cls, text: str) -> CronExpression:
+        """Parses a cron expression such as "0 */6 * * *"."""
+        fields = ALIASES.get(text.strip(), text).split()
+
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have five fields: {text!r}")
+
+        minutes, hours, days, months = (
+            _parse_field(field, *bounds) for field, bounds in zip(fields, FIELDS)
+        )
+        # Both 0 and 7 denote Sunday.
+        weekdays = {weekday % 7 for weekday in _parse_field(fields[4], "weekday", 0, 7)}
+        return cls(
+            tuple(sorted(minutes)),
+            tuple(sorted(hours)),
+            frozenset(days),
+            frozenset(months),
+            frozenset(weekdays),
+            fields[2] == "*",
+            fields[4] == "*",
+        )
+
+    def matches_day(self, day: date) -> bool:
+        """Determines whether the expression fires on the given day.
+
+        As with cron, restricted day and weekday fields match either.
+        """
+        if day.month not in self.months:
+            return False
+
+        day_matches = day.day in self.days
+        weekday_matches = (day.weekday() + 1) % 7 in self.weekdays
+
+        if self.any_day or self.any_weekday:
+            return day_matches and weekday_matches
+
+        return day_matches or weekday_matches
+
+    def next(self, after: datetime) -> datetime:
+        """Returns the first time strictly after the given one."""
+        after = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = after.date()
+
+        while day.year - after.year <= MAX_YEARS:
+            if self.matches_day(day):
+                earliest = after.time() if day == after.date() else time()
+
+                for hour in self.hours:
+                    if hour < earliest.hour:
+                        continue
+
+                    for minute in self.minutes:
+                        if hour == earliest.hour and minute < earliest.minute:
+                            continue
+
+                        return datetime.combine(day, time(hour, minute))
+
+            day += timedelta(days=1)
+
+        raise ValueError("Cron expression never fires.")
+
+
+class RestartSchedule(NamedTuple):
+    """A timed restart of a server with warnings ahead of it."""
+
+    cron: CronExpression
+    warnings: tuple[int, ...] = DEFAULT_WARNINGS
+    message: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, json: dict):
+        """Creates a RestartSchedule instance from a JSON-ish dict."""
+        return cls(
+            CronExpression.parse(json["cron"]),
+            tuple(sorted(set(json.get("warnings", DEFAULT_WARNINGS)), reverse=True)),
+            json.get("message"),
+        )
+
+
+def _parse_field(field: str, name: str, first: int, last: int) -> set[int]:
+    """Parses a comma-separated cron field of ranges and steps."""
+
+    values = set()
+
+    for item in field.split(","):
+        item, _, step = item.partition("/")
+
+        if item == "*":
+            start, stop = first, last
+        else:
+            start, _, stop = item.partition("-")
+            start = int(start)
+            stop = int(stop) if stop else (last if step else start)
+
+        if not first <= start <= stop <= last or (step and int(step) < 1):
+            raise ValueError(f"Invalid {name} in cron expression: {field!r}")
+
+        values.update(range(start, stop + 1, int(step or 1)))
+
+    return values
@@ -0,0 +1,323 @@
+"""Long-running daemon serving dzdsu command lines over a Unix socket."""
+
+from __future__ import annotations
+import sys
+from argparse import ArgumentParser, Namespace
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from io import StringIO
+from json import dumps, loads
+from logging import DEBUG, INFO, WARNING, Formatter, Handler, LogRecord
+from logging import basicConfig, getLogger
+from os import getcwd
+from pathlib import Path
+from threading import Lock
+from typing import Iterable, Iterator, NamedTuple, TextIO
+
+from dzdsu.constants import JSON_FILE, SOCKET_FILE
+from dzdsu.registry import ServerRegistry, load_servers
+from dzdsu.server import Server
+
+
+__all__ = ["Daemon", "delegate", "main"]
+
+
+LOGGER = getLogger("dzdsud")
+EXIT_ERROR = 7
+
+
+class Output(NamedTuple):
+    """Captured output of a request."""
+
+    stdout: StringIO
+    stderr: StringIO
+    level: int = INFO
+    formatter: Formatter = Formatter()
+
+
+OUTPUT: ContextVar[Output | None] = ContextVar("output", default=None)
+
+
+class _Stream:
+    """Writes to the current request's output or the original stream."""
+
+    def __init__(self, fallback: TextIO, index: int):
+        self.fallback = fallback
+        self.index = index
+
+    def __getattr__(self, name: str):
+        return getattr(self.fallback, name)
+
+    def write(self, text: str) -> int:
+        if (output := OUTPUT.get()) is None:
+            return self.fallback.write(text)
+
+        return output[self.index].write(text)
+
+    def flush(self) -> None:
+        if OUTPUT.get() is None:
+            self.fallback.flush()
+
+
+class _RequestHandler(Handler):
+    """Writes log records to the current request's stderr."""
+
+    def emit(self, record: LogRecord) -> None:
+        if (output := OUTPUT.get()) is not None and record.levelno >= output.level:
+            output.stderr.write(output.formatter.format(record) + "\n")
+
+
+class Daemon:
+    """Runs dzdsu command lines with warm caches.
+
+    Loaded servers are kept until their file changes. Requests
+    affecting the same server are run one after another.
+    """
+
+    def __init__(self, socket_file: Path = SOCKET_FILE):
+        self.socket_file = socket_file
+        self.registries: dict[Path, tuple[tuple[int, int], ServerRegistry]] = {}
+        self.locks: dict[Path, Lock] = {}
+        self._lock = Lock()
+
+    def servers(self, file: Path) -> ServerRegistry:
+        """Returns the servers of the given file, reloading it if changed."""
+        stat = file.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            if (cached := self.registries.get(file)) is not None and cached[0] == key:
+                return cached[1]
+
+            registry = load_servers(file)
+            self.registries[file] = (key, registry)
+            return registry
+
+    @contextmanager
+    def locked(self, servers: Iterable[Server]) -> Iterator[None]:
+        """Holds the locks of the given servers."""
+        with self._lock:
+            locks = [
+                self.locks.setdefault(base_dir, Lock())
+                for base_dir in sorted({server.base_dir for server in servers})
+            ]
+
+        with ExitStack() as stack:
+            for lock in locks:
+                stack.enter_context(lock)
+
+            yield
+
+    def handle(self, request: dict) -> dict:
+        """Runs a command line and returns its exit code and output."""
+        from dzdsu.utility.logger import LOGGER as UTILITY_LOGGER
+
+        stdout, stderr = StringIO(), StringIO()
+        OUTPUT.set(Output(stdout, stderr))
+
+        try:
+            returncode = self.run(request["argv"], Path(request.get("cwd") or "/"))
+        except SystemExit as exit:
+            returncode = (
+                exit.code if isinstance(exit.code, int) else int(exit.code is not None)
+            )
+        except Exception:
+            UTILITY_LOGGER.exception("Unexpected error.")
+            returncode = EXIT_ERROR
+        finally:
+            OUTPUT.set(None)
+
+        return {
+            "returncode": returncode,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+        }
+
+    def run(self, argv: list[str], cwd: Path) -> int:
+        """Runs a command line in the current request's context."""
+        from dzdsu import utility
+        from dzdsu.utility.argparse import get_args
+        from dzdsu.utility.fleet import select_servers
+        from dzdsu.utility.logger import LOGGER as UTILITY_LOGGER
+
+        args = get_args(utility.__doc__, argv)
+
+        for key, value in vars(args).items():
+            if isinstance(value, Path) and not value.is_absolute():
+                setattr(args, key, cwd / value)
+
+        if args.watch or args.follow_adm or args.schedule:
+            UTILITY_LOGGER.error("Long-running actions are not run by the daemon.")
+            return 2
+
+        servers = self.servers(args.servers_file)
+
+        try:
+            selected = select_servers(servers, args.server, every=args.all)
+        except KeyError as error:
+            UTILITY_LOGGER.error("No such server: %s", error.args[0])
+            return 2
+
+        OUTPUT.set(
+            Output(
+                *OUTPUT.get()[:2],
+                DEBUG if args.debug else WARNING if args.quiet else INFO,
+                Formatter(
+                    utility.FLEET_LOG_FORMAT
+                    if len(selected) > 1
+                    else utility.LOG_FORMAT
+                ),
+            )
+        )
+
+        with self.locked(selected):
+            return utility.manage(args, servers, selected)
+
+    def serve(self) -> None:
+        """Serves requests until terminated."""
+        from os import chmod
+        from socketserver import StreamRequestHandler, ThreadingUnixStreamServer
+
+        daemon = self
+
+        class RequestHandler(StreamRequestHandler):
+            """Handles a single JSON request."""
+
+            def handle(self):
+                try:
+                    request = loads(self.rfile.readline())
+                except ValueError:
+                    return
+
+                self.wfile.write(dumps(daemon.handle(request)).encode() + b"\n")
+
+        self._remove_stale_socket()
+        sys.stdout = _Stream(sys.stdout, 0)
+        sys.stderr = _Stream(sys.stderr, 1)
+        getLogger("dzdsu").addHandler(_RequestHandler())
+        # Let debug messages through to requests that ask for them.
+        getLogger("dzdsu").setLevel(DEBUG)
+
+        with ThreadingUnixStreamServer(str(self.socket_file), RequestHandler) as server:
+            chmod(self.socket_file, 0o600)
+            server.daemon_threads = True
+            LOGGER.info("Listening on %s.", self.socket_file)
+
+            try:
+                server.serve_forever()
+            finally:
+                self.socket_file.unlink(missing_ok=True)
+
+    def _remove_stale_socket(self) -> None:
+        """Removes the socket file of a daemon that is no longer running."""
+        from socket import AF_UNIX, SOCK_STREAM, socket
+
+        if not self.socket_file.exists():
+            return
+
+        with socket(AF_UNIX, SOCK_STREAM) as sock:
+            try:
+                sock.connect(str(self.socket_file))
+            except ConnectionRefusedError:
+                self.socket_file.unlink()
+            else:
+                raise FileExistsError(f"Daemon already listening on {self.socket_file}")
+
+
+def delegate(argv: list[str], socket_file: Path = SOCKET_FILE) -> int | None:
+    """Runs the command line in a running daemon.
+
+    Returns the exit code or None if no daemon is running.
+    """
+
+    try:
+        from socket import AF_UNIX, SOCK_STREAM, socket
+    except ImportError:
+        return None
+
+    if not socket_file.exists():
+        return None
+
+    with socket(AF_UNIX, SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_file))
+        except OSError:
+            return None
+
+        sock.sendall(dumps({"argv": argv, "cwd": getcwd()}).encode() + b"\n")
+
+        with sock.makefile("rb") as file:
+            line = file.readline()
+
+    if not line:
+        getLogger("dzdsu").error("The daemon closed the connection.")
+        return EXIT_ERROR
+
+    response = loads(line)
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["returncode"]
+
+
+def get_args(description: str = __doc__) -> Namespace:
+    """Return the parsed command line arguments."""
+
+    parser = ArgumentParser(description=description)
+    parser.add_argument(
+        "-s",
+        "--socket",
+        type=Path,
+        default=SOCKET_FILE,
+        metavar="file",
+        help="Unix socket to listen on",
+    )
+    parser.add_argument(
+        "-f",
+        "--servers-file",
+        type=Path,
+        default=JSON_FILE,
+        metavar="file",
+        help="servers JSON file to preload",
+    )
+    parser.add_argument(
+        "-d", "--debug", action="store_true", help="show debug messages"
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="suppress info messages"
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    """Runs the daemon."""
+
+    from signal import SIGTERM, signal
+
+    args = get_args()
+    level = DEBUG if args.debug else WARNING if args.quiet else INFO
+    basicConfig(level=level)
+
+    # Requests log to their clients rather than to the daemon's log.
+    # The handlers filter by level, since requests may enable debug messages.
+    for handler in getLogger().handlers:
+        handler.setLevel(level)
+        handler.addFilter(lambda record: OUTPUT.get() is None)
+
+    daemon = Daemon(args.socket)
+
+    try:
+        daemon.servers(args.servers_file)
+    except (OSError, ValueError) as error:
+        LOGGER.warning("Could not preload servers: %s", error)
+
+    signal(SIGTERM, lambda *_: sys.exit(0))
+
+    try:
+        daemon.serve()
+    except (FileExistsError, ImportError) as error:
+        LOGGER.error("%s", error)
+        return 1
+    except KeyboardInterrupt:
+        pass
+
+    return 0
@@ -0,0 +1,14 @@
+"""Local stand-ins for game server network services."""
+
+from dzdsu.emulator.a2s import A2SEmulator
+from dzdsu.emulator.battleye import BattlEyeEmulator, Player
+from dzdsu.emulator.common import EmulatorThread, NetworkConditions
+
+
+__all__ = [
+    "A2SEmulator",
+    "BattlEyeEmulator",
+    "EmulatorThread",
+    "NetworkConditions",
+    "Player",
+]
@@ -0,0 +1,88 @@
+"""In-process Steam A2S_INFO server stand-in."""
+
+from __future__ import annotations
+from asyncio import AbstractEventLoop, DatagramProtocol, DatagramTransport
+from asyncio import get_running_loop
+from random import Random
+
+from dzdsu.a2s import A2S_INFO, PREFIX, S2A_INFO, S2C_CHALLENGE, ServerInfo
+from dzdsu.constants import DAYZ_APP_ID
+from dzdsu.emulator.common import EmulatorThread, NetworkConditions
+
+
+__all__ = ["A2SEmulator"]
+
+
+class A2SEmulator(DatagramProtocol):
+    """Answers A2S_INFO queries like a DayZ server's query port."""
+
+    def __init__(
+        self,
+        info: ServerInfo = ServerInfo(
+            17, "DayZ emulator", "chernarusplus", "dayz", "DayZ", DAYZ_APP_ID, 0, 60, 0
+        ),
+        *,
+        challenge: bool = True,
+        conditions: NetworkConditions = NetworkConditions(),
+        seed: int | None = None,
+    ):
+        self.info = info
+        self.challenge = challenge
+        self.conditions = conditions
+        self.queries = 0
+        self._random = Random(seed)
+        self._transport: DatagramTransport | None = None
+        self._loop: AbstractEventLoop | None = None
+
+    @property
+    def port(self) -> int:
+        """Returns the bound port."""
+        return self._transport.get_extra_info("sockname")[1]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Binds the emulator to the given address."""
+        self._loop = get_running_loop()
+        await self._loop.create_datagram_endpoint(lambda: self, local_addr=(host, port))
+
+    def close(self) -> None:
+        """Closes the emulator."""
+        if self._transport is not None:
+            self._transport.close()
+
+    def threaded(self, host: str = "127.0.0.1", port: int = 0) -> EmulatorThread:
+        """Returns a context manager running the emulator in a thread."""
+        return EmulatorThread(self, host, port)
+
+    def connection_made(self, transport: DatagramTransport) -> None:
+        self._transport = transport
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        if not data.startswith(A2S_INFO) or self.conditions.drop(self._random):
+            return
+
+        self.queries += 1
+
+        if self.challenge and data[len(A2S_INFO) :] != self._token(addr):
+            self.send(PREFIX + bytes((S2C_CHALLENGE,)) + self._token(addr), addr)
+        else:
+            self.send(PREFIX + bytes((S2A_INFO,)) + self.info.to_bytes(), addr)
+
+    def send(self, data: bytes, addr: tuple) -> None:
+        """Sends a packet, applying the network conditions."""
+        if self.conditions.drop(self._random):
+            return
+
+        if (delay := self.conditions.delay(self._random)) > 0:
+            self._loop.call_later(delay, self._sendto, data, addr)
+        else:
+            self._sendto(data, addr)
+
+    def _sendto(self, data: bytes, addr: tuple) -> None:
+        """Sends the data if the transport is still open."""
+        if self._transport is not None and not self._transport.is_closing():
+            self._transport.sendto(data, addr)
+
+    @staticmethod
+    def _token(addr: tuple) -> bytes:
+        """Returns the challenge token for the client address."""
+        return hash(addr).to_bytes(8, "little", signed=True)[:4]
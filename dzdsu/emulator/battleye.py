@@ -0,0 +1,257 @@
+"""In-process BattlEye RCon server stand-in."""
+
+from __future__ import annotations
+from asyncio import AbstractEventLoop, DatagramProtocol, DatagramTransport
+from asyncio import get_running_loop
+from collections import Counter
+from logging import getLogger
+from random import Random
+from typing import NamedTuple
+from zlib import crc32
+
+from dzdsu.emulator.common import EmulatorThread, NetworkConditions
+
+
+__all__ = ["BattlEyeEmulator", "Player"]
+
+
+LOGGER = getLogger("dzdsu.emulator")
+CLIENT_TIMEOUT = 45.0
+
+
+class Player(NamedTuple):
+    """A simulated player."""
+
+    ident: int
+    name: str
+    guid: str
+    address: str = "127.0.0.1:2304"
+    ping: int = 42
+
+    def __str__(self) -> str:
+        return (
+            f"{self.ident:<4}{self.address:<22}{self.ping:<5}"
+            f"{self.guid}(OK) {self.name}"
+        )
+
+    @classmethod
+    def generate(cls, ident: int) -> Player:
+        """Generates a player for the given slot."""
+        return cls(ident, f"Survivor{ident}", f"{ident:032x}")
+
+
+def packet(typ: int, payload: bytes) -> bytes:
+    """Creates a BattlEye packet."""
+
+    body = b"".join((b"\xff", typ.to_bytes(1, "little"), payload))
+    return b"".join((b"BE", crc32(body).to_bytes(4, "little"), body))
+
+
+class BattlEyeEmulator(DatagramProtocol):
+    """Emulates the RCon interface of a BattlEye-protected server."""
+
+    def __init__(
+        self,
+        passwd: str = "passwd",
+        *,
+        players: int = 0,
+        max_players: int = 60,
+        max_fragment: int = 1024,
+        conditions: NetworkConditions = NetworkConditions(),
+        seed: int | None = None,
+    ):
+        self.passwd = passwd
+        self.max_players = max_players
+        self.max_fragment = max_fragment
+        self.conditions = conditions
+        self.players: dict[int, Player] = {}
+        self.populate(players)
+        self.broadcasts: list[str] = []
+        self.clients: dict[tuple, float] = {}
+        self.commands: Counter[str] = Counter()
+        self.received = self.sent = self.dropped = self.acks = 0
+        self.running = True
+        self._random = Random(seed)
+        self._seq = 0
+        self._transport: DatagramTransport | None = None
+        self._loop: AbstractEventLoop | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Returns the bound address."""
+        return self._transport.get_extra_info("sockname")[:2]
+
+    @property
+    def port(self) -> int:
+        """Returns the bound port."""
+        return self.address[1]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Binds the emulator to the given address."""
+        self._loop = get_running_loop()
+        await self._loop.create_datagram_endpoint(lambda: self, local_addr=(host, port))
+
+    def close(self) -> None:
+        """Closes the emulator."""
+        if self._transport is not None:
+            self._transport.close()
+
+    def threaded(self, host: str = "127.0.0.1", port: int = 0) -> EmulatorThread:
+        """Returns a context manager running the emulator in a thread."""
+        return EmulatorThread(self, host, port)
+
+    def populate(self, players: int) -> None:
+        """Fills the server with the given amount of simulated players."""
+        self.players = {
+            ident: Player.generate(ident)
+            for ident in range(min(players, self.max_players))
+        }
+
+    def forget_clients(self) -> None:
+        """Drops all client sessions."""
+        self.clients.clear()
+
+    def reset_stats(self) -> None:
+        """Resets the packet and command counters."""
+        self.commands.clear()
+        self.received = self.sent = self.dropped = self.acks = 0
+
+    def connection_made(self, transport: DatagramTransport) -> None:
+        self._transport = transport
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        self.received += 1
+
+        if self.conditions.drop(self._random):
+            self.dropped += 1
+            return
+
+        if (
+            len(data) < 8
+            or data[:2] != b"BE"
+            or crc32(data[6:]) != int.from_bytes(data[2:6], "little")
+        ):
+            LOGGER.debug("Discarding invalid packet from %s.", addr)
+            return
+
+        typ, payload = data[7], data[8:]
+
+        if addr in self.clients:
+            self.clients[addr] = self._loop.time()
+
+        if typ == 0x00:
+            self.login(payload.decode("ascii", errors="replace"), addr)
+        elif typ == 0x01 and payload and addr in self.clients:
+            self.command(
+                payload[0], payload[1:].decode("ascii", errors="replace"), addr
+            )
+        elif typ == 0x02 and payload:
+            self.acks += 1
+
+    def login(self, passwd: str, addr: tuple) -> None:
+        """Handles a login request."""
+        if success := passwd == self.passwd:
+            self.clients[addr] = self._loop.time()
+
+        self.send(packet(0x00, b"\x01" if success else b"\x00"), addr)
+
+    def command(self, seq: int, command: str, addr: tuple) -> None:
+        """Handles a command request."""
+        name, *args = command.split(maxsplit=1) or [""]
+        self.commands[name] += 1
+        response = self.execute(name, args[0] if args else "")
+        fragments = [
+            response[offset : offset + self.max_fragment]
+            for offset in range(0, len(response), self.max_fragment)
+        ] or [b""]
+
+        if len(fragments) == 1:
+            self.send(packet(0x01, bytes((seq,)) + fragments[0]), addr)
+            return
+
+        for index, fragment in enumerate(fragments):
+            self.send(
+                packet(0x01, bytes((seq, 0x00, len(fragments), index)) + fragment),
+                addr,
+            )
+
+    def execute(self, name: str, args: str) -> bytes:
+        """Executes a command and returns the response text."""
+        if name == "":
+            return b""
+
+        if name == "players":
+            return self.player_list.encode("ascii")
+
+        if name == "say":
+            player, _, message = args.partition(" ")
+
+            if player == "-1":
+                self.broadcasts.append(message)
+
+            return b""
+
+        if name == "kick":
+            ident, _, reason = args.partition(" ")
+
+            if not ident.isdigit():
+                return b"Invalid player"
+
+            if (player := self.players.pop(int(ident), None)) is not None:
+                self.server_message(
+                    f"Player #{player.ident} {player.name} ({player.guid}) "
+                    f"has been kicked by BattlEye: Admin Kick ({reason})"
+                )
+
+            return b""
+
+        if name == "#shutdown":
+            self.running = False
+            return b""
+
+        return b"Unknown command"
+
+    @property
+    def player_list(self) -> str:
+        """Returns the player list as reported by the players command."""
+        return "\n".join(
+            [
+                "Players on server:",
+                "[#] [IP Address]:[Port] [Ping] [GUID] [Name]",
+                "-" * 50,
+                *map(str, self.players.values()),
+                f"({len(self.players)} players in total)",
+            ]
+        )
+
+    def server_message(self, message: str) -> None:
+        """Sends a server message to all logged-in clients.
+
+        Clients that have been silent for too long are dropped.
+        """
+        for addr, last_seen in list(self.clients.items()):
+            if self._loop.time() - last_seen > CLIENT_TIMEOUT:
+                del self.clients[addr]
+                continue
+
+            self.send(packet(0x02, bytes((self._seq,)) + message.encode("ascii")), addr)
+
+        self._seq = (self._seq + 1) % 256
+
+    def send(self, data: bytes, addr: tuple) -> None:
+        """Sends a packet, applying the network conditions."""
+        self.sent += 1
+
+        if self.conditions.drop(self._random):
+            self.dropped += 1
+            return
+
+        if (delay := self.conditions.delay(self._random)) > 0:
+            self._loop.call_later(delay, self._sendto, data, addr)
+        else:
+            self._sendto(data, addr)
+
+    def _sendto(self, data: bytes, addr: tuple) -> None:
+        """Sends the data if the transport is still open."""
+        if self._transport is not None and not self._transport.is_closing():
+            self._transport.sendto(data, addr)
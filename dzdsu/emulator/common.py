@@ -0,0 +1,65 @@
+"""Common emulator infrastructure."""
+
+from __future__ import annotations
+from asyncio import AbstractEventLoop, new_event_loop, run_coroutine_threadsafe
+from random import Random
+from threading import Thread
+from typing import NamedTuple, Protocol
+
+
+__all__ = ["EmulatorThread", "NetworkConditions"]
+
+
+class Emulator(Protocol):
+    """An emulator that can be bound to an address."""
+
+    async def start(self, host: str, port: int) -> None:
+        """Binds the emulator to the given address."""
+
+    def close(self) -> None:
+        """Closes the emulator."""
+
+
+class NetworkConditions(NamedTuple):
+    """Simulated network conditions."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    loss: float = 0.0
+
+    def delay(self, random: Random) -> float:
+        """Returns the delay of a packet in seconds."""
+        if not self.jitter:
+            return self.latency
+
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def drop(self, random: Random) -> bool:
+        """Determines whether to drop a packet."""
+        return self.loss > 0 and random.random() < self.loss
+
+
+class EmulatorThread:
+    """Runs an emulator on an event loop in a background thread."""
+
+    def __init__(self, emulator: Emulator, host: str = "127.0.0.1", port: int = 0):
+        self.emulator = emulator
+        self.host = host
+        self.port = port
+        self._loop: AbstractEventLoop | None = None
+        self._thread: Thread | None = None
+
+    def __enter__(self):
+        self._loop = new_event_loop()
+        self._thread = Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        run_coroutine_threadsafe(
+            self.emulator.start(self.host, self.port), self._loop
+        ).result()
+        return self.emulator
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._loop.call_soon_threadsafe(self.emulator.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
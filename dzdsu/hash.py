@@ -1,6 +1,15 @@
 """Watchdog to detect server and mod updates."""
 
-__all__ = ["hash_changed"]
+from pathlib import Path
+
+from dzdsu.profiling import count
+
+
+__all__ = ["hash_changed", "sha1_file"]
+
+
+CHUNK_SIZE = 1024 * 1024
+DIGESTS: dict[Path, tuple[tuple[int, int, int, int], str]] = {}
 
 
 def hash_changed(old: dict[str, str], new: dict[str, str]) -> bool:
@@ -11,3 +20,29 @@ def hash_changed(old: dict[str, str], new: dict[str, str]) -> bool:
             return True
 
     return any(key not in old for key in new)
+
+
+def sha1_file(path: Path) -> str:
+    """Returns the SHA-1 checksum of a file.
+
+    Checksums are cached by the file's inode, size and timestamps,
+    so that long-running processes only hash changed files.
+    """
+
+    stat = path.stat()
+    key = (stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+
+    if (cached := DIGESTS.get(path)) is not None and cached[0] == key:
+        return cached[1]
+
+    from hashlib import sha1
+
+    hasher = sha1()
+
+    with path.open("rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            hasher.update(chunk)
+
+    count(stat.st_size)
+    DIGESTS[path] = (key, digest := hasher.hexdigest())
+    return digest
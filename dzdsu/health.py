@@ -0,0 +1,125 @@
+"""Concurrent health probing of servers."""
+
+from __future__ import annotations
+from asyncio import gather, run
+from time import perf_counter
+from typing import Iterable, NamedTuple
+
+from dzdsu.a2s import ServerInfo, query_info
+from dzdsu.aiorcon import RCON_ERRORS
+from dzdsu.server import Server
+
+
+__all__ = ["Health", "probe", "probe_all", "probe_servers"]
+
+
+PROBE_ERRORS = (*RCON_ERRORS, KeyError)
+
+
+class Health(NamedTuple):
+    """Health status of a server."""
+
+    name: str
+    latency: float | None = None
+    rcon_latency: float | None = None
+    players: int | None = None
+    max_players: int | None = None
+    map: str | None = None
+    errors: tuple[str, ...] = ()
+
+    def __str__(self) -> str:
+        if not self.online:
+            return f"{self.name}: offline ({'; '.join(self.errors)})"
+
+        rcon = (
+            "RCon unavailable"
+            if self.rcon_latency is None
+            else f"RCon {self.rcon_latency * 1000:.1f} ms"
+        )
+        return (
+            f"{self.name}: online, {self.latency * 1000:.1f} ms, "
+            f"{self.players}/{self.max_players} players, {self.map}, {rcon}"
+        )
+
+    @property
+    def online(self) -> bool:
+        """Determines whether the server answered the A2S query."""
+        return self.latency is not None
+
+    @property
+    def healthy(self) -> bool:
+        """Determines whether the server answered both A2S and RCon."""
+        return self.online and self.rcon_latency is not None
+
+
+async def probe(server: Server, timeout: float = 0.5) -> Health:
+    """Probes a single server via A2S_INFO and RCon concurrently."""
+
+    info, rcon_latency = await gather(
+        _probe_a2s(server, timeout), _probe_rcon(server, timeout)
+    )
+    errors = tuple(
+        f"{kind}: {result}"
+        for kind, result in (("A2S", info), ("RCon", rcon_latency))
+        if isinstance(result, Exception)
+    )
+
+    if isinstance(rcon_latency, Exception):
+        rcon_latency = None
+
+    if isinstance(info, Exception):
+        return Health(server.name, rcon_latency=rcon_latency, errors=errors)
+
+    latency, info = info
+    return Health(
+        server.name,
+        latency,
+        rcon_latency,
+        info.players,
+        info.max_players,
+        info.map,
+        errors,
+    )
+
+
+async def probe_all(servers: Iterable[Server], timeout: float = 0.5) -> list[Health]:
+    """Probes all given servers concurrently."""
+
+    return await gather(*(probe(server, timeout) for server in servers))
+
+
+def probe_servers(servers: Iterable[Server], timeout: float = 0.5) -> list[Health]:
+    """Probes all given servers concurrently on one event loop."""
+
+    return run(probe_all(servers, timeout))
+
+
+async def _probe_a2s(
+    server: Server, timeout: float
+) -> tuple[float, ServerInfo] | Exception:
+    """Returns the A2S latency and server info or the error."""
+
+    try:
+        start = perf_counter()
+        info = await query_info(server.host, server.query_port, timeout)
+    except PROBE_ERRORS as error:
+        return error
+
+    return perf_counter() - start, info
+
+
+async def _probe_rcon(server: Server, timeout: float) -> float | Exception:
+    """Returns the RCon round trip time or the error."""
+
+    try:
+        client = server.async_rcon(timeout)
+        client.retries = 0
+        client.keepalive = 0
+
+        async with client:
+            start = perf_counter()
+            await client.run("")
+    except PROBE_ERRORS as error:
+        return error
+
+    return perf_counter() - start
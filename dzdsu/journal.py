@@ -0,0 +1,137 @@
+"""Journal of interrupted update jobs."""
+
+from __future__ import annotations
+from json import dump, load
+from logging import getLogger
+from os import replace
+from pathlib import Path
+from time import time
+from typing import Iterable, NamedTuple, Optional
+
+from dzdsu.steamcmd import Event
+
+
+__all__ = ["JournalEntry", "UpdateJournal"]
+
+
+LOGGER = getLogger("dzdsu")
+MAX_AGE = 24 * 60 * 60
+
+
+class JournalEntry(NamedTuple):
+    """The recorded outcome of an app or workshop item."""
+
+    success: bool
+    attempts: int
+    time: float
+    reason: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, json: dict) -> JournalEntry:
+        """Creates a JournalEntry instance from a JSON-ish dict."""
+        return cls(
+            bool(json["success"]),
+            int(json["attempts"]),
+            float(json["time"]),
+            json.get("reason"),
+        )
+
+
+class UpdateJournal:
+    """Records which items of an update job completed.
+
+    The journal is removed once the job succeeds. A job that failed or
+    was interrupted resumes from it, skipping the items that completed,
+    unless the journal is older than max_age seconds or belongs to a job
+    with other items.
+    """
+
+    def __init__(
+        self,
+        file: Path,
+        items: Iterable[int] = (),
+        app_id: int | None = None,
+        *,
+        max_age: float = MAX_AGE,
+    ):
+        self.file = file
+        self.job = {"app": app_id, "items": sorted(set(items))}
+        self.max_age = max_age
+        self.created = time()
+        self.entries: dict[int, JournalEntry] = {}
+
+    def load(self) -> UpdateJournal:
+        """Loads the journal of an unfinished job, if any."""
+        try:
+            with self.file.open("rb") as file:
+                json = load(file)
+
+            job = json.get("job")
+            created = float(json["created"])
+            entries = {
+                int(item): JournalEntry.from_json(entry)
+                for item, entry in json["items"].items()
+            }
+        except FileNotFoundError:
+            return self
+        except (KeyError, TypeError, ValueError) as error:
+            LOGGER.warning("Ignoring invalid update journal %s: %s", self.file, error)
+            return self
+
+        if time() - created > self.max_age:
+            LOGGER.info("Ignoring outdated update journal %s.", self.file)
+            return self
+
+        if job != self.job:
+            LOGGER.info("Ignoring update journal %s of another job.", self.file)
+            return self
+
+        self.created, self.entries = created, entries
+        return self
+
+    def done(self, item: int) -> bool:
+        """Determines whether the item completed before."""
+        return (entry := self.entries.get(item)) is not None and entry.success
+
+    def pending(self, items: Iterable[int]) -> list[int]:
+        """Returns the items that did not complete yet."""
+        return [item for item in items if not self.done(item)]
+
+    def record(self, event: Event) -> None:
+        """Records the outcome of an item."""
+        if event.kind not in {"success", "failure"}:
+            return
+
+        previous = self.entries.get(event.item)
+        self.entries[event.item] = JournalEntry(
+            event.kind == "success",
+            1 if previous is None else previous.attempts + 1,
+            time(),
+            event.reason,
+        )
+        self.save()
+
+    def save(self) -> None:
+        """Writes the journal atomically."""
+        tmp = self.file.with_name(f".{self.file.name}.tmp")
+
+        with tmp.open("w", encoding="utf-8") as file:
+            dump(
+                {
+                    "created": self.created,
+                    "job": self.job,
+                    "items": {
+                        str(item): entry._asdict()
+                        for item, entry in self.entries.items()
+                    },
+                },
+                file,
+                indent=2,
+            )
+
+        replace(tmp, self.file)
+
+    def remove(self) -> None:
+        """Removes the journal of the finished job."""
+        self.file.unlink(missing_ok=True)
+        self.entries.clear()
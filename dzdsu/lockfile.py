@@ -1,30 +1,256 @@
 """Lock file implementation."""
 
-from os import linesep
+from __future__ import annotations
+from datetime import datetime
+from logging import getLogger
+from os import getpid, name
 from pathlib import Path
+from threading import Event, Thread
+from time import monotonic, sleep, time
+from typing import NamedTuple, TextIO
 
 
-__all__ = ["LockFile"]
+__all__ = ["Holder", "LockFile"]
+
+
+LOGGER = getLogger("dzdsu")
+
+
+class Holder(NamedTuple):
+    """The process holding a lock exclusively."""
+
+    pid: int
+    started: float
+    since: float
+    reason: str
+
+    def __str__(self) -> str:
+        return (
+            f"PID {self.pid} since {datetime.fromtimestamp(self.since):%H:%M:%S}"
+            f" ({self.reason})"
+        )
+
+    @classmethod
+    def current(cls, reason: str) -> Holder:
+        """Returns a holder for the current process."""
+        return cls(pid := getpid(), _start_time(pid) or 0.0, time(), reason)
+
+    @classmethod
+    def from_text(cls, text: str) -> Holder | None:
+        """Parses a holder from a lock file's content."""
+        try:
+            pid, started, since, reason = text.split("\n", 3)
+            return cls(int(pid), float(started), float(since), reason.strip())
+        except ValueError:
+            return None
+
+    def to_text(self) -> str:
+        """Returns the lock file's content."""
+        return f"{self.pid}\n{self.started}\n{self.since}\n{self.reason}\n"
+
+    @property
+    def alive(self) -> bool:
+        """Determines whether the holding process is still running."""
+        return (started := _start_time(self.pid)) is not None and abs(
+            started - self.started
+        ) < 1
 
 
 class LockFile:
-    """A lock file."""
+    """An advisory inter-process lock on a file.
 
-    def __init__(self, file: Path, reason: str = "locked", *, override: bool = False):
+    The lock is held via flock(), or msvcrt.locking() on Windows, so the
+    operating system releases it if its holder dies. Exclusive holders
+    record their PID, start time and reason in the file.
+    On Windows, shared locks are exclusive as well.
+    """
+
+    def __init__(
+        self,
+        file: Path,
+        reason: str = "locked",
+        *,
+        shared: bool = False,
+        timeout: float | None = None,
+    ):
         self.file = file
         self.reason = reason
-        self.override = override
-
-    def __getattr__(self, item):
-        return getattr(self.file, item)
+        self.shared = shared
+        self.timeout = timeout
+        self._stream: TextIO | None = None
+        self._waiters: dict[bool, Event] = {}
 
     def __enter__(self):
-        if self.file.exists() and not self.override:
-            raise FileExistsError()
+        if not self.acquire(self.timeout):
+            raise TimeoutError(f"{self.file} is locked by {self.holder or 'unknown'}.")
 
-        with self.file.open("w", encoding="utf-8") as file:
-            file.write(self.reason)
-            file.write(linesep)
+        return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.file.unlink()
+        self.release()
+
+    @property
+    def holder(self) -> Holder | None:
+        """Returns the exclusive holder of the lock, if any."""
+        try:
+            holder = Holder.from_text(self.file.read_text(encoding="utf-8"))
+        except OSError:
+            return None
+
+        if holder is not None and not holder.alive:
+            LOGGER.debug("Ignoring stale holder of %s: %s", self.file, holder)
+            return None
+
+        return holder
+
+    @property
+    def locked(self) -> bool:
+        """Determines whether the lock is held exclusively."""
+        if not self.file.exists():
+            return False
+
+        with self._open() as stream:
+            if not _lock(stream, shared=True, blocking=False):
+                return True
+
+            _unlock(stream)
+
+        return False
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Acquires the lock, waiting up to timeout seconds.
+
+        Returns False iff the timeout expired while the lock was held.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        stream = self._open()
+
+        try:
+            while not _lock(stream, self.shared, blocking=False):
+                remaining = None if deadline is None else deadline - monotonic()
+
+                if remaining is not None and remaining <= 0:
+                    stream.close()
+                    return False
+
+                LOGGER.debug("Waiting for %s held by %s.", self.file, self.holder)
+                self._wait(remaining, shared=self.shared)
+        except BaseException:
+            stream.close()
+            raise
+
+        if not self.shared:
+            stream.truncate(0)
+            stream.write(Holder.current(self.reason).to_text())
+            stream.flush()
+
+        self._stream = stream
+        return True
+
+    def release(self) -> None:
+        """Releases the lock."""
+        if (stream := self._stream) is None:
+            return
+
+        self._stream = None
+
+        try:
+            if not self.shared:
+                stream.truncate(0)
+                stream.flush()
+
+            _unlock(stream)
+        finally:
+            stream.close()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Waits until the lock is no longer held exclusively.
+
+        Returns False iff the timeout expired while the lock was held.
+        """
+        return self._wait(timeout, shared=True)
+
+    def _wait(self, timeout: float | None, *, shared: bool) -> bool:
+        """Blocks until the lock could be taken in the given mode.
+
+        A background thread blocks on the lock, so that waiters wake up
+        as soon as it is released. The thread is reused across timeouts.
+        """
+        if (released := self._waiters.get(shared)) is None:
+            released = self._waiters[shared] = Event()
+            Thread(
+                target=self._await_release, args=(released, shared), daemon=True
+            ).start()
+
+        if not released.wait(timeout):
+            return False
+
+        del self._waiters[shared]
+        return True
+
+    def _await_release(self, released: Event, shared: bool) -> None:
+        """Takes and immediately releases the lock."""
+        try:
+            with self._open() as stream:
+                _lock(stream, shared, blocking=True)
+                _unlock(stream)
+        finally:
+            released.set()
+
+    def _open(self) -> TextIO:
+        """Opens the lock file, creating it if necessary."""
+        return self.file.open("a+", encoding="utf-8")
+
+
+def _start_time(pid: int) -> float | None:
+    """Returns the start time of the process or None if it does not exist."""
+
+    from psutil import Error, Process
+
+    try:
+        return Process(pid).create_time()
+    except Error:
+        return None
+
+
+if name == "nt":
+    from msvcrt import LK_NBLCK, LK_UNLCK, locking
+
+    def _lock(stream: TextIO, shared: bool, *, blocking: bool) -> bool:
+        """Locks the first byte of the file."""
+        while True:
+            stream.seek(0)
+
+            try:
+                locking(stream.fileno(), LK_NBLCK, 1)
+            except OSError:
+                if not blocking:
+                    return False
+
+                sleep(0.1)
+            else:
+                return True
+
+    def _unlock(stream: TextIO) -> None:
+        """Unlocks the first byte of the file."""
+        stream.seek(0)
+        locking(stream.fileno(), LK_UNLCK, 1)
+
+else:
+    from fcntl import LOCK_EX, LOCK_NB, LOCK_SH, LOCK_UN, flock
+
+    def _lock(stream: TextIO, shared: bool, *, blocking: bool) -> bool:
+        """Locks the file via flock()."""
+        try:
+            flock(
+                stream.fileno(),
+                (LOCK_SH if shared else LOCK_EX) | (0 if blocking else LOCK_NB),
+            )
+        except BlockingIOError:
+            return False
+
+        return True
+
+    def _unlock(stream: TextIO) -> None:
+        """Unlocks the file via flock()."""
+        flock(stream.fileno(), LOCK_UN)
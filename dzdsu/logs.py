@@ -0,0 +1,298 @@
+"""Capturing, rotating and archiving server logs."""
+
+from __future__ import annotations
+from datetime import datetime
+from logging import getLogger
+from os import close, pipe, read
+from pathlib import Path
+from queue import Full, Queue
+from re import compile
+from subprocess import STDOUT, Popen
+from threading import Event, Thread
+from time import monotonic, time
+from typing import BinaryIO, Iterable, Iterator
+
+
+__all__ = ["LogArchiver", "LogCapture", "RotatingLog"]
+
+
+LOGGER = getLogger("dzdsw")
+ARCHIVE_PATTERNS = ("*.RPT", "*.ADM", "*.log")
+FAMILY = compile(r"[-_]\d{4}-?\d{2}-?\d{2}.*$")
+F_SETPIPE_SZ = 1031
+PIPE_SIZE = 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class RotatingLog:
+    """A log file that is rotated by size and age."""
+
+    def __init__(
+        self, file: Path, *, max_bytes: int = 64 * 1024 * 1024, max_age: float = 86400
+    ):
+        self.file = file
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._stream: BinaryIO | None = None
+        self._opened = 0.0
+        self._size = 0
+
+    def write(self, data: bytes) -> None:
+        """Writes data to the log, rotating it beforehand if needed."""
+        if self._stream is None:
+            self._open()
+        elif self._size and (
+            self._size + len(data) > self.max_bytes
+            or monotonic() - self._opened > self.max_age
+        ):
+            self.rotate()
+
+        self._stream.write(data)
+        self._stream.flush()
+        self._size += len(data)
+
+    def rotate(self) -> None:
+        """Renames the current log file and starts a new one."""
+        self.close()
+        stem = f"{self.file.stem}-{datetime.now():%Y%m%d-%H%M%S}"
+        target = self.file.with_name(stem + self.file.suffix)
+        index = 0
+
+        while target.exists():
+            index += 1
+            target = self.file.with_name(f"{stem}-{index}{self.file.suffix}")
+
+        self.file.rename(target)
+        self._open()
+
+    def close(self) -> None:
+        """Closes the log file."""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def _open(self) -> None:
+        """Opens the log file for appending."""
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        self._stream = self.file.open("ab")
+        self._opened = monotonic()
+        self._size = self._stream.tell()
+
+
+class LogCapture:
+    """Captures process output into a rotating log.
+
+    Pipes are drained by dedicated threads into a bounded queue, which is
+    written to disk by another thread. If the disk cannot keep up, output is
+    dropped rather than blocking the writing process.
+    """
+
+    def __init__(self, log: RotatingLog, *, backlog: int = 1024):
+        self.log = log
+        self.dropped = 0
+        self._queue: Queue[bytes | None] = Queue(backlog)
+        self._writer = Thread(target=self._write, daemon=True)
+        self._readers: list[Thread] = []
+
+    def __enter__(self):
+        self._writer.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for reader in self._readers:
+            reader.join(timeout=5)
+
+        self._queue.put(None)
+        self._writer.join()
+        self.log.close()
+
+    def popen(self, command: list[str], **kwargs) -> Popen:
+        """Starts a process, capturing its stdout and stderr."""
+        reader, writer = pipe()
+        _grow_pipe(reader)
+
+        try:
+            process = Popen(command, stdout=writer, stderr=STDOUT, **kwargs)
+        except BaseException:
+            close(reader)
+            raise
+        finally:
+            close(writer)
+
+        self._readers = [thread for thread in self._readers if thread.is_alive()]
+        self._readers.append(thread := Thread(target=self._read, args=(reader,)))
+        thread.daemon = True
+        thread.start()
+        return process
+
+    def _read(self, fd: int) -> None:
+        """Drains the pipe until the writers closed it."""
+        try:
+            while chunk := read(fd, CHUNK_SIZE):
+                try:
+                    self._queue.put_nowait(chunk)
+                except Full:
+                    self.dropped += len(chunk)
+        finally:
+            close(fd)
+
+    def _write(self) -> None:
+        """Writes queued output to the log."""
+        reported = 0
+
+        while (chunk := self._queue.get()) is not None:
+            if (dropped := self.dropped) > reported:
+                LOGGER.warning("Dropped %i bytes of server output.", dropped - reported)
+                self.log.write(f"[{dropped - reported} bytes dropped]\n".encode())
+                reported = dropped
+
+            try:
+                self.log.write(chunk)
+            except OSError as error:
+                LOGGER.error("Could not write server output: %s", error)
+
+
+class LogArchiver:
+    """Compresses rotated logs in parallel and enforces a retention period.
+
+    The newest log of each kind is left alone, as the server may still be
+    writing to it, as are logs that were recently modified.
+    """
+
+    def __init__(
+        self,
+        directories: Iterable[Path],
+        *,
+        retention: float = 14 * 86400,
+        min_age: float = 300,
+        jobs: int | None = None,
+    ):
+        self.directories = list(directories)
+        self.retention = retention
+        self.min_age = min_age
+        self.jobs = jobs
+        self._stopped = Event()
+
+    @property
+    def rotated(self) -> Iterator[Path]:
+        """Yields uncompressed logs that are no longer written to."""
+        now = time()
+
+        for directory in self.directories:
+            families: dict[tuple[str, str], list[tuple[float, Path]]] = {}
+
+            for pattern in ARCHIVE_PATTERNS:
+                for file in directory.glob(pattern):
+                    try:
+                        mtime = file.stat().st_mtime
+                    except FileNotFoundError:
+                        continue
+
+                    families.setdefault(
+                        (FAMILY.sub("", file.stem), file.suffix), []
+                    ).append((mtime, file))
+
+            for files in families.values():
+                files.sort()
+
+                for mtime, file in files[:-1]:
+                    if now - mtime >= self.min_age:
+                        yield file
+
+    @property
+    def expired(self) -> Iterator[Path]:
+        """Yields compressed logs beyond the retention period.
+
+        Other archives, such as backups, are left alone.
+        """
+        now = time()
+
+        for directory in self.directories:
+            for pattern in ARCHIVE_PATTERNS:
+                for file in directory.glob(f"{pattern}.gz"):
+                    try:
+                        if now - file.stat().st_mtime > self.retention:
+                            yield file
+                    except FileNotFoundError:
+                        continue
+
+    def archive(self) -> tuple[int, int]:
+        """Compresses rotated and deletes expired logs.
+
+        Returns the amount of compressed and deleted files.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(self.jobs) as executor:
+            compressed = sum(executor.map(_compress, list(self.rotated)))
+
+        deleted = 0
+
+        for file in self.expired:
+            LOGGER.debug("Deleting expired log %s.", file)
+            file.unlink(missing_ok=True)
+            deleted += 1
+
+        return compressed, deleted
+
+    def start(self, interval: float = 3600) -> None:
+        """Archives logs periodically in a background thread."""
+        Thread(target=self._run, args=(interval,), daemon=True).start()
+
+    def stop(self) -> None:
+        """Stops archiving logs in the background."""
+        self._stopped.set()
+
+    def _run(self, interval: float) -> None:
+        """Archives logs until stopped."""
+        while not self._stopped.is_set():
+            try:
+                compressed, deleted = self.archive()
+            except OSError as error:
+                LOGGER.error("Could not archive logs: %s", error)
+            else:
+                if compressed or deleted:
+                    LOGGER.info(
+                        "Compressed %i and deleted %i logs.", compressed, deleted
+                    )
+
+            self._stopped.wait(interval)
+
+
+def _compress(file: Path) -> bool:
+    """Compresses a file with gzip and removes the original."""
+
+    from gzip import GzipFile
+    from shutil import copyfileobj, copystat
+
+    target = file.with_name(f"{file.name}.gz")
+    tmp = file.with_name(f".{file.name}.gz.tmp")
+
+    try:
+        with file.open("rb") as src, GzipFile(tmp, "wb") as dst:
+            copyfileobj(src, dst, CHUNK_SIZE)
+
+        copystat(file, tmp)
+        tmp.replace(target)
+        file.unlink()
+    except OSError as error:
+        LOGGER.error("Could not compress %s: %s", file, error)
+        tmp.unlink(missing_ok=True)
+        return False
+
+    LOGGER.debug("Compressed %s.", file)
+    return True
+
+
+def _grow_pipe(fd: int) -> None:
+    """Enlarges the pipe buffer on Linux to absorb bursts of output."""
+
+    try:
+        from fcntl import fcntl
+    except ImportError:
+        return
+
+    try:
+        fcntl(fd, F_SETPIPE_SZ, PIPE_SIZE)
+    except OSError:
+        pass
@@ -0,0 +1,314 @@
+"""Resource metrics of running servers."""
+
+from __future__ import annotations
+from argparse import ArgumentParser, Namespace
+from collections import deque
+from contextlib import suppress
+from itertools import pairwise
+from logging import DEBUG, INFO, WARNING, basicConfig, getLogger
+from os import replace
+from pathlib import Path
+from threading import Lock, Thread
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Iterable, Iterator, NamedTuple
+
+from dzdsu.constants import JSON_FILE
+from dzdsu.registry import load_servers
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+    from psutil import Process
+
+    from dzdsu.server import Server
+
+
+__all__ = ["MetricsCollector", "Sample", "main"]
+
+
+LOGGER = getLogger("dzdsm")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS = (
+    ("up", "gauge", "Whether the server process is running."),
+    ("cpu_seconds_total", "counter", "CPU time consumed by the server process."),
+    ("cpu_usage_ratio", "gauge", "CPU usage in cores over the last interval."),
+    ("cpu_usage_peak_ratio", "gauge", "Peak CPU usage in cores in the window."),
+    ("resident_memory_bytes", "gauge", "Resident memory of the server process."),
+    ("resident_memory_peak_bytes", "gauge", "Highest resident memory in the window."),
+    ("read_bytes_total", "counter", "Bytes read by the server process."),
+    ("write_bytes_total", "counter", "Bytes written by the server process."),
+    ("threads", "gauge", "Threads of the server process."),
+)
+
+
+class Sample(NamedTuple):
+    """A resource usage sample of a server process."""
+
+    timestamp: float
+    cpu_seconds: float
+    rss: int
+    read_bytes: int
+    write_bytes: int
+    threads: int
+
+    @classmethod
+    def from_process(cls, process: Process) -> Sample:
+        """Samples the given process."""
+        from psutil import AccessDenied
+
+        with process.oneshot():
+            cpu_times = process.cpu_times()
+
+            try:
+                io = process.io_counters()
+            except (AccessDenied, AttributeError):
+                read_bytes = write_bytes = 0
+            else:
+                read_bytes, write_bytes = io.read_bytes, io.write_bytes
+
+            return cls(
+                monotonic(),
+                cpu_times.user + cpu_times.system,
+                process.memory_info().rss,
+                read_bytes,
+                write_bytes,
+                process.num_threads(),
+            )
+
+
+class MetricsCollector:
+    """Samples the processes of servers into ring buffers.
+
+    The buffers cover the window of the peak metrics. They are
+    cleared when a server's process is replaced, e.g. by a restart.
+    """
+
+    def __init__(self, servers: Iterable[Server], *, size: int = 240):
+        self.servers = {server.name: server for server in servers}
+        self.samples: dict[str, deque[Sample]] = {
+            name: deque(maxlen=size) for name in self.servers
+        }
+        self.processes: dict[str, Process | None] = dict.fromkeys(self.servers)
+        self.lock = Lock()
+
+    def sample(self) -> None:
+        """Samples all servers once."""
+        from psutil import NoSuchProcess
+
+        self._discover()
+
+        for name, process in self.processes.items():
+            if process is None:
+                continue
+
+            try:
+                sample = Sample.from_process(process)
+            except NoSuchProcess:
+                self.processes[name] = None
+                continue
+
+            with self.lock:
+                self.samples[name].append(sample)
+
+    def run(self, interval: float = 15.0) -> Iterator[None]:
+        """Samples all servers at the given interval."""
+        deadline = monotonic()
+
+        while True:
+            self.sample()
+            yield
+            deadline += interval
+            sleep(max(deadline - monotonic(), 0))
+
+    def exposition(self) -> str:
+        """Returns the latest metrics in Prometheus text format."""
+        values = {metric: [] for metric, _, _ in METRICS}
+
+        with self.lock:
+            for name, samples in self.samples.items():
+                labels = f'{{server="{_escape(name)}"}}'
+                up = self.processes[name] is not None and bool(samples)
+                values["up"].append((labels, int(up)))
+
+                if not up:
+                    continue
+
+                latest = samples[-1]
+                values["cpu_seconds_total"].append((labels, latest.cpu_seconds))
+                usages = _cpu_usages(samples)
+                values["cpu_usage_ratio"].append((labels, usages[-1]))
+                values["cpu_usage_peak_ratio"].append((labels, max(usages)))
+                values["resident_memory_bytes"].append((labels, latest.rss))
+                values["resident_memory_peak_bytes"].append(
+                    (labels, max(sample.rss for sample in samples))
+                )
+                values["read_bytes_total"].append((labels, latest.read_bytes))
+                values["write_bytes_total"].append((labels, latest.write_bytes))
+                values["threads"].append((labels, latest.threads))
+
+        lines = []
+
+        for metric, typ, description in METRICS:
+            lines.append(f"# HELP dzdsu_{metric} {description}")
+            lines.append(f"# TYPE dzdsu_{metric} {typ}")
+            lines.extend(
+                f"dzdsu_{metric}{labels} {value}" for labels, value in values[metric]
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, file: Path) -> None:
+        """Atomically writes the metrics to a textfile collector file."""
+        tmp = file.with_name(f".{file.name}.tmp")
+        tmp.write_text(self.exposition(), encoding="utf-8")
+        replace(tmp, file)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 9556) -> ThreadingHTTPServer:
+        """Serves the metrics via HTTP in a background thread."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Serves the metrics."""
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in {"/", "/metrics"}:
+                    self.send_error(404)
+                    return
+
+                body = collector.exposition().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                LOGGER.debug(format, *args)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def _discover(self) -> None:
+        """Finds the processes of servers that are not running or unknown."""
+        for name, process in self.processes.items():
+            if process is not None and process.is_running():
+                continue
+
+            if (current := self.servers[name].process) != process:
+                with self.lock:
+                    self.samples[name].clear()
+
+            self.processes[name] = current
+
+
+def _cpu_usages(samples: Iterable[Sample]) -> list[float]:
+    """Returns the CPU usage in cores between each two consecutive samples.
+
+    Averages over longer periods can be derived from cpu_seconds_total.
+    """
+
+    return [
+        0.0,
+        *(
+            max(latest.cpu_seconds - previous.cpu_seconds, 0)
+            / (latest.timestamp - previous.timestamp)
+            for previous, latest in pairwise(samples)
+            if latest.timestamp > previous.timestamp
+        ),
+    ]
+
+
+def _escape(value: str) -> str:
+    """Escapes a Prometheus label value."""
+
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def get_args(description: str = __doc__) -> Namespace:
+    """Return the parsed command line arguments."""
+
+    parser = ArgumentParser(description=description)
+    parser.add_argument(
+        "server", nargs="*", help="the names of the servers to monitor (default: all)"
+    )
+    parser.add_argument(
+        "-f",
+        "--servers-file",
+        type=Path,
+        default=JSON_FILE,
+        metavar="file",
+        help="servers JSON file path",
+    )
+    parser.add_argument(
+        "-i",
+        "--interval",
+        type=float,
+        default=15,
+        metavar="seconds",
+        help="sampling interval",
+    )
+    parser.add_argument(
+        "-n",
+        "--samples",
+        type=int,
+        default=240,
+        metavar="n",
+        help="samples to keep per server",
+    )
+    parser.add_argument(
+        "-o",
+        "--textfile",
+        type=Path,
+        metavar="file",
+        help="write metrics to a textfile collector file",
+    )
+    parser.add_argument(
+        "-a",
+        "--address",
+        default="127.0.0.1",
+        metavar="host",
+        help="address to serve metrics on",
+    )
+    parser.add_argument(
+        "-p", "--port", type=int, metavar="port", help="serve metrics via HTTP"
+    )
+    parser.add_argument(
+        "-d", "--debug", action="store_true", help="show debug messages"
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="suppress info messages"
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    """Exports resource metrics of the servers."""
+
+    args = get_args()
+    basicConfig(level=DEBUG if args.debug else WARNING if args.quiet else INFO)
+    servers = load_servers(args.servers_file)
+
+    try:
+        collector = MetricsCollector(
+            [servers[name] for name in args.server or servers],
+            size=args.samples,
+        )
+    except KeyError as error:
+        LOGGER.error("No such server: %s", error.args[0])
+        return 2
+
+    if args.port is not None:
+        collector.serve(args.address, args.port)
+        LOGGER.info("Serving metrics on %s:%i.", args.address, args.port)
+
+    with suppress(KeyboardInterrupt):
+        for _ in collector.run(args.interval):
+            if args.textfile is not None:
+                collector.write_textfile(args.textfile)
+            elif args.port is None:
+                print(collector.exposition(), flush=True)
+
+    return 0
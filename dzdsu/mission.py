@@ -1,8 +1,8 @@
 """Mission management."""
 
 from pathlib import Path
-from shutil import rmtree
-from tarfile import TarFile
+
+from dzdsu.profiling import count
 
 
 __all__ = ["Mission"]
@@ -32,14 +32,27 @@ class Mission:
 
     def backup(self, archive: Path) -> None:
         """Creates a backup of the mission."""
+        from tarfile import TarFile
+
         with TarFile.open(archive, mode="w:gz") as tarfile:
             for file_or_dir in self.path.iterdir():
-                tarfile.add(file_or_dir)
+                tarfile.add(file_or_dir, filter=_counted)
 
     def wipe(self) -> None:
         """Wipes the mission data."""
+        from shutil import rmtree
+
         for file_or_dir in self.storage_1.iterdir():
             if file_or_dir.is_dir():
                 rmtree(file_or_dir)
             else:
                 file_or_dir.unlink()
+
+            count()
+
+
+def _counted(member):
+    """Counts an archived file."""
+
+    count(member.size)
+    return member
@@ -2,16 +2,16 @@
 
 from __future__ import annotations
 
-from hashlib import sha1
 from logging import getLogger
 from pathlib import Path
-from shutil import rmtree
-from typing import Iterable, Iterator, NamedTuple, Optional
+from typing import Iterable, Iterator, NamedTuple, Optional, TextIO
 
 from dzdsu.constants import LINK
 from dzdsu.constants import MODS_DIR
 from dzdsu.constants import STRIKETHROUGH
 from dzdsu.constants import WORKSHOP_URL
+from dzdsu.hash import sha1_file
+
 
 __all__ = ["Mod", "InstalledMod", "mods_str", "print_mods"]
 
@@ -111,8 +111,7 @@ class InstalledMod(NamedTuple):
     @property
     def sha1sum(self) -> str:
         """Returns the SHA-1 checksum."""
-        with self.metadata.open("rb") as file:
-            return sha1(file.read()).hexdigest()
+        return sha1_file(self.metadata)
 
     @property
     def pbos(self) -> Iterator[Path]:
@@ -140,6 +139,8 @@ class InstalledMod(NamedTuple):
 
     def remove(self) -> None:
         """Removes this mod."""
+        from shutil import rmtree
+
         rmtree(self.path)
 
 
@@ -162,8 +163,8 @@ def mods_str(mods: Iterable[Mod], sep: str = ";") -> str:
     return sep.join(str(mod.path) for mod in mods)
 
 
-def print_mods(mods: Iterable[Mod]) -> None:
+def print_mods(mods: Iterable[Mod], file: TextIO | None = None) -> None:
     """Lists the respective mods."""
 
     for mod in mods:
-        print(mod)
+        print(mod, file=file)
@@ -1,10 +1,13 @@
 """Server start parameters."""
 
-from ipaddress import IPv4Address, IPv6Address, ip_address
-from typing import NamedTuple, Iterator, Optional
+from __future__ import annotations
+from typing import TYPE_CHECKING, NamedTuple, Iterator, Optional
 
 from dzdsu.constants import CONFIG_FILE
 
+if TYPE_CHECKING:
+    from ipaddress import IPv4Address, IPv6Address
+
 
 __all__ = ["ServerParams"]
 
@@ -35,7 +38,7 @@ class ServerParams(NamedTuple):
             json.get("srcAllowFileWrite", True),
             json.get("noFilePatching", True),
             json.get("freezeCheck", True),
-            None if (ip := json.get("ip")) is None else ip_address(ip),
+            None if (ip := json.get("ip")) is None else parse_ip(ip),
             json.get("port"),
             json.get("profiles"),
             json.get("cpuCount"),
@@ -75,3 +78,11 @@ class ServerParams(NamedTuple):
 
         if self.cpu_count is not None:
             yield f"-cpuCount={self.cpu_count}"
+
+
+def parse_ip(ip: str) -> IPv4Address | IPv6Address:
+    """Parses an IP address."""
+
+    from ipaddress import ip_address
+
+    return ip_address(ip)
@@ -1,11 +1,286 @@
 """Config file parsers."""
 
-from configparser import ConfigParser, SectionProxy
-from re import fullmatch
-from typing import Iterable, Iterator
+from __future__ import annotations
+from pathlib import Path
+from re import DOTALL, VERBOSE, compile, fullmatch
+from typing import Any, Iterable, Iterator, Mapping, NamedTuple, Union
 
 
-__all__ = ["parse_battleye_cfg", "parse_server_cfg"]
+__all__ = [
+    "CfgSyntaxError",
+    "ConfigClass",
+    "load_server_cfg",
+    "parse_battleye_cfg",
+    "parse_server_cfg",
+    "parse_server_cfg_lenient",
+]
+
+
+Value = Union[int, float, str, tuple, "ConfigClass"]
+
+TOKENS = compile(
+    r"""
+    (?P<space>\s+)
+    |(?P<comment>//[^\n]*|/\*.*?\*/)
+    |(?P<directive>\#[^\n]*)
+    |(?P<string>"(?:[^"]|"")*")
+    |(?P<number>[-+]?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+        (?![\w.]))
+    |(?P<name>[A-Za-z_][\w.]*)
+    |(?P<symbol>\+=|[=;{}\[\],:])
+    """,
+    DOTALL | VERBOSE,
+)
+
+
+class CfgSyntaxError(ValueError):
+    """Indicates a syntax error in a config file."""
+
+    def __init__(self, message: str, line: int):
+        super().__init__(f"{message} (line {line})")
+        self.line = line
+
+
+class Token(NamedTuple):
+    """A lexical token."""
+
+    kind: str
+    text: str
+    line: int
+
+
+class ConfigClass(Mapping[str, Value]):
+    """A config class with case-insensitive keys and typed values."""
+
+    def __init__(self, name: str = "", items: Iterable[tuple[str, Value]] = ()):
+        self.name = name
+        self._items: dict[str, tuple[str, Value]] = {}
+
+        for key, value in items:
+            self._items[key.lower()] = (key, value)
+
+    def __getitem__(self, key: str) -> Value:
+        return self._items[key.lower()][1]
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, _ in self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r}, {list(self.items())!r})"
+
+    def get(self, key: str, fallback: Any = None) -> Any:
+        """Returns the value of the key or the fallback."""
+        try:
+            return self[key]
+        except KeyError:
+            return fallback
+
+    def getint(self, key: str, fallback: Any = None) -> int:
+        """Returns the value as int."""
+        if (value := self.get(key)) is None:
+            return fallback
+
+        return int(value)
+
+    def getfloat(self, key: str, fallback: Any = None) -> float:
+        """Returns the value as float."""
+        if (value := self.get(key)) is None:
+            return fallback
+
+        return float(value)
+
+    def getboolean(self, key: str, fallback: Any = None) -> bool:
+        """Returns the value as bool."""
+        if (value := self.get(key)) is None:
+            return fallback
+
+        if isinstance(value, str):
+            return value.lower() in {"1", "true", "yes", "on"}
+
+        return bool(value)
+
+
+class _Parser:
+    """Recursive descent parser of the Enfusion config grammar."""
+
+    def __init__(self, tokens: Iterable[Token]):
+        self.tokens = list(tokens)
+        self.index = 0
+
+    @property
+    def current(self) -> Token | None:
+        """Returns the current token."""
+        try:
+            return self.tokens[self.index]
+        except IndexError:
+            return None
+
+    def error(self, message: str) -> CfgSyntaxError:
+        """Returns a syntax error at the current token."""
+        if (token := self.current) is None:
+            line = self.tokens[-1].line if self.tokens else 1
+            return CfgSyntaxError(f"{message}, got end of file", line)
+
+        return CfgSyntaxError(f"{message}, got {token.text!r}", token.line)
+
+    def accept(self, text: str) -> bool:
+        """Consumes the current token iff it is the given symbol."""
+        if (token := self.current) is not None and token.text == text:
+            self.index += 1
+            return True
+
+        return False
+
+    def expect(self, text: str) -> None:
+        """Consumes the given symbol or raises a syntax error."""
+        if not self.accept(text):
+            raise self.error(f"Expected {text!r}")
+
+    def name(self) -> str:
+        """Consumes a name."""
+        if (token := self.current) is None or token.kind != "name":
+            raise self.error("Expected a name")
+
+        self.index += 1
+        return token.text
+
+    def end_of_statement(self) -> None:
+        """Consumes a semicolon, which is optional before } and EOF."""
+        if self.accept(";") or self.current is None or self.current.text == "}":
+            return
+
+        raise self.error("Expected ';'")
+
+    def body(self, name: str = "", *, nested: bool = False) -> ConfigClass:
+        """Parses statements until the end of the class or file."""
+        items: list[tuple[str, Value]] = []
+        arrays: dict[str, int] = {}
+
+        while (token := self.current) is not None:
+            if token.text == "}" and nested:
+                break
+
+            if self.accept(";"):
+                continue
+
+            if token.kind == "name" and token.text == "class":
+                self.index += 1
+                items.append(self.class_())
+                continue
+
+            key = self.name()
+
+            if self.accept("["):
+                self.expect("]")
+
+                if not (append := self.accept("+=")):
+                    self.expect("=")
+
+                values = self.array()
+
+                if append and (index := arrays.get(key.lower())) is not None:
+                    items[index] = (items[index][0], items[index][1] + values)
+                else:
+                    arrays[key.lower()] = len(items)
+                    items.append((key, values))
+            else:
+                self.expect("=")
+                items.append((key, self.value()))
+
+            self.end_of_statement()
+
+        return ConfigClass(name, items)
+
+    def class_(self) -> tuple[str, ConfigClass]:
+        """Parses a class definition after the class keyword."""
+        name = self.name()
+
+        if self.accept(":"):
+            self.name()
+
+        if self.accept("{"):
+            body = self.body(name, nested=True)
+            self.expect("}")
+        else:
+            body = ConfigClass(name)
+
+        self.end_of_statement()
+        return name, body
+
+    def array(self) -> tuple:
+        """Parses an array."""
+        self.expect("{")
+        elements = []
+
+        while not self.accept("}"):
+            if self.current is not None and self.current.text == "{":
+                elements.append(self.array())
+            else:
+                elements.append(self.value())
+
+            if not self.accept(","):
+                self.expect("}")
+                break
+
+        return tuple(elements)
+
+    def value(self) -> int | float | str:
+        """Parses a scalar value."""
+        if (token := self.current) is None:
+            raise self.error("Expected a value")
+
+        if token.kind == "string":
+            self.index += 1
+            return token.text[1:-1].replace('""', '"')
+
+        if token.kind == "number":
+            self.index += 1
+            return parse_number(token.text)
+
+        if token.kind == "name":
+            self.index += 1
+            return token.text
+
+        raise self.error("Expected a value")
+
+
+def parse_number(text: str) -> int | float:
+    """Parses an integer or floating point number."""
+
+    if text.lstrip("+-")[:2].lower() == "0x":
+        return int(text, 16)
+
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def tokenize(text: str) -> Iterator[Token]:
+    """Yields the tokens of the given config text."""
+
+    line = 1
+    position = 0
+
+    while position < len(text):
+        if (match := TOKENS.match(text, position)) is None:
+            raise CfgSyntaxError(f"Unexpected character {text[position]!r}", line)
+
+        # Preprocessor directives may only be preceded by indentation.
+        if (
+            match.lastgroup == "directive"
+            and text[text.rfind("\n", 0, position) + 1 : position].strip()
+        ):
+            raise CfgSyntaxError("Unexpected character '#'", line)
+
+        if match.lastgroup not in {"space", "comment", "directive"}:
+            yield Token(match.lastgroup, match.group(), line)
+
+        line += match.group().count("\n")
+        position = match.end()
 
 
 def parse_battleye_value(key: str, value: str) -> bool | int | str:
@@ -31,23 +306,48 @@ def parse_battleye_cfg(lines: Iterable[str]) -> Iterator[tuple[str, bool | int |
         yield key, parse_battleye_value(key, value)
 
 
-def server_cfg_to_ini(lines: Iterable[str]) -> Iterator[tuple[str, str]]:
-    """Yields lines of an INI-style representation of the server config."""
+def parse_server_cfg(text: str | Iterable[str]) -> ConfigClass:
+    """Parses the given server config."""
+
+    if not isinstance(text, str):
+        text = "".join(text)
+
+    return _Parser(tokenize(text)).body()
+
+
+def parse_server_cfg_lenient(lines: Iterable[str]) -> ConfigClass:
+    """Parses the top-level key / value pairs of the given server config.
+
+    Lines that are not simple assignments are skipped, so that
+    a broken config still yields settings such as maxPlayers.
+    """
+
+    items = []
 
     for line in lines:
-        if not (line := line.strip()):
-            continue
+        if match := fullmatch(r"(\w+)\s*=\s*(.+);.*", line.strip()):
+            key, value = match.groups()
+            items.append((key, value.strip('"')))
 
-        if not (match := fullmatch(r"^(\w+)\s*=\s*(.+);.*", line)):
-            continue
+    return ConfigClass(items=items)
+
+
+_SERVER_CFG_CACHE: dict[Path, tuple[int, int, ConfigClass]] = {}
+
+
+def load_server_cfg(file: Path) -> ConfigClass:
+    """Loads a server config, cached by the file's modification time and size."""
+
+    stat = file.stat()
 
-        key, value = match.groups()
-        yield key, value.strip('"')
+    if (cached := _SERVER_CFG_CACHE.get(file)) is not None:
+        mtime, size, config = cached
 
+        if mtime == stat.st_mtime_ns and size == stat.st_size:
+            return config
 
-def parse_server_cfg(lines: Iterable[str], *, section: str = "Server") -> SectionProxy:
-    """Yields key / value pairs of the given server config."""
+    with file.open("r", encoding="utf-8-sig") as text:
+        config = parse_server_cfg(text.read())
 
-    config = ConfigParser()
-    config.read_dict({section: dict(server_cfg_to_ini(lines))})
-    return config[section]
+    _SERVER_CFG_CACHE[file] = (stat.st_mtime_ns, stat.st_size, config)
+    return config
@@ -0,0 +1,287 @@
+"""Deduplicated mod updates of several servers."""
+
+from __future__ import annotations
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from logging import getLogger
+from os import link, stat
+from os.path import commonpath
+from pathlib import Path
+from shutil import copy2, copystat, rmtree
+from subprocess import CalledProcessError
+from typing import Iterable, NamedTuple
+
+from dzdsu.constants import MODS_DIR
+from dzdsu.constants import STEAMCMD
+from dzdsu.profiling import count
+from dzdsu.server import Server
+from dzdsu.journal import UpdateJournal
+from dzdsu.steamcmd import DEFAULT_BACKOFF, DEFAULT_STALL_TIMEOUT, download
+from dzdsu.steamcmd import workshop_activity
+from dzdsu.update import workshop_args
+
+
+__all__ = ["UpdatePlan", "default_staging_dir", "link_tree"]
+
+
+LOGGER = getLogger("dzdsu")
+FICLONE = 0x40049409
+
+
+class UpdatePlan(NamedTuple):
+    """Downloads each workshop item once and shares it among the servers.
+
+    Hardlinked files are shared by the staging directory and all servers.
+    Like a direct update, steamcmd's changes to them thus reach running
+    servers. dzdsu itself never writes to mod files in place: fixing paths
+    adds symlinks and keys are copied out of the mods.
+    """
+
+    staging_dir: Path
+    mods: dict[int, list[Server]]
+    sessions: int = 1
+
+    @classmethod
+    def from_servers(
+        cls, servers: Iterable[Server], staging_dir: Path, sessions: int = 1
+    ) -> UpdatePlan:
+        """Creates a plan for the union of the servers' mods to update."""
+        mods: dict[int, list[Server]] = {}
+
+        for server in servers:
+            for mod in server.mods_to_update:
+                mods.setdefault(mod.id, []).append(server)
+
+        return cls(staging_dir, dict(sorted(mods.items())), max(sessions, 1))
+
+    @property
+    def batches(self) -> list[list[int]]:
+        """Returns the workshop IDs to download per steamcmd session."""
+        batches: list[list[int]] = [[] for _ in range(self.sessions)]
+
+        for index, ident in enumerate(self.mods):
+            batches[index % self.sessions].append(ident)
+
+        return [batch for batch in batches if batch]
+
+    def session_dir(self, index: int) -> Path:
+        """Returns the install directory of the given session."""
+        return self.staging_dir / str(index)
+
+    def journal(
+        self, index: int, items: list[int], *, resume: bool = True
+    ) -> UpdateJournal:
+        """Returns the update journal of the given session's items."""
+        (session_dir := self.session_dir(index)).mkdir(parents=True, exist_ok=True)
+        journal = UpdateJournal(session_dir / ".update.journal.json", items)
+        return journal.load() if resume else journal
+
+    def source(self, ident: int) -> Path:
+        """Returns the staged directory of the given workshop item."""
+        index = list(self.mods).index(ident) % self.sessions
+        return self.session_dir(index) / MODS_DIR / str(ident)
+
+    def command(self, index: int, steam_user_name: str, items: list[int]) -> list[str]:
+        """Returns the steamcmd command of a session downloading the items."""
+        return [
+            STEAMCMD,
+            "+force_install_dir",
+            str(self.session_dir(index)),
+            "+login",
+            steam_user_name,
+            *workshop_args(items),
+            "+quit",
+        ]
+
+    def commands(self, steam_user_name: str) -> list[list[str]]:
+        """Returns the steamcmd commands of all sessions."""
+        return [
+            self.command(index, steam_user_name, batch)
+            for index, batch in enumerate(self.batches)
+        ]
+
+    def download(
+        self,
+        steam_user_name: str,
+        *,
+        retries: int = 1,
+        backoff: float = DEFAULT_BACKOFF,
+        stall_timeout: float | None = DEFAULT_STALL_TIMEOUT,
+        resume: bool = True,
+    ) -> None:
+        """Downloads all workshop items in parallel steamcmd sessions.
+
+        Each session retries only its failed items and
+        resumes from its journal if it was interrupted before.
+        """
+        with ThreadPoolExecutor(len(batches := self.batches) or 1) as executor:
+            transcripts = [
+                executor.submit(
+                    copy_context().run,
+                    download,
+                    lambda items, _, index=index: self.command(
+                        index, steam_user_name, items
+                    ),
+                    batch,
+                    retries=retries,
+                    backoff=backoff,
+                    stall_timeout=stall_timeout,
+                    activity=lambda index=index: workshop_activity(
+                        self.session_dir(index)
+                    ),
+                    journal=self.journal(index, batch, resume=resume),
+                )
+                for index, batch in enumerate(batches)
+            ]
+
+        for future, command in zip(transcripts, self.commands(steam_user_name)):
+            if not (transcript := future.result()).success:
+                raise CalledProcessError(transcript.returncode or 1, command)
+
+    def fan_out(self) -> Counter[str]:
+        """Links the staged workshop items into the servers' mod directories.
+
+        Returns how many files were reflinked, hardlinked, copied
+        or already up to date.
+        """
+        methods: Counter[str] = Counter()
+        staging_device = self.staging_dir.stat().st_dev
+
+        for server in {server for servers in self.mods.values() for server in servers}:
+            if server.base_dir.stat().st_dev != staging_device:
+                LOGGER.warning(
+                    "%s is on another file system than %s. Mods will be copied.",
+                    server.base_dir,
+                    self.staging_dir,
+                )
+
+        for ident, servers in self.mods.items():
+            if not (source := self.source(ident)).is_dir():
+                LOGGER.warning("Workshop item %i was not downloaded.", ident)
+                continue
+
+            for server in servers:
+                LOGGER.debug("Linking mod %i into %s.", ident, server.name)
+                methods += link_tree(source, server.mods_dir / str(ident))
+
+        return methods
+
+
+def default_staging_dir(servers: Iterable[Server]) -> Path:
+    """Returns a staging directory next to the servers' base directories.
+
+    It is thus likely on the same file system, so that mods can be linked.
+    """
+
+    parents = [server.base_dir.parent for server in servers]
+
+    if (common := Path(commonpath(parents))) == Path(common.anchor):
+        common = parents[0]
+
+    return common / ".workshop"
+
+
+def link_tree(source: Path, target: Path) -> Counter[str]:
+    """Replaces the target with a tree of links to the source's files.
+
+    Files are reflinked on file systems supporting copy-on-write,
+    hardlinked where possible and copied otherwise.
+    A target that already has the source's files is left alone.
+    """
+
+    if (files := _up_to_date(source, target)) is not None:
+        return Counter({"up to date": files})
+
+    tmp = target.with_name(f".{target.name}.tmp")
+    old = target.with_name(f".{target.name}.old")
+    methods: Counter[str] = Counter()
+
+    for stale in (tmp, old):
+        if stale.exists():
+            rmtree(stale)
+
+    for directory in [source, *filter(Path.is_dir, source.rglob("*"))]:
+        (tmp / directory.relative_to(source)).mkdir(parents=True, exist_ok=True)
+
+    for file in source.rglob("*"):
+        if not file.is_dir():
+            methods[_link_file(file, tmp / file.relative_to(source))] += 1
+            count()
+
+    if target.exists():
+        target.rename(old)
+
+    tmp.rename(target)
+
+    if old.exists():
+        rmtree(old)
+
+    return methods
+
+
+def _link_file(source: Path, target: Path) -> str:
+    """Reflinks, hardlinks or copies a file and returns the method used."""
+
+    try:
+        _reflink(source, target)
+    except OSError:
+        target.unlink(missing_ok=True)
+    else:
+        copystat(source, target)
+        return "reflinked"
+
+    try:
+        link(source, target)
+    except OSError:
+        pass
+    else:
+        return "hardlinked"
+
+    copy2(source, target)
+    return "copied"
+
+
+def _up_to_date(source: Path, target: Path) -> int | None:
+    """Returns the amount of files if the target has the source's files.
+
+    Files match if they are the same inode or have the same size and
+    modification time. Symlinks added by fixing paths are ignored.
+    """
+
+    if not target.is_dir():
+        return None
+
+    files = [file for file in source.rglob("*") if not file.is_dir()]
+
+    if len(files) != sum(
+        1 for file in target.rglob("*") if not file.is_symlink() and not file.is_dir()
+    ):
+        return None
+
+    for file in files:
+        try:
+            theirs = stat(target / file.relative_to(source), follow_symlinks=False)
+        except FileNotFoundError:
+            return None
+
+        ours = file.stat()
+
+        if (ours.st_dev, ours.st_ino) != (theirs.st_dev, theirs.st_ino) and (
+            ours.st_size != theirs.st_size or ours.st_mtime_ns != theirs.st_mtime_ns
+        ):
+            return None
+
+    return len(files)
+
+
+def _reflink(source: Path, target: Path) -> None:
+    """Clones a file on file systems supporting copy-on-write."""
+
+    try:
+        from fcntl import ioctl
+    except ImportError:
+        raise OSError("Reflinks are not supported on this system.") from None
+
+    with source.open("rb") as src, target.open("wb") as dst:
+        ioctl(dst.fileno(), FICLONE, src.fileno())
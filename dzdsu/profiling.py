@@ -0,0 +1,221 @@
+"""Lightweight timing of maintenance phases."""
+
+from __future__ import annotations
+from contextlib import nullcontext
+from contextvars import ContextVar, Token
+from logging import getLogger
+from pathlib import Path
+from threading import Lock, current_thread
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, ContextManager, Iterable, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+
+__all__ = ["PROFILER", "Profiler", "Span", "count", "span"]
+
+
+LOGGER = getLogger("dzdsu")
+NULL_SPAN = nullcontext()
+
+
+class Span(NamedTuple):
+    """A timed phase."""
+
+    name: str
+    server: Optional[str]
+    thread: str
+    start: float
+    duration: float
+    bytes: int
+    files: int
+    depth: int
+    profile: Optional[Path] = None
+
+    def to_json(self) -> dict[str, Any]:
+        """Returns a JSON-ish dict."""
+        return {
+            **self._asdict(),
+            "profile": None if self.profile is None else str(self.profile),
+        }
+
+
+class Profiler:
+    """Collects the spans of a run.
+
+    Phases named in capture are additionally profiled with cProfile,
+    whose statistics are written next to the timeline.
+    """
+
+    def __init__(self, file: Path, capture: Iterable[str] = ()):
+        from datetime import datetime
+
+        self.file = file
+        self.capture = frozenset(capture)
+        self.spans: list[Span] = []
+        self.started: datetime = datetime.now()
+        self.start = perf_counter()
+        self._lock = Lock()
+
+    def add(self, span: Span) -> None:
+        """Adds a finished span."""
+        with self._lock:
+            self.spans.append(span)
+
+    def profile_file(self, name: str, server: str | None) -> Path:
+        """Returns a new file for cProfile statistics."""
+        with self._lock:
+            index = sum(1 for span in self.spans if span.profile is not None)
+
+        return self.file.with_name(
+            f"{self.file.stem}.{name}.{server or 'all'}.{index}.prof"
+        )
+
+    def timeline(self) -> dict[str, Any]:
+        """Returns the timeline with totals per phase."""
+        totals: dict[str, dict[str, float]] = {}
+
+        for span in self.spans:
+            total = totals.setdefault(
+                span.name, {"count": 0, "duration": 0.0, "bytes": 0, "files": 0}
+            )
+            total["count"] += 1
+            total["duration"] += span.duration
+            total["bytes"] += span.bytes
+            total["files"] += span.files
+
+        return {
+            "started": self.started.isoformat(),
+            "duration": perf_counter() - self.start,
+            "spans": [
+                span.to_json() for span in sorted(self.spans, key=lambda s: s.start)
+            ],
+            "totals": totals,
+        }
+
+    def write(self) -> None:
+        """Writes the timeline to the file."""
+        from json import dump
+
+        with self.file.open("w", encoding="utf-8") as file:
+            dump(self.timeline(), file, indent=2)
+
+        LOGGER.info("Wrote profile to %s.", self.file)
+
+
+PROFILER: ContextVar[Profiler | None] = ContextVar("profiler", default=None)
+
+
+class _Recorder:
+    """Times a span and counts its bytes and files."""
+
+    def __init__(self, profiler: Profiler, name: str, server: str | None):
+        self.profiler = profiler
+        self.name = name
+        self.server = server
+        self.bytes = 0
+        self.files = 0
+        self.parent: _Recorder | None = None
+        self.start = 0.0
+        self._cprofile = None
+        self._token: Token | None = None
+
+    def __enter__(self):
+        self.parent = _CURRENT.get()
+        self._token = _CURRENT.set(self)
+
+        # Phases nested in a profiled phase are covered by its profile.
+        if self.name in self.profiler.capture and not self._profiled:
+            self._cprofile = _enable_cprofile()
+
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        duration = perf_counter() - self.start
+        profile = None
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            profile = self.profiler.profile_file(self.name, self.server)
+            self._cprofile.dump_stats(profile)
+
+        _CURRENT.reset(self._token)
+
+        if self.parent is not None:
+            self.parent.bytes += self.bytes
+            self.parent.files += self.files
+
+        self.profiler.add(
+            Span(
+                self.name,
+                self.server,
+                current_thread().name,
+                self.start - self.profiler.start,
+                duration,
+                self.bytes,
+                self.files,
+                self._depth,
+                profile,
+            )
+        )
+
+    @property
+    def _depth(self) -> int:
+        """Returns the number of enclosing spans."""
+        depth, parent = 0, self.parent
+
+        while parent is not None:
+            depth, parent = depth + 1, parent.parent
+
+        return depth
+
+    @property
+    def _profiled(self) -> bool:
+        """Determines whether an enclosing span is being profiled."""
+        parent = self.parent
+
+        while parent is not None:
+            if parent._cprofile is not None:
+                return True
+
+            parent = parent.parent
+
+        return False
+
+
+_CURRENT: ContextVar[_Recorder | None] = ContextVar("span", default=None)
+
+
+def span(name: str, server: str | None = None) -> ContextManager:
+    """Times a phase if profiling is enabled."""
+
+    if (profiler := PROFILER.get()) is None:
+        return NULL_SPAN
+
+    return _Recorder(profiler, name, server)
+
+
+def count(size: int = 0, files: int = 1) -> None:
+    """Adds processed bytes and files to the current span, if any."""
+
+    if (recorder := _CURRENT.get()) is not None:
+        recorder.bytes += size
+        recorder.files += files
+
+
+def _enable_cprofile():
+    """Starts a cProfile profiler or returns None if another one is active."""
+
+    from cProfile import Profile
+
+    profile = Profile()
+
+    try:
+        profile.enable()
+    except ValueError as error:
+        LOGGER.debug("Cannot profile: %s", error)
+        return None
+
+    return profile
@@ -1,46 +1,77 @@
 """Extended RCon client."""
 
-from time import sleep
+from asyncio import new_event_loop
+from typing import Any, Coroutine
+
+from dzdsu.aiorcon import AsyncClient
 
-from rcon import battleye
 
 __all__ = ["Client"]
 
 
-class Client(battleye.Client):
-    """RCon client with common methods."""
+class Client:
+    """Blocking RCon client with common methods.
+
+    Thin wrapper around an AsyncClient running on a private event loop.
+    """
+
+    def __init__(self, host: str, port: int, **kwargs):
+        self.async_client = AsyncClient(host, port, **kwargs)
+        self._loop = new_event_loop()
+
+    def __enter__(self):
+        try:
+            self._run(self.async_client.__aenter__())
+        except BaseException:
+            self._loop.close()
+            raise
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self._run(self.async_client.__aexit__(exc_type, exc_val, exc_tb))
+        finally:
+            self._loop.close()
+
+    def _run(self, coroutine: Coroutine) -> Any:
+        """Runs the coroutine on the client's event loop."""
+        return self._loop.run_until_complete(coroutine)
 
     def broadcast(self, message: str) -> str:
         """Broadcasts a message to all players."""
-        return self.say(-1, message)
+        return self._run(self.async_client.broadcast(message))
 
     def countdown(
-            self, template: str, countdown: int, *, every: int = 10,
-            always_below: int = 30
+        self, template: str, countdown: int, *, every: int = 10, always_below: int = 30
     ) -> None:
         """Notify users about shutdown."""
-        first = True
-
-        for passed in range(countdown):
-            remaining = countdown - passed
-
-            if first or remaining % every == 0 or remaining < always_below:
-                first = False
-                self.broadcast(template.format(remaining))
-
-            sleep(1)
+        self._run(
+            self.async_client.countdown(
+                template, countdown, every=every, always_below=always_below
+            )
+        )
 
     def kick(self, player: int | str, reason: str | None = None) -> str:
         """Kicks the respective player."""
-        if reason is None:
-            return self.run(f"kick {player}")
+        return self._run(self.async_client.kick(player, reason=reason))
+
+    def kick_all(self, max_players: int, reason: str | None = None) -> None:
+        """Kicks all player slots."""
+        self._run(self.async_client.kick_all(max_players, reason=reason))
+
+    def players(self) -> int:
+        """Returns the amount of connected players."""
+        return self._run(self.async_client.players())
 
-        return self.run(f"kick {player} {reason}")
+    def run(self, command: str, *args: str) -> str:
+        """Executes a command and returns the text message."""
+        return self._run(self.async_client.run(command, *args))
 
     def say(self, player: int | str, message: str) -> str:
         """Say something to a player."""
-        return self.run(f"say {player} {message}")
+        return self._run(self.async_client.say(player, message))
 
     def shutdown(self) -> str:
         """Shutdown the server."""
-        return self.run("#shutdown")
+        return self._run(self.async_client.shutdown())
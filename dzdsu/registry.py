@@ -0,0 +1,192 @@
+"""Lazy loading of the configured servers."""
+
+from __future__ import annotations
+from logging import getLogger
+from marshal import dumps, loads as unmarshal, version as marshal_version
+from os import replace
+from pathlib import Path
+from typing import Any, Iterator, Mapping
+from zlib import crc32
+
+from dzdsu.constants import CACHE_DIR, JSON_FILE
+from dzdsu.server import Server
+
+
+__all__ = ["ServerRegistry", "load_servers", "validate_servers_json"]
+
+
+CACHE_VERSION = (4, marshal_version)
+LOGGER = getLogger("dzdsu")
+
+
+class ServerRegistry(Mapping[str, Server]):
+    """Maps server names to servers, building each server on first access."""
+
+    def __init__(self, json: dict[str, dict[str, Any]]):
+        self.json = json
+        self._servers: dict[str, Server] = {}
+
+    def __getitem__(self, name: str) -> Server:
+        try:
+            return self._servers[name]
+        except KeyError:
+            server = self._servers[name] = Server.from_json(name, self.json[name])
+            return server
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.json)
+
+    def __len__(self) -> int:
+        return len(self.json)
+
+    def pinned(self) -> Iterator[Server]:
+        """Yields the servers to pin to dedicated cores in order.
+
+        Only those servers are built, so that placing them stays cheap
+        in large fleets.
+        """
+        for name, json in self.json.items():
+            if (json.get("scheduling") or {}).get("pin") and (
+                json.get("params") or {}
+            ).get("cpuCount"):
+                yield self[name]
+
+    @classmethod
+    def from_file(cls, file: Path, *, cache_dir: Path | None = CACHE_DIR):
+        """Loads the registry from a JSON file, using a compiled cache if given."""
+        if cache_dir is None:
+            return cls(parse_servers_json(file.read_bytes()))
+
+        return cls(load_cached(file, cache_dir))
+
+
+def load_servers(
+    file: Path = JSON_FILE, *, cache_dir: Path | None = CACHE_DIR
+) -> ServerRegistry:
+    """Loads servers."""
+
+    return ServerRegistry.from_file(file, cache_dir=cache_dir)
+
+
+def load_cached(file: Path, cache_dir: Path) -> dict[str, dict[str, Any]]:
+    """Loads the validated servers JSON from the compiled cache.
+
+    The cache is keyed by the source file's mtime and size. If those
+    changed, the content hash decides whether the cache is still valid.
+    """
+
+    stat = file.stat()
+    cache_file = cache_dir / f"servers-{crc32(str(file.absolute()).encode()):08x}.bin"
+
+    try:
+        version, mtime, size, digest, json = unmarshal(cache_file.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        # Missing, unreadable or incompatible cache.
+        version = mtime = size = digest = json = None
+
+    if version == CACHE_VERSION and (mtime, size) == (stat.st_mtime_ns, stat.st_size):
+        return json
+
+    from hashlib import sha1
+
+    source = file.read_bytes()
+
+    if version != CACHE_VERSION or sha1(source).digest() != digest:
+        json = parse_servers_json(source)
+
+    _write_cache(
+        cache_file,
+        (CACHE_VERSION, stat.st_mtime_ns, stat.st_size, sha1(source).digest(), json),
+    )
+    return json
+
+
+def _write_cache(cache_file: Path, entry: tuple) -> None:
+    """Atomically writes a cache entry, ignoring unwritable cache directories."""
+
+    tmp = cache_file.with_suffix(".tmp")
+
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(dumps(entry))
+        replace(tmp, cache_file)
+    except OSError as error:
+        LOGGER.debug("Could not write servers cache: %s", error)
+
+
+def parse_servers_json(source: bytes) -> dict[str, dict[str, Any]]:
+    """Parses and validates the servers JSON."""
+
+    from json import loads
+
+    return validate_servers_json(loads(source))
+
+
+def validate_servers_json(json: Any) -> dict[str, dict[str, Any]]:
+    """Validates the structure of the servers JSON."""
+
+    if not isinstance(json, dict):
+        raise ValueError("Servers JSON must be an object.")
+
+    for name, server in json.items():
+        if not isinstance(server, dict):
+            raise ValueError(f"Server {name!r} must be an object.")
+
+        if not isinstance(server.get("basedir"), str):
+            raise ValueError(f"Server {name!r} requires a basedir string.")
+
+        if not isinstance(server.get("params") or {}, dict):
+            raise ValueError(f"Parameters of server {name!r} must be an object.")
+
+        if not isinstance(scheduling := server.get("scheduling") or {}, dict):
+            raise ValueError(f"Scheduling of server {name!r} must be an object.")
+
+        if not isinstance(scheduling.get("pin", False), bool):
+            raise ValueError(f"pin of server {name!r} must be a boolean.")
+
+        for key in ("nice", "ionice"):
+            if not isinstance(scheduling.get(key, 0), int):
+                raise ValueError(f"{key} of server {name!r} must be an integer.")
+
+        _validate_restarts(name, server.get("restarts") or [])
+
+        for key in ("mods", "serverMods"):
+            if not isinstance(mods := server.get(key) or [], list):
+                raise ValueError(f"{key} of server {name!r} must be an array.")
+
+            for mod in mods:
+                if not isinstance(mod, (int, dict)) or isinstance(mod, bool):
+                    raise ValueError(f"Invalid mod in {key} of server {name!r}.")
+
+                if isinstance(mod, dict) and not isinstance(mod.get("id"), int):
+                    raise ValueError(f"Mod in {key} of server {name!r} lacks an ID.")
+
+    return json
+
+
+def _validate_restarts(name: str, restarts: Any) -> None:
+    """Validates the restart schedules of a server."""
+
+    from dzdsu.cron import CronExpression
+
+    if not isinstance(restarts, list):
+        raise ValueError(f"Restarts of server {name!r} must be an array.")
+
+    for restart in restarts:
+        if not isinstance(restart, dict) or not isinstance(restart.get("cron"), str):
+            raise ValueError(f"Restart of server {name!r} requires a cron string.")
+
+        try:
+            CronExpression.parse(restart["cron"])
+        except ValueError as error:
+            raise ValueError(f"Restart of server {name!r}: {error}") from None
+
+        if not isinstance(warnings := restart.get("warnings", []), list) or not all(
+            isinstance(warning, int) and warning > 0 for warning in warnings
+        ):
+            raise ValueError(
+                f"Restart warnings of server {name!r} must be positive integers."
+            )
+
+        if not isinstance(restart.get("message", ""), str):
+            raise ValueError(f"Restart message of server {name!r} must be a string.")
@@ -0,0 +1,192 @@
+"""Rolling restarts of several servers."""
+
+from __future__ import annotations
+from asyncio import FIRST_COMPLETED, Task, create_task, gather, run, sleep
+from asyncio import TimeoutError as AsyncTimeoutError
+from asyncio import to_thread, wait, wait_for
+from datetime import datetime, timedelta
+from logging import getLogger
+from typing import Iterable, NamedTuple, Optional
+
+from dzdsu.constants import MESSAGE_TEMPLATE_SHUTDOWN
+from dzdsu.health import PROBE_ERRORS, probe
+from dzdsu.server import Server
+
+
+__all__ = ["Restart", "RollingRestart"]
+
+
+LOGGER = getLogger("dzdsu")
+
+
+class Restart(NamedTuple):
+    """Timeline of a server's restart."""
+
+    name: str
+    players: Optional[int]
+    begin: datetime
+    down: Optional[datetime] = None
+    up: Optional[datetime] = None
+    error: Optional[str] = None
+    skipped: bool = False
+
+    def __str__(self) -> str:
+        players = "? players" if self.players is None else f"{self.players} players"
+
+        if self.skipped:
+            return f"{self.name}: {players}, skipped (not running)"
+
+        steps = [f"countdown {self.begin:%H:%M:%S}"]
+
+        if self.down is not None:
+            steps.append(f"down {self.down:%H:%M:%S}")
+
+        if self.up is not None:
+            steps.append(f"up {self.up:%H:%M:%S}")
+            steps.append(f"downtime {self.downtime.total_seconds():.1f} s")
+
+        if self.error is not None:
+            steps.append(self.error)
+
+        return f"{self.name}: {players}, {', '.join(steps)}"
+
+    @property
+    def downtime(self) -> timedelta | None:
+        """Returns the time between the server going down and being healthy."""
+        if self.down is None or self.up is None:
+            return None
+
+        return self.up - self.down
+
+    @property
+    def success(self) -> bool:
+        """Determines whether the server came back healthy."""
+        return self.error is None
+
+
+class RollingRestart:
+    """Restarts servers a few at a time, emptiest first.
+
+    The servers are expected to be started again by their wrapper or
+    service manager. Each restart is complete once the server answers
+    A2S and RCon again, which frees its slot for the next server.
+    """
+
+    def __init__(
+        self,
+        servers: Iterable[Server],
+        *,
+        batch: int = 1,
+        message: str = MESSAGE_TEMPLATE_SHUTDOWN,
+        countdown: int = 120,
+        timeout: float = 600.0,
+        interval: float = 5.0,
+    ):
+        self.servers = list(servers)
+        self.batch = max(batch, 1)
+        self.message = message
+        self.countdown = countdown
+        self.timeout = timeout
+        self.interval = interval
+
+    def run(self) -> list[Restart]:
+        """Restarts all servers and returns their timelines."""
+        return run(self.run_async())
+
+    async def run_async(self) -> list[Restart]:
+        """Restarts all servers and returns their timelines."""
+        pending = list(self.servers)
+        running: set[Task] = set()
+        restarts = []
+
+        while pending or running:
+            if pending and len(running) < self.batch:
+                counts = await self.player_counts(pending)
+                pending.sort(key=lambda server: _emptiness(counts[server.name]))
+
+                while pending and len(running) < self.batch:
+                    server = pending.pop(0)
+                    running.add(create_task(self.restart(server, counts[server.name])))
+
+            done, running = await wait(running, return_when=FIRST_COMPLETED)
+            restarts.extend(task.result() for task in done)
+
+        return sorted(restarts, key=lambda restart: restart.begin)
+
+    async def player_counts(self, servers: list[Server]) -> dict[str, int | None]:
+        """Returns the amount of players per server or None if unknown."""
+        counts = await gather(*(self._players(server) for server in servers))
+        return {server.name: count for server, count in zip(servers, counts)}
+
+    async def restart(self, server: Server, players: int | None = None) -> Restart:
+        """Restarts a server and waits for it to become healthy again.
+
+        Errors are recorded in the server's timeline,
+        so that they do not abort the restarts of the other servers.
+        """
+        restart = Restart(server.name, players, datetime.now())
+
+        try:
+            return await self._restart(server, restart)
+        except Exception as error:
+            LOGGER.error("%s: Restart failed: %s", server.name, error)
+            return restart._replace(error=str(error) or type(error).__name__)
+
+    async def _restart(self, server: Server, restart: Restart) -> Restart:
+        """Runs the restart sequence of a server."""
+        from dzdsu.utility.shutdown import shutdown_async
+
+        if (process := await to_thread(lambda: server.process)) is None:
+            LOGGER.info("%s: Not running. Skipping restart.", server.name)
+            return restart._replace(skipped=True)
+
+        LOGGER.info("%s: Restarting with %s players.", server.name, restart.players)
+
+        if not await shutdown_async(server, self.message, self.countdown):
+            return restart._replace(error="shutdown failed")
+
+        try:
+            await wait_for(self._await_exit(server, process), self.timeout)
+        except AsyncTimeoutError:
+            return restart._replace(error="did not stop")
+
+        restart = restart._replace(down=datetime.now())
+        LOGGER.info("%s: Stopped. Waiting for it to become healthy.", server.name)
+
+        try:
+            await wait_for(self._await_health(server), self.timeout)
+        except AsyncTimeoutError:
+            return restart._replace(error="did not become healthy")
+
+        restart = restart._replace(up=datetime.now())
+        LOGGER.info("%s: Healthy after %s.", server.name, restart.downtime)
+        return restart
+
+    async def _await_exit(self, server: Server, process) -> None:
+        """Waits for the server process to exit."""
+        while (current := await to_thread(lambda: server.process)) is not None:
+            if current.pid != process.pid:
+                return
+
+            await sleep(1)
+
+    async def _await_health(self, server: Server) -> None:
+        """Waits for the server to answer A2S and RCon."""
+        while not (await probe(server)).healthy:
+            await sleep(self.interval)
+
+    @staticmethod
+    async def _players(server: Server) -> int | None:
+        """Returns the amount of players on the server or None if unknown."""
+        try:
+            async with server.rcon_session(retries=0) as rcon:
+                return await rcon.players()
+        except (*PROBE_ERRORS, AsyncTimeoutError) as error:
+            LOGGER.warning("%s: Could not count players: %s", server.name, error)
+            return None
+
+
+def _emptiness(players: int | None) -> tuple[bool, int]:
+    """Sorts servers with few players first and unknown ones last."""
+
+    return players is None, players or 0
@@ -0,0 +1,152 @@
+"""Timed restarts of several servers on a single event loop."""
+
+from __future__ import annotations
+from asyncio import Task, create_task, run, sleep, to_thread
+from datetime import datetime, timedelta
+from heapq import heappop, heappush
+from itertools import count
+from logging import getLogger
+from time import time
+from typing import Iterable, NamedTuple
+
+from dzdsu.aiorcon import RCON_ERRORS
+from dzdsu.constants import MESSAGE_TEMPLATE_SHUTDOWN
+from dzdsu.cron import RestartSchedule
+from dzdsu.server import Server
+
+
+__all__ = ["RestartScheduler", "Timer"]
+
+
+LOGGER = getLogger("dzdsu")
+
+
+class Timer(NamedTuple):
+    """A pending warning or shutdown."""
+
+    when: float
+    seq: int
+    server: Server
+    schedule: RestartSchedule
+    restart: datetime
+    remaining: int
+
+    def __str__(self) -> str:
+        action = "restart" if self.remaining == 0 else f"warn ({self.remaining} s)"
+        return f"{self.server.name}: {action} at {datetime.fromtimestamp(self.when)}"
+
+
+class RestartScheduler:
+    """Drives the restart schedules of all servers from one timer heap.
+
+    Warnings are broadcast at their offsets before each restart, at which
+    the server is shut down via RCon. The servers are expected to be
+    started again by their wrapper or service manager.
+    """
+
+    def __init__(self, servers: Iterable[Server], *, max_sleep: float = 60.0):
+        self.servers = list(servers)
+        self.max_sleep = max_sleep
+        self.timers: list[Timer] = []
+        self._seq = count()
+        self._tasks: set[Task] = set()
+
+    def schedule(
+        self, server: Server, schedule: RestartSchedule, after: datetime
+    ) -> datetime:
+        """Adds timers for the next restart after the given time."""
+        restart = schedule.cron.next(after)
+
+        for remaining in (*schedule.warnings, 0):
+            if (when := restart - timedelta(seconds=remaining)) > after:
+                heappush(
+                    self.timers,
+                    Timer(
+                        when.timestamp(),
+                        next(self._seq),
+                        server,
+                        schedule,
+                        restart,
+                        remaining,
+                    ),
+                )
+
+        return restart
+
+    def run(self) -> None:
+        """Runs the schedules until interrupted."""
+        run(self.run_async())
+
+    async def run_async(self) -> None:
+        """Runs the schedules on the running event loop."""
+        now = datetime.now()
+
+        for server in self.servers:
+            for schedule in server.restarts:
+                restart = self.schedule(server, schedule, now)
+                LOGGER.info("%s: Next restart at %s.", server.name, restart)
+
+        if not self.timers:
+            LOGGER.warning("No restarts are scheduled.")
+
+        while self.timers:
+            # Wake up regularly to notice changes of the system clock.
+            if (delay := self.timers[0].when - time()) > 0:
+                await sleep(min(delay, self.max_sleep))
+                continue
+
+            timer = heappop(self.timers)
+
+            if timer.remaining == 0:
+                restart = self.schedule(timer.server, timer.schedule, timer.restart)
+                LOGGER.info("%s: Next restart at %s.", timer.server.name, restart)
+            elif timer.restart <= datetime.now():
+                LOGGER.debug("Skipping overdue timer %s.", timer)
+                continue
+
+            self._tasks.add(task := create_task(self.fire(timer)))
+            task.add_done_callback(self._tasks.discard)
+
+    async def fire(self, timer: Timer) -> None:
+        """Broadcasts a warning or shuts the server down."""
+        from dzdsu.utility.shutdown import shutdown_async
+
+        server = timer.server
+        message = timer.schedule.message or MESSAGE_TEMPLATE_SHUTDOWN
+
+        if timer.remaining:
+            try:
+                warning = message.format(_duration(timer.remaining))
+            except (IndexError, KeyError, ValueError) as error:
+                LOGGER.error("%s: Invalid restart message: %s", server.name, error)
+                return
+
+            try:
+                async with server.rcon_session() as rcon:
+                    await rcon.broadcast(warning)
+            except RCON_ERRORS as error:
+                LOGGER.warning("%s: Could not send warning: %s", server.name, error)
+
+            return
+
+        if not await to_thread(lambda: server.is_running):
+            LOGGER.info("%s: Not running. Skipping restart.", server.name)
+            return
+
+        LOGGER.info("%s: Restarting as scheduled.", server.name)
+
+        if not await shutdown_async(server, message, 0):
+            LOGGER.error("%s: Scheduled restart failed.", server.name)
+
+
+def _duration(seconds: int) -> str:
+    """Formats a duration for players."""
+
+    parts = []
+
+    for unit, length in (("hour", 3600), ("minute", 60), ("second", 1)):
+        if amount := seconds // length:
+            parts.append(f"{amount} {unit}{'s' if amount > 1 else ''}")
+            seconds %= length
+
+    return " ".join(parts)
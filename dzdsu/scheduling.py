@@ -0,0 +1,258 @@
+"""CPU placement and process priorities of co-located servers."""
+
+from __future__ import annotations
+from contextlib import suppress
+from logging import getLogger
+from os import cpu_count
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from dzdsu.server import Server
+
+
+__all__ = [
+    "Cpu",
+    "Placement",
+    "Scheduling",
+    "apply_scheduling",
+    "format_cpulist",
+    "parse_cpulist",
+    "place",
+    "read_topology",
+]
+
+
+LOGGER = getLogger("dzdsu")
+SYSFS = Path("/sys/devices/system")
+
+
+class Scheduling(NamedTuple):
+    """Scheduling settings of a server process."""
+
+    pin: bool = False
+    nice: Optional[int] = None
+    ionice: Optional[int] = None
+
+    @classmethod
+    def from_json(cls, json: dict):
+        """Creates a Scheduling instance from a JSON-ish dict."""
+        return cls(json.get("pin", False), json.get("nice"), json.get("ionice"))
+
+
+class Cpu(NamedTuple):
+    """A logical CPU."""
+
+    id: int
+    core: int
+    package: int = 0
+    node: int = 0
+
+
+class Placement(NamedTuple):
+    """CPUs assigned to a server."""
+
+    server: str
+    cpus: tuple[int, ...]
+    nodes: tuple[int, ...]
+
+    def __str__(self) -> str:
+        nodes = ", ".join(map(str, self.nodes))
+        return f"{self.server}: CPUs {format_cpulist(self.cpus)} (NUMA node {nodes})"
+
+
+def parse_cpulist(text: str) -> list[int]:
+    """Parses a kernel CPU list such as 0-3,8,10-11."""
+
+    cpus = []
+
+    for item in text.strip().split(","):
+        if not item:
+            continue
+
+        first, _, last = item.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+
+    return cpus
+
+
+def format_cpulist(cpus: Iterable[int]) -> str:
+    """Formats CPUs as a kernel CPU list."""
+
+    ranges: list[list[int]] = []
+
+    for cpu in sorted(cpus):
+        if ranges and ranges[-1][1] == cpu - 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+
+    return ",".join(
+        str(first) if first == last else f"{first}-{last}" for first, last in ranges
+    )
+
+
+def read_topology(sysfs: Path = SYSFS) -> list[Cpu]:
+    """Reads the online CPUs, their cores and NUMA nodes from sysfs.
+
+    Falls back to one core per CPU on a single node if sysfs is unavailable.
+    """
+
+    try:
+        online = parse_cpulist((sysfs / "cpu" / "online").read_text())
+    except OSError:
+        return [Cpu(cpu, cpu) for cpu in range(cpu_count() or 1)]
+
+    nodes = {}
+
+    for node in sysfs.glob("node/node[0-9]*"):
+        try:
+            cpulist = parse_cpulist((node / "cpulist").read_text())
+        except OSError:
+            continue
+
+        nodes.update(dict.fromkeys(cpulist, int(node.name[4:])))
+
+    cpus = []
+
+    for cpu in online:
+        topology = sysfs / "cpu" / f"cpu{cpu}" / "topology"
+
+        if (core := _read_int(topology, "core_id")) < 0:
+            core = cpu
+
+        package = max(_read_int(topology, "physical_package_id"), 0)
+        cpus.append(Cpu(cpu, core, package, nodes.get(cpu, 0)))
+
+    return cpus
+
+
+def place(
+    servers: Iterable[Server], cpus: Iterable[Cpu] | None = None
+) -> dict[str, Placement]:
+    """Assigns disjoint physical cores to the servers.
+
+    Each server with a CPU count gets as many physical cores, including
+    their SMT siblings, preferably on a single NUMA node.
+    Servers are placed in order and left unpinned if no cores are left.
+    """
+
+    cores: dict[tuple[int, int], list[Cpu]] = {}
+
+    for cpu in read_topology() if cpus is None else cpus:
+        cores.setdefault((cpu.package, cpu.core), []).append(cpu)
+
+    free: dict[int, list[tuple[int, ...]]] = {}
+
+    for siblings in sorted(cores.values(), key=lambda siblings: siblings[0].id):
+        free.setdefault(siblings[0].node, []).append(tuple(cpu.id for cpu in siblings))
+
+    placements = {}
+
+    for server in servers:
+        if not server.scheduling.pin or not (count := server.params.cpu_count):
+            continue
+
+        if sum(map(len, free.values())) < count:
+            LOGGER.warning("Not enough free cores to pin server %s.", server.name)
+            continue
+
+        taken = _take(free, count)
+        placements[server.name] = Placement(
+            server.name,
+            tuple(sorted(cpu for _, core in taken for cpu in core)),
+            tuple(sorted({node for node, _ in taken})),
+        )
+
+    return placements
+
+
+def _take(
+    free: dict[int, list[tuple[int, ...]]], count: int
+) -> list[tuple[int, tuple[int, ...]]]:
+    """Takes the given amount of free cores, preferring a single NUMA node.
+
+    Picks the node with the fewest free cores that fits all of them.
+    Otherwise, takes cores from the nodes with the most free cores first.
+    """
+
+    fitting = min(
+        (node for node, cores in free.items() if len(cores) >= count),
+        key=lambda node: len(free[node]),
+        default=None,
+    )
+    nodes = (
+        [fitting]
+        if fitting is not None
+        else sorted(free, key=lambda node: len(free[node]), reverse=True)
+    )
+    taken = []
+
+    for node in nodes:
+        while free[node] and len(taken) < count:
+            taken.append((node, free[node].pop(0)))
+
+    return taken
+
+
+def apply_scheduling(
+    pid: int, scheduling: Scheduling, placement: Placement | None = None
+) -> None:
+    """Applies CPU affinity and priorities to the given process."""
+
+    from psutil import Error, Process
+
+    process = Process(pid)
+
+    if placement is not None:
+        try:
+            process.cpu_affinity(list(placement.cpus))
+
+            # Threads spawned before pinning keep their affinity on Linux.
+            if hasattr(process, "threads"):
+                _pin_threads(process, placement.cpus)
+        except (AttributeError, Error, OSError) as error:
+            LOGGER.warning("Could not set CPU affinity: %s", error)
+        else:
+            LOGGER.info("Pinned %s", placement)
+
+    if scheduling.nice is not None:
+        try:
+            process.nice(scheduling.nice)
+        except (Error, OSError) as error:
+            LOGGER.warning("Could not set nice value: %s", error)
+
+    if scheduling.ionice is not None:
+        try:
+            from psutil import IOPRIO_CLASS_BE
+        except ImportError:
+            LOGGER.warning("I/O priorities are not supported on this system.")
+            return
+
+        try:
+            process.ionice(IOPRIO_CLASS_BE, scheduling.ionice)
+        except (Error, OSError, ValueError) as error:
+            LOGGER.warning("Could not set I/O priority: %s", error)
+
+
+def _pin_threads(process, cpus: Iterable[int]) -> None:
+    """Pins the already running threads of the process."""
+
+    try:
+        from os import sched_setaffinity
+    except ImportError:
+        return
+
+    for thread in process.threads():
+        if thread.id != process.pid:
+            with suppress(OSError):
+                sched_setaffinity(thread.id, cpus)
+
+
+def _read_int(directory: Path, name: str) -> int:
+    """Reads an integer from a sysfs file."""
+
+    try:
+        return int((directory / name).read_text())
+    except (OSError, ValueError):
+        return -1
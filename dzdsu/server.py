@@ -1,34 +1,43 @@
 """Server representation and related operations."""
 
 from __future__ import annotations
-from configparser import SectionProxy
-from contextlib import suppress
-from hashlib import sha1
+from contextlib import asynccontextmanager, suppress
 from itertools import chain
-from json import dump, load
+from logging import getLogger
 from pathlib import Path
-from typing import Any, Iterator, NamedTuple
+from typing import TYPE_CHECKING, AsyncIterator, Iterator, NamedTuple
 
-from psutil import AccessDenied, process_iter
-
-from dzdsu.constants import BATTLEYE_GLOB
 from dzdsu.constants import DAYZ_SERVER_APP_ID
-from dzdsu.constants import JSON_FILE
 from dzdsu.constants import MODS_DIR
 from dzdsu.constants import PROCESS_NAME
 from dzdsu.constants import SERVER_EXECUTABLE
-from dzdsu.hash import hash_changed
+from dzdsu.constants import STEAM_QUERY_PORT
+from dzdsu.cron import RestartSchedule
+from dzdsu.hash import hash_changed, sha1_file
 from dzdsu.lockfile import LockFile
 from dzdsu.mission import Mission
 from dzdsu.mods import Mod, InstalledMod, mods_str
 from dzdsu.params import ServerParams
-from dzdsu.parsers import parse_battleye_cfg, parse_server_cfg
-from dzdsu.rcon import Client
+from dzdsu.profiling import span
+from dzdsu.scheduling import Scheduling
+
+if TYPE_CHECKING:
+    from psutil import Process
+
+    from dzdsu.aiorcon import AsyncClient
+    from dzdsu.battleye import BattlEyeConfig
+    from dzdsu.parsers import ConfigClass
+    from dzdsu.rcon import Client
+    from dzdsu.registry import load_servers
+    from dzdsu.usage import UsageIndex
 
 
 __all__ = ["Server", "load_servers"]
 
 
+PIDS: dict[Path, int] = {}
+
+
 class Server(NamedTuple):
     """A server."""
 
@@ -39,6 +48,8 @@ class Server(NamedTuple):
     mods: list[Mod]
     server_mods: list[Mod]
     params: ServerParams
+    scheduling: Scheduling = Scheduling()
+    restarts: tuple[RestartSchedule, ...] = ()
 
     @classmethod
     def from_json(cls, name: str, json: dict):
@@ -51,22 +62,31 @@ class Server(NamedTuple):
             [Mod.from_value(mod) for mod in (json.get("mods") or [])],
             [Mod.from_value(mod) for mod in (json.get("serverMods") or [])],
             ServerParams.from_json(json.get("params") or {}),
+            Scheduling.from_json(json.get("scheduling") or {}),
+            tuple(
+                RestartSchedule.from_json(restart)
+                for restart in (json.get("restarts") or [])
+            ),
         )
 
     @property
-    def battleye_cfg(self) -> dict[str, str | int | bool]:
+    def adm_index_file(self) -> Path:
+        """Returns the admin log index database."""
+        return self.base_dir / ".admlog.sqlite"
+
+    @property
+    def battleye_cfg(self) -> BattlEyeConfig:
         """Returns the BattlEye RCon configuration."""
-        with self.battleye_cfg_file.open("r", encoding="utf-8") as file:
-            return dict(parse_battleye_cfg(file))
+        from dzdsu.battleye import load_battleye_cfg
+
+        return load_battleye_cfg(self.battleye_cfg_file)
 
     @property
     def battleye_cfg_file(self) -> Path:
         """Returns the BattlEye RCon config file."""
-        for path in self.battleye_dir.glob(BATTLEYE_GLOB):
-            if path.is_file():
-                return path
+        from dzdsu.battleye import resolve_battleye_cfg
 
-        raise FileNotFoundError(BATTLEYE_GLOB)
+        return resolve_battleye_cfg(self.battleye_dir)
 
     @property
     def battleye_dir(self) -> Path:
@@ -79,10 +99,24 @@ class Server(NamedTuple):
         return [str(self.executable_path), *self.executable_args]
 
     @property
-    def config(self) -> SectionProxy:
-        """Returns the configuration settings."""
-        with self.config_file.open("r", encoding="utf-8") as file:
-            return parse_server_cfg(file)
+    def config(self) -> ConfigClass:
+        """Returns the configuration settings.
+
+        Configs with syntax errors are parsed leniently,
+        so that kicking players and shutting down still work.
+        """
+        from dzdsu.parsers import CfgSyntaxError, load_server_cfg
+        from dzdsu.parsers import parse_server_cfg_lenient
+
+        try:
+            return load_server_cfg(self.config_file)
+        except CfgSyntaxError as error:
+            getLogger("dzdsu").warning(
+                "Parsing %s leniently: %s", self.config_file, error
+            )
+
+        with self.config_file.open("r", encoding="utf-8-sig") as file:
+            return parse_server_cfg_lenient(file)
 
     @property
     def config_file(self) -> Path:
@@ -127,20 +161,26 @@ class Server(NamedTuple):
     @property
     def hashes(self) -> dict[str, str]:
         """Returns the server's and its mods' hashes."""
-        return {
-            "server": self.sha1sum,
-            **{
-                str(installed_mod.mod.id): installed_mod.sha1sum
-                for installed_mod in self.installed_mods
-                if installed_mod.mod.enabled
-            },
-        }
+        with span("hash", self.name):
+            return {
+                "server": self.sha1sum,
+                **{
+                    str(installed_mod.mod.id): installed_mod.sha1sum
+                    for installed_mod in self.installed_mods
+                    if installed_mod.mod.enabled
+                },
+            }
 
     @property
     def hashes_file(self) -> Path:
         """Returns a hashes file."""
         return self.base_dir / ".hashes.json"
 
+    @property
+    def host(self) -> str:
+        """Returns the host address of the server."""
+        return "127.0.0.1" if self.params.ip is None else str(self.params.ip)
+
     @property
     def installed_mods(self) -> Iterator[InstalledMod]:
         """Yields installed mods."""
@@ -166,14 +206,17 @@ class Server(NamedTuple):
     @property
     def is_running(self) -> bool:
         """Determines whether the executable is running."""
-        for process in process_iter():
-            if process.name() == PROCESS_NAME:
-                with suppress(AccessDenied):
-                    for file in process.open_files():
-                        if Path(file.path).is_relative_to(self.base_dir):
-                            return True
+        return self.process is not None
 
-        return False
+    @property
+    def logs_dir(self) -> Path:
+        """Returns the directory containing the server's logs."""
+        return self.profiles_dir or self.base_dir
+
+    @property
+    def max_players(self) -> int:
+        """Returns the maximum amount of players."""
+        return self.config.getint("maxPlayers")
 
     @property
     def mods_dir(self) -> Path:
@@ -190,11 +233,47 @@ class Server(NamedTuple):
         """Checks whether the server needs a restart."""
         return hash_changed(self.hashes, self.load_hashes())
 
+    @property
+    def process(self) -> Process | None:
+        """Returns the running server process.
+
+        The PID of the last found process is cached, so that the
+        process list is only scanned if the server was restarted.
+        """
+        from psutil import NoSuchProcess, Process, process_iter
+
+        if (pid := PIDS.get(self.base_dir)) is not None:
+            with suppress(NoSuchProcess):
+                if self._owns(process := Process(pid)):
+                    return process
+
+            PIDS.pop(self.base_dir, None)
+
+        for process in process_iter():
+            with suppress(NoSuchProcess):
+                if self._owns(process):
+                    PIDS[self.base_dir] = process.pid
+                    return process
+
+        return None
+
+    @property
+    def profiles_dir(self) -> Path | None:
+        """Returns the profiles directory, if configured."""
+        if self.params.profiles is None:
+            return None
+
+        return self.base_dir / self.params.profiles
+
+    @property
+    def query_port(self) -> int:
+        """Returns the Steam query port."""
+        return self.config.getint("steamQueryPort", fallback=STEAM_QUERY_PORT)
+
     @property
     def sha1sum(self) -> str:
         """Returns the SHA-1 checksum."""
-        with self.executable_path.open("rb") as file:
-            return sha1(file.read()).hexdigest()
+        return sha1_file(self.executable_path)
 
     @property
     def unused_mods(self) -> Iterator[InstalledMod]:
@@ -205,12 +284,22 @@ class Server(NamedTuple):
             if installed_mod.mod.id not in used_ids:
                 yield installed_mod
 
+    @property
+    def update_journal_file(self) -> Path:
+        """Returns the journal file of interrupted updates."""
+        return self.base_dir / ".update.journal.json"
+
     @property
     def update_lockfile(self) -> LockFile:
-        """Returns the path to the update lock file."""
-        return LockFile(
-            self.base_dir / ".update.lck", reason="Server update.", override=True
-        )
+        """Returns the exclusive update lock."""
+        return LockFile(self.base_dir / ".update.lck", reason="Server update.")
+
+    @property
+    def usage_index(self) -> UsageIndex:
+        """Returns the disk usage index of the mods and missions."""
+        from dzdsu.usage import UsageIndex
+
+        return UsageIndex(self.base_dir / ".usage.json", self.base_dir)
 
     def chdir(self, base_dir: Path) -> Server:
         """Returns a server copy with a changed base dir."""
@@ -222,6 +311,8 @@ class Server(NamedTuple):
             self.mods,
             self.server_mods,
             self.params,
+            self.scheduling,
+            self.restarts,
         )
 
     def countdown(self, template: str, countdown: int = 120) -> None:
@@ -240,11 +331,12 @@ class Server(NamedTuple):
     def kick_all(self, reason: str | None = None) -> None:
         """Kick all players."""
         with self.rcon() as rcon:
-            for player in range(self.config.getint("maxPlayers")):
-                rcon.kick(player, reason=reason)
+            rcon.kick_all(self.max_players, reason=reason)
 
     def load_hashes(self) -> dict[str, str]:
         """Loads hashes for the server."""
+        from json import load
+
         try:
             with self.hashes_file.open("rb") as file:
                 return load(file)
@@ -255,15 +347,66 @@ class Server(NamedTuple):
         """Returns the path to the respective mission."""
         return Mission(self.mpmissions / name)
 
-    def rcon(self, timeout: float | None = 1.0):
+    def async_rcon(self, timeout: float | None = 1.0) -> AsyncClient:
+        """Returns an asynchronous RCon client."""
+        from dzdsu.aiorcon import AsyncClient
+
+        return AsyncClient(
+            (config := self.battleye_cfg).ip,
+            config.port,
+            passwd=config.password,
+            timeout=timeout,
+        )
+
+    def rcon(self, timeout: float | None = 1.0) -> Client:
         """Returns an RCon client."""
+        from dzdsu.rcon import Client
+
         return Client(
-            (config := self.battleye_cfg).get("RConIP", "127.0.0.1"),
-            config.get("RConPort", 2302),
-            passwd=config["RConPassword"],
+            (config := self.battleye_cfg).ip,
+            config.port,
+            passwd=config.password,
             timeout=timeout,
         )
 
+    @asynccontextmanager
+    async def rcon_session(
+        self, timeout: float | None = 1.0, *, retries: int = 2, backoff: float = 1.0
+    ) -> AsyncIterator[AsyncClient]:
+        """Yields one authenticated RCon session, retrying the login with backoff."""
+        from asyncio import sleep
+
+        for attempt in range(retries + 1):
+            client = self.async_rcon(timeout)
+            logged_in = False
+
+            try:
+                await client.connect(login=True)
+                logged_in = True
+            except (ConnectionError, TimeoutError) as error:
+                if attempt >= retries:
+                    raise
+
+                getLogger("dzdsu").debug(
+                    "RCon login failed: %s. Retrying in %.1f s.",
+                    error,
+                    delay := backoff * 2**attempt,
+                )
+            finally:
+                # Also close the socket if the password was wrong.
+                if not logged_in:
+                    client.close()
+
+            if logged_in:
+                break
+
+            await sleep(delay)
+
+        try:
+            yield client
+        finally:
+            client.close()
+
     def shutdown(self) -> None:
         """Shutdown the server."""
         with self.rcon() as rcon:
@@ -271,21 +414,32 @@ class Server(NamedTuple):
 
     def update_hashes(self) -> None:
         """Updates the hashes file."""
+        from json import dump
+
         with self.hashes_file.open("w", encoding="utf-8") as file:
             dump(self.hashes, file)
 
+    def _owns(self, process: Process) -> bool:
+        """Determines whether the process is this server's executable."""
+        from psutil import AccessDenied
+
+        if process.name() != PROCESS_NAME:
+            return False
+
+        with suppress(AccessDenied):
+            for file in process.open_files():
+                if Path(file.path).is_relative_to(self.base_dir):
+                    return True
+
+        return False
 
-def load_servers(file: Path = JSON_FILE) -> dict[str, Server]:
-    """Loads servers."""
 
-    return {
-        name: Server.from_json(name, json)
-        for name, json in load_servers_json(file).items()
-    }
+def __getattr__(name: str):
+    """Lazily re-exports load_servers(), which moved to dzdsu.registry."""
 
+    if name == "load_servers":
+        from dzdsu.registry import load_servers
 
-def load_servers_json(file: Path) -> dict[str, Any]:
-    """Loads servers from a JSON file."""
+        return load_servers
 
-    with file.open("rb") as json:
-        return load(json)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
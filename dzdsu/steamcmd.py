@@ -0,0 +1,451 @@
+"""Structured output of steamcmd sessions."""
+
+from __future__ import annotations
+import sys
+from contextvars import copy_context
+from logging import getLogger
+from os import walk
+from pathlib import Path
+from queue import Empty, Queue
+from re import IGNORECASE, compile
+from subprocess import PIPE, STDOUT, Popen
+from threading import Thread
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Callable, Iterable, NamedTuple, Optional, TextIO
+
+from dzdsu.constants import DOWNLOADS_DIR
+from dzdsu.profiling import count
+
+if TYPE_CHECKING:
+    from dzdsu.journal import UpdateJournal
+
+
+__all__ = [
+    "Event",
+    "ItemResult",
+    "SteamCmdParser",
+    "Transcript",
+    "download",
+    "run_steamcmd",
+    "workshop_activity",
+]
+
+
+LOGGER = getLogger("dzdsu")
+DEFAULT_BACKOFF = 30
+DEFAULT_STALL_TIMEOUT = 600
+
+ITEM_START = compile(r"^\s*Downloading item (\d+)")
+ITEM_SUCCESS = compile(
+    r"Success\. Downloaded item (\d+) to .*?(?:\((\d+) bytes\))?\s*$", IGNORECASE
+)
+ITEM_FAILURE = compile(r"Download item (\d+) failed \(([^)]*)\)", IGNORECASE)
+ITEM_TIMEOUT = compile(r"Timeout downloading item (\d+)", IGNORECASE)
+APP_PROGRESS = compile(
+    r"Update state \(0x[0-9a-f]+\) ([^,]+), progress: ([\d.]+) \((\d+) / (\d+)\)",
+    IGNORECASE,
+)
+APP_SUCCESS = compile(r"Success! App '(\d+)'", IGNORECASE)
+APP_FAILURE = compile(r"Error! App '(\d+)' (.*)$", IGNORECASE)
+
+Activity = Callable[[], object]
+Listener = Callable[["Event"], None]
+CommandFactory = Callable[[list[int], bool], list[str]]
+
+
+class Event(NamedTuple):
+    """A progress event of an app or workshop item."""
+
+    kind: str
+    item: int
+    time: float
+    workshop: bool = True
+    bytes: Optional[int] = None
+    total: Optional[int] = None
+    reason: Optional[str] = None
+
+    def __str__(self) -> str:
+        item = f"{'Workshop item' if self.workshop else 'App'} {self.item}"
+
+        if self.kind == "progress":
+            return f"{item}: {self.reason} {self.bytes} / {self.total} bytes"
+
+        if self.kind == "failure":
+            return f"{item}: Failed ({self.reason})"
+
+        return f"{item}: {self.kind.capitalize()}"
+
+
+class ItemResult(NamedTuple):
+    """The outcome of an app or workshop item download."""
+
+    item: int
+    success: bool
+    duration: Optional[float]
+    workshop: bool = True
+    bytes: Optional[int] = None
+    reason: Optional[str] = None
+
+    def __str__(self) -> str:
+        item = f"{'Workshop item' if self.workshop else 'App'} {self.item}"
+
+        if not self.success:
+            return f"{item} failed: {self.reason}"
+
+        if self.duration is None or self.bytes is None:
+            return f"{item} downloaded."
+
+        return (
+            f"{item} downloaded: {self.bytes / 2**20:.1f} MiB in"
+            f" {self.duration:.1f} s ({self.rate / 2**20:.1f} MiB/s)"
+        )
+
+    @property
+    def rate(self) -> float:
+        """Returns the download rate in bytes per second."""
+        if not self.duration or self.bytes is None:
+            return 0.0
+
+        return self.bytes / self.duration
+
+
+class SteamCmdParser:
+    """Parses steamcmd output line by line into events and results.
+
+    The parser does not depend on a running process,
+    so that it can be fed recorded transcripts.
+    """
+
+    def __init__(self, clock: Callable[[], float] = monotonic):
+        self.clock = clock
+        self.current: tuple[int, bool] | None = None
+        self.started: dict[tuple[int, bool], float] = {}
+        self.results: dict[int, ItemResult] = {}
+
+    def feed(self, line: str) -> Event | None:
+        """Parses a line of output."""
+        now = self.clock()
+
+        if match := ITEM_SUCCESS.search(line):
+            size = None if match.group(2) is None else int(match.group(2))
+            return self._finish(int(match.group(1)), True, now, size)
+
+        if match := ITEM_FAILURE.search(line):
+            return self._finish(int(match.group(1)), True, now, reason=match.group(2))
+
+        if match := ITEM_TIMEOUT.search(line):
+            return self._finish(int(match.group(1)), True, now, reason="Timeout")
+
+        if match := ITEM_START.search(line):
+            return self._start(int(match.group(1)), True, now)
+
+        if match := APP_PROGRESS.search(line):
+            if self.current is None or self.current[1]:
+                return None
+
+            if self.current not in self.started:
+                self.started[self.current] = now
+
+            return Event(
+                "progress",
+                self.current[0],
+                now,
+                False,
+                int(match.group(3)),
+                int(match.group(4)),
+                match.group(1).strip(),
+            )
+
+        if match := APP_SUCCESS.search(line):
+            return self._finish(int(match.group(1)), False, now)
+
+        if match := APP_FAILURE.search(line):
+            return self._finish(int(match.group(1)), False, now, reason=match.group(2))
+
+        return None
+
+    def parse(self, lines: Iterable[str]) -> list[Event]:
+        """Parses several lines of output."""
+        return [event for line in lines if (event := self.feed(line)) is not None]
+
+    def expect_app(self, app_id: int) -> None:
+        """Announces an app update, since steamcmd does not."""
+        self.current = (app_id, False)
+
+    def stall(self) -> Event | None:
+        """Fails the item currently in progress, if any."""
+        if self.current is None:
+            return None
+
+        return self._finish(*self.current, self.clock(), reason="Stalled")
+
+    def _start(self, item: int, workshop: bool, now: float) -> Event:
+        """Records the start of a download."""
+        self.current = (item, workshop)
+        self.started[self.current] = now
+        return Event("start", item, now, workshop)
+
+    def _finish(
+        self,
+        item: int,
+        workshop: bool,
+        now: float,
+        size: int | None = None,
+        reason: str | None = None,
+    ) -> Event:
+        """Records the outcome of a download."""
+        started = self.started.pop((item, workshop), None)
+        self.results[item] = ItemResult(
+            item,
+            reason is None,
+            None if started is None else now - started,
+            workshop,
+            size,
+            reason,
+        )
+
+        if self.current == (item, workshop):
+            self.current = None
+
+        return Event(
+            "failure" if reason else "success", item, now, workshop, size, None, reason
+        )
+
+
+class Transcript(NamedTuple):
+    """The outcome of a steamcmd session."""
+
+    returncode: int
+    results: dict[int, ItemResult]
+    stalled: bool = False
+
+    @property
+    def failed(self) -> list[int]:
+        """Returns the failed workshop items."""
+        return [
+            result.item
+            for result in self.results.values()
+            if result.workshop and not result.success
+        ]
+
+    @property
+    def success(self) -> bool:
+        """Determines whether the session and all its items succeeded."""
+        return (
+            self.returncode == 0
+            and not self.stalled
+            and all(result.success for result in self.results.values())
+        )
+
+
+def run_steamcmd(
+    command: list[str],
+    *,
+    app_id: int | None = None,
+    stall_timeout: float | None = DEFAULT_STALL_TIMEOUT,
+    activity: Activity | None = None,
+    listener: Listener | None = None,
+    echo: bool = True,
+) -> Transcript:
+    """Runs steamcmd, parsing its output as it is written.
+
+    The session is killed if it writes no output for stall_timeout seconds.
+    steamcmd writes nothing while downloading a workshop item, so the
+    session is not considered stalled while the activity probe's value changes.
+    """
+
+    parser = SteamCmdParser()
+    listener = listener or _log
+    lines: Queue[str | None] = Queue()
+    stalled = False
+    last_activity = None if activity is None else activity()
+
+    if app_id is not None:
+        parser.expect_app(app_id)
+
+    LOGGER.debug("Executing: %s", command)
+    process = Popen(command, stdout=PIPE, stderr=STDOUT, bufsize=0)
+    Thread(
+        target=copy_context().run,
+        args=(_read, process, lines, sys.stdout if echo else None),
+        daemon=True,
+    ).start()
+
+    while True:
+        try:
+            line = lines.get(timeout=stall_timeout)
+        except Empty:
+            if activity is not None and (current := activity()) != last_activity:
+                LOGGER.debug("steamcmd is still downloading.")
+                last_activity = current
+                continue
+
+            LOGGER.error("steamcmd wrote nothing for %s seconds.", stall_timeout)
+            stalled = True
+            process.kill()
+
+            if (event := parser.stall()) is not None:
+                listener(event)
+
+            break
+
+        if line is None:
+            break
+
+        if (event := parser.feed(line)) is not None:
+            listener(event)
+
+    return Transcript(process.wait(), parser.results, stalled)
+
+
+def download(
+    command: CommandFactory,
+    items: Iterable[int],
+    *,
+    app_id: int | None = None,
+    retries: int = 1,
+    backoff: float = DEFAULT_BACKOFF,
+    stall_timeout: float | None = DEFAULT_STALL_TIMEOUT,
+    activity: Activity | None = None,
+    journal: UpdateJournal | None = None,
+) -> Transcript:
+    """Downloads an app and workshop items, retrying only failed ones.
+
+    The command factory returns the steamcmd command for the given
+    workshop items and whether to update the app.
+    Retries wait exponentially longer, starting at backoff seconds.
+    With a journal, items that completed in an earlier run are skipped
+    and the outcome of each item is recorded as soon as it is known.
+    """
+
+    pending = list(items)
+    results: dict[int, ItemResult] = {}
+    listener = _log
+
+    if journal is not None:
+        if skipped := len(pending) - len(pending := journal.pending(pending)):
+            LOGGER.info("Resuming update, skipping %i completed items.", skipped)
+
+        if app_id is not None and journal.done(app_id):
+            LOGGER.info("Resuming update, skipping completed app update.")
+            app_id = None
+
+        if not pending and app_id is None:
+            journal.remove()
+            return Transcript(0, results)
+
+        def listener(event: Event) -> None:
+            _log(event)
+            journal.record(event)
+
+    for attempt in range(retries + 1):
+        if attempt:
+            delay = backoff * 2 ** (attempt - 1)
+            LOGGER.warning(
+                "Retrying %i failed items in %g seconds (attempt %i of %i).",
+                len(pending) + (app_id is not None),
+                delay,
+                attempt,
+                retries,
+            )
+            sleep(delay)
+
+        transcript = run_steamcmd(
+            command(pending, app_id is not None),
+            app_id=app_id,
+            stall_timeout=stall_timeout,
+            activity=activity,
+            listener=listener,
+        )
+        results.update(transcript.results)
+        pending = [item for item in pending if not _succeeded(results, item)]
+
+        if app_id is not None and (
+            _succeeded(results, app_id)
+            or (app_id not in results and transcript.returncode == 0)
+        ):
+            app_id = None
+
+        if not pending and app_id is None:
+            if journal is not None and transcript.returncode == 0:
+                journal.remove()
+
+            return Transcript(transcript.returncode, results)
+
+    for item in pending:
+        results.setdefault(item, ItemResult(item, False, None, reason="Not downloaded"))
+
+    if app_id is not None:
+        results.setdefault(
+            app_id, ItemResult(app_id, False, None, False, reason="Not updated")
+        )
+
+    return Transcript(transcript.returncode or 1, results, transcript.stalled)
+
+
+def workshop_activity(install_dir: Path) -> tuple[int, int]:
+    """Returns the size and latest modification of workshop downloads.
+
+    steamcmd stores partial downloads in the install directory
+    until a workshop item is complete.
+    """
+
+    size = mtime = 0
+
+    for root, _, files in walk(install_dir / DOWNLOADS_DIR):
+        for file in files:
+            try:
+                stat = (Path(root) / file).stat()
+            except FileNotFoundError:
+                continue
+
+            size += stat.st_size
+            mtime = max(mtime, stat.st_mtime_ns)
+
+    return size, mtime
+
+
+def _log(event: Event) -> None:
+    """Logs an event and counts downloaded bytes."""
+
+    if event.kind == "progress":
+        LOGGER.debug("%s", event)
+    elif event.kind == "failure":
+        LOGGER.error("%s", event)
+    elif event.kind == "success":
+        LOGGER.info("%s", event)
+        count(event.bytes or 0)
+    else:
+        LOGGER.debug("%s", event)
+
+
+def _succeeded(results: dict[int, ItemResult], item: int) -> bool:
+    """Determines whether the item was downloaded successfully."""
+
+    return (result := results.get(item)) is not None and result.success
+
+
+def _read(process: Popen, lines: Queue[str | None], echo: TextIO | None) -> None:
+    """Forwards the process' output line by line.
+
+    Output is echoed as it arrives, so that prompts without
+    a trailing line break, such as for Steam Guard codes, are shown.
+    """
+
+    buffer = b""
+
+    while chunk := process.stdout.read(4096):
+        if echo is not None:
+            echo.write(chunk.decode(errors="replace"))
+            echo.flush()
+
+        *complete, buffer = (buffer + chunk).replace(b"\r", b"\n").split(b"\n")
+
+        for line in complete:
+            lines.put(line.decode(errors="replace"))
+
+    if buffer:
+        lines.put(buffer.decode(errors="replace"))
+
+    process.stdout.close()
+    lines.put(None)
@@ -0,0 +1,171 @@
+"""Supervision of a running server."""
+
+from __future__ import annotations
+from logging import getLogger
+from signal import SIGINT, SIGTERM, signal
+from subprocess import Popen, TimeoutExpired
+from time import monotonic, sleep
+
+from dzdsu.constants import MESSAGE_TEMPLATE_UPDATE
+from dzdsu.lockfile import LockFile
+from dzdsu.logs import LogCapture
+from dzdsu.scheduling import Placement, apply_scheduling
+from dzdsu.server import Server
+from dzdsu.watcher import ChangeWatcher
+
+
+__all__ = ["Supervisor"]
+
+
+LOGGER = getLogger("dzdsw")
+
+
+class Supervisor:
+    """Keeps a server running.
+
+    Crashed servers are restarted with exponential backoff.
+    Before each start, the supervisor blocks until the update lock is released.
+    While the server runs, it watches the server's files for changes and, once
+    the server needs a restart, shuts it down gracefully and starts it again.
+    """
+
+    def __init__(
+        self,
+        server: Server,
+        *,
+        poll_interval: float = 5.0,
+        settle: float = 10.0,
+        countdown: int = 120,
+        min_backoff: float = 1.0,
+        max_backoff: float = 300.0,
+        stable_after: float = 600.0,
+        stop_timeout: float = 120.0,
+        placement: Placement | None = None,
+        capture: LogCapture | None = None,
+    ):
+        self.server = server
+        self.poll_interval = poll_interval
+        self.settle = settle
+        self.countdown = countdown
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.stop_timeout = stop_timeout
+        self.placement = placement
+        self.capture = capture
+        self.failures = 0
+        self.process: Popen | None = None
+        self.stopping = False
+
+    def run(self) -> int:
+        """Supervises the server until the supervisor is stopped."""
+        signal(SIGTERM, self._stop)
+        signal(SIGINT, self._stop)
+        returncode = 0
+
+        while not self.stopping:
+            self.await_unlock()
+
+            if self.stopping:
+                break
+
+            started = monotonic()
+            returncode = self.run_once()
+
+            if self.stopping:
+                break
+
+            if returncode == 0 or monotonic() - started >= self.stable_after:
+                self.failures = 0
+                continue
+
+            delay = min(self.max_backoff, self.min_backoff * 2**self.failures)
+            self.failures += 1
+            LOGGER.warning(
+                "Server exited with code %i. Restarting in %.1f s.", returncode, delay
+            )
+            self._sleep(delay)
+
+        return returncode
+
+    def await_unlock(self) -> None:
+        """Blocks until the server is no longer being updated."""
+        if not (lockfile := self.server.update_lockfile).locked:
+            return
+
+        LOGGER.info("Server is currently updating. Waiting for the update lock.")
+
+        while not self.stopping and not lockfile.wait(timeout=5):
+            pass
+
+    def run_once(self) -> int:
+        """Runs the server until it exits and returns its exit code."""
+        # Hold the update lock shared, so that no update starts in between.
+        with LockFile(self.server.update_lockfile.file, "Server start.", shared=True):
+            self.server.update_hashes()
+            LOGGER.info("Starting server.")
+            self.process = (Popen if self.capture is None else self.capture.popen)(
+                self.server.command, cwd=self.server.base_dir
+            )
+
+        apply_scheduling(self.process.pid, self.server.scheduling, self.placement)
+
+        try:
+            with ChangeWatcher(
+                self.server, settle=self.settle, poll_interval=self.poll_interval
+            ) as watcher:
+                while (returncode := self.process.poll()) is None:
+                    if (event := watcher.wait(timeout=1)) is not None:
+                        if self.stopping:
+                            continue
+
+                        LOGGER.info("%s", event)
+                        return self.restart()
+
+                return returncode
+        finally:
+            self.process = None
+
+    def restart(self) -> int:
+        """Gracefully shuts down the server so that it is restarted."""
+        from dzdsu.utility.shutdown import shutdown_async
+        from asyncio import run
+
+        if not run(
+            shutdown_async(self.server, MESSAGE_TEMPLATE_UPDATE, self.countdown)
+        ):
+            LOGGER.warning("Could not shut down server via RCon.")
+
+        return self.terminate()
+
+    def terminate(self) -> int:
+        """Waits for the server to exit and terminates it if needed."""
+        try:
+            return self.process.wait(timeout=self.stop_timeout)
+        except TimeoutExpired:
+            LOGGER.warning("Server did not stop in time. Terminating it.")
+
+        self.process.terminate()
+
+        try:
+            return self.process.wait(timeout=self.stop_timeout)
+        except TimeoutExpired:
+            LOGGER.error("Server did not terminate in time. Killing it.")
+
+        self.process.kill()
+        return self.process.wait()
+
+    def _sleep(self, seconds: float) -> None:
+        """Sleeps unless the supervisor is being stopped."""
+        deadline = monotonic() + seconds
+
+        while not self.stopping and (remaining := deadline - monotonic()) > 0:
+            sleep(min(remaining, 1))
+
+    def _stop(self, signum, _) -> None:
+        """Stops the supervisor and the server."""
+        LOGGER.info("Received signal %i. Stopping.", signum)
+        self.stopping = True
+
+        if self.process is not None:
+            self.process.terminate()
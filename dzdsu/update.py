@@ -1,56 +1,123 @@
 """Game and mod updates."""
 
 from __future__ import annotations
-from logging import getLogger
-from subprocess import CompletedProcess, run
+from subprocess import CalledProcessError, CompletedProcess
 
 from dzdsu.constants import DAYZ_APP_ID, STEAMCMD
+from dzdsu.journal import UpdateJournal
+from dzdsu.profiling import span
 from dzdsu.server import Server
+from dzdsu.steamcmd import DEFAULT_BACKOFF, DEFAULT_STALL_TIMEOUT, Transcript
+from dzdsu.steamcmd import download, workshop_activity
 
 
-__all__ = ["Updater"]
+__all__ = ["Updater", "workshop_args"]
 
 
 class Updater:
     """SteamCMD wrapper to update server and mods."""
 
-    def __init__(self, server: Server, steam_user_name: str):
+    def __init__(
+        self,
+        server: Server,
+        steam_user_name: str,
+        *,
+        retries: int = 1,
+        backoff: float = DEFAULT_BACKOFF,
+        stall_timeout: float | None = DEFAULT_STALL_TIMEOUT,
+        resume: bool = True,
+    ):
         """Sets server name and initial command."""
         self.server = server
-        self.commands = [
-            "+force_install_dir",
-            str(server.base_dir),
-            "+login",
-            steam_user_name,
-        ]
+        self.steam_user_name = steam_user_name
+        self.retries = retries
+        self.backoff = backoff
+        self.stall_timeout = stall_timeout
+        self.resume = resume
+        self.app = False
+        self.items: list[int] = []
+        self.transcript: Transcript | None = None
 
     def __str__(self):
         """Returns the command as a string."""
         return " ".join(self.command)
 
     def __call__(self) -> CompletedProcess:
-        """Executes the steamcmd command."""
-        getLogger("dzdsu").debug("Executing: %s", command := self.command)
-        return run(command, check=True)
+        """Executes the steamcmd command.
+
+        Failed workshop items are retried in new sessions.
+        An interrupted update resumes with the items that did not complete.
+        """
+        journal = UpdateJournal(
+            self.server.update_journal_file,
+            self.items,
+            self.server.app_id if self.app else None,
+        )
+
+        if self.resume:
+            journal.load()
+
+        with span("steamcmd", self.server.name):
+            self.transcript = download(
+                lambda items, app: self.commands_for(items, app=app),
+                self.items,
+                app_id=self.server.app_id if self.app else None,
+                retries=self.retries,
+                backoff=self.backoff,
+                stall_timeout=self.stall_timeout,
+                activity=lambda: workshop_activity(self.server.base_dir),
+                journal=journal,
+            )
+
+        if not self.transcript.success:
+            raise CalledProcessError(self.transcript.returncode or 1, self.command)
+
+        return CompletedProcess(self.command, self.transcript.returncode)
 
     @property
     def command(self) -> list[str]:
         """Returns the command."""
         return [STEAMCMD, *self.commands, "+quit"]
 
+    @property
+    def commands(self) -> list[str]:
+        """Returns the steamcmd commands."""
+        return self.commands_for(self.items, app=self.app)[1:-1]
+
+    def commands_for(self, items: list[int], *, app: bool = False) -> list[str]:
+        """Returns the command to update the app and the given items."""
+        return [
+            STEAMCMD,
+            "+force_install_dir",
+            str(self.server.base_dir),
+            "+login",
+            self.steam_user_name,
+            *(["+app_update", str(self.server.app_id), "validate"] if app else []),
+            *workshop_args(items),
+            "+quit",
+        ]
+
     def update_server(self) -> Updater:
         """Updates the server."""
-        self.commands += ["+app_update", str(self.server.app_id), "validate"]
+        self.app = True
         return self
 
     def update_mods(self) -> Updater:
         """Updates the server's mods."""
-        for mod in self.server.mods_to_update:
-            self.commands += [
-                "+workshop_download_item",
-                str(DAYZ_APP_ID),
-                str(mod.id),
-                "validate",
-            ]
-
+        self.items += [mod.id for mod in self.server.mods_to_update]
         return self
+
+
+def workshop_args(items: list[int]) -> list[str]:
+    """Returns the steamcmd arguments to download the workshop items."""
+
+    return [
+        argument
+        for ident in items
+        for argument in (
+            "+workshop_download_item",
+            str(DAYZ_APP_ID),
+            str(ident),
+            "validate",
+        )
+    ]
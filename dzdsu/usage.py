@@ -0,0 +1,219 @@
+"""Disk usage of mods and missions."""
+
+from __future__ import annotations
+from contextlib import suppress
+from logging import getLogger
+from os import replace, scandir
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+
+__all__ = [
+    "MISSION_DEPTH",
+    "Usage",
+    "UsageIndex",
+    "fingerprint",
+    "format_size",
+    "scan",
+]
+
+
+LOGGER = getLogger("dzdsu")
+FINGERPRINT_DEPTH = 2
+MISSION_DEPTH = 3
+UNITS = ("B", "KiB", "MiB", "GiB", "TiB")
+VERSION = 1
+
+
+class Usage(NamedTuple):
+    """Disk usage of a directory tree.
+
+    Reclaimable bytes exclude files hardlinked elsewhere,
+    which are not freed when the tree is removed.
+    """
+
+    bytes: int = 0
+    files: int = 0
+    reclaimable: int = 0
+
+    def __str__(self) -> str:
+        return format_size(self.bytes)
+
+    @classmethod
+    def total(cls, usages: Iterable[Usage]) -> Usage:
+        """Returns the summed usage."""
+        return cls(*map(sum, zip(cls(), *usages)))
+
+
+class UsageIndex:
+    """Caches the disk usage of trees below a base directory.
+
+    A tree is only walked again if its fingerprint changed.
+    """
+
+    def __init__(self, file: Path, base_dir: Path):
+        self.file = file
+        self.base_dir = base_dir
+        self.entries: dict[str, tuple[str, Usage]] = {}
+        self.changed = False
+
+    def __enter__(self):
+        return self.load()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.changed:
+            self.save()
+
+    def load(self) -> UsageIndex:
+        """Loads the index."""
+        from json import load
+
+        try:
+            with self.file.open("rb") as file:
+                json = load(file)
+        except FileNotFoundError:
+            return self
+        except (OSError, ValueError) as error:
+            LOGGER.warning("Ignoring invalid usage index %s: %s", self.file, error)
+            return self
+
+        if json.get("version") == VERSION:
+            self.entries = {
+                path: (entry["fingerprint"], Usage(*entry["usage"]))
+                for path, entry in json["trees"].items()
+            }
+
+        return self
+
+    def save(self) -> None:
+        """Writes the index atomically, dropping removed trees.
+
+        The index is only a cache, so failing to write it is not an error.
+        """
+        from json import dump
+
+        tmp = self.file.with_name(f".{self.file.name}.tmp")
+
+        try:
+            with tmp.open("w", encoding="utf-8") as file:
+                dump(
+                    {
+                        "version": VERSION,
+                        "trees": {
+                            path: {"fingerprint": digest, "usage": usage}
+                            for path, (digest, usage) in self.entries.items()
+                            if (self.base_dir / path).is_dir()
+                        },
+                    },
+                    file,
+                )
+
+            replace(tmp, self.file)
+        except OSError as error:
+            LOGGER.debug("Could not write usage index %s: %s", self.file, error)
+
+            with suppress(OSError):
+                tmp.unlink(missing_ok=True)
+
+            return
+
+        self.changed = False
+
+    def usage(self, path: Path, depth: int = FINGERPRINT_DEPTH) -> Usage:
+        """Returns the disk usage of the directory tree.
+
+        The tree is fingerprinted up to the given depth.
+        """
+        key = path.relative_to(self.base_dir).as_posix()
+
+        if not path.is_dir():
+            self.discard(path)
+            return Usage()
+
+        current = fingerprint(path, depth)
+
+        if (entry := self.entries.get(key)) is not None and entry[0] == current:
+            return entry[1]
+
+        LOGGER.debug("Scanning disk usage of %s.", path)
+        self.entries[key] = (current, usage := scan(path))
+        self.changed = True
+        return usage
+
+    def discard(self, path: Path) -> None:
+        """Removes a tree from the index."""
+        if self.entries.pop(path.relative_to(self.base_dir).as_posix(), None):
+            self.changed = True
+
+
+def fingerprint(path: Path, depth: int = FINGERPRINT_DEPTH) -> str:
+    """Returns a digest of the files' metadata near the tree's root.
+
+    Updates replace files in the top directories of mods, such as
+    meta.cpp and the addons. Missions rewrite their storage files in place
+    down to storage_*/data, so they need a depth of MISSION_DEPTH.
+    Link counts are included, since they change the reclaimable bytes.
+    """
+
+    from hashlib import sha1
+
+    digest = sha1()
+    stack = [(path, 0)]
+
+    while stack:
+        directory, level = stack.pop()
+        stat = directory.stat()
+        digest.update(f"{directory}:{stat.st_mtime_ns}\n".encode())
+
+        with scandir(directory) as entries:
+            for entry in sorted(entries, key=lambda entry: entry.name):
+                if entry.is_dir(follow_symlinks=False) and level + 1 < depth:
+                    stack.append((Path(entry.path), level + 1))
+                    continue
+
+                stat = entry.stat(follow_symlinks=False)
+                metadata = (entry.name, stat.st_size, stat.st_mtime_ns, stat.st_nlink)
+                digest.update(f"{metadata}\n".encode())
+
+    return digest.hexdigest()
+
+
+def scan(path: Path) -> Usage:
+    """Walks the directory tree without following symlinks."""
+
+    size = files = reclaimable = 0
+    stack = [path]
+
+    while stack:
+        with scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+                    continue
+
+                if entry.is_symlink():
+                    continue
+
+                stat = entry.stat(follow_symlinks=False)
+                size += stat.st_size
+                files += 1
+
+                # Windows does not report links of directory entries.
+                if stat.st_nlink <= 1:
+                    reclaimable += stat.st_size
+
+    return Usage(size, files, reclaimable)
+
+
+def format_size(size: float) -> str:
+    """Formats a size in bytes with binary units."""
+
+    for unit in UNITS[:-1]:
+        if abs(size) < 1024:
+            break
+
+        size /= 1024
+    else:
+        unit = UNITS[-1]
+
+    return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
@@ -1,70 +1,121 @@
 """Main script of the server management utility."""
 
+from argparse import Namespace
+from contextlib import suppress
 from logging import DEBUG, INFO, WARNING, basicConfig
+from sys import argv
 
 from dzdsu.constants import MESSAGE_TEMPLATE_SHUTDOWN
-from dzdsu.mods import print_mods
-from dzdsu.server import load_servers
+from dzdsu.registry import ServerRegistry, load_servers
+from dzdsu.server import Server
+from dzdsu.utility.actions import finish, prepare
 from dzdsu.utility.argparse import get_args
-from dzdsu.utility.backup import backup
+from dzdsu.utility.fleet import manage_fleet, select_servers
 from dzdsu.utility.logger import LOGGER
-from dzdsu.utility.mods import clean_mods, fix_mod_paths, install_keys
-from dzdsu.utility.shutdown import shutdown
-from dzdsu.utility.update import update
-from dzdsu.utility.wipe import wipe
 
 
-__all__ = ["main"]
+__all__ = ["main", "manage"]
+
+
+LOG_FORMAT = "%(levelname)s:%(name)s:%(message)s"
+FLEET_LOG_FORMAT = "%(levelname)s:%(name)s:%(threadName)s: %(message)s"
 
 
 def main() -> int:
     """Server management utility."""
 
     args = get_args(__doc__)
-    basicConfig(level=DEBUG if args.debug else WARNING if args.quiet else INFO)
+
+    # Long-running and interactive actions stay in the foreground process,
+    # so that countdowns and Steam Guard prompts show up as they happen.
+    if not (
+        args.local
+        or args.watch
+        or args.follow_adm
+        or args.schedule
+        or args.update
+        or args.shutdown
+        or args.rolling_restart is not None
+    ):
+        from dzdsu.daemon import delegate
+
+        if (returncode := delegate(argv[1:])) is not None:
+            return returncode
+
     servers = load_servers(args.servers_file)
 
     try:
-        server = servers[args.server]
-    except KeyError:
-        LOGGER.error("No such server: %s", args.server)
+        selected = select_servers(servers, args.server, every=args.all)
+    except KeyError as error:
+        basicConfig()
+        LOGGER.error("No such server: %s", error.args[0])
         return 2
 
-    if args.clean_mods:
-        clean_mods(server)
+    basicConfig(
+        level=DEBUG if args.debug else WARNING if args.quiet else INFO,
+        format=FLEET_LOG_FORMAT if len(selected) > 1 else LOG_FORMAT,
+    )
+    return manage(args, servers, selected)
 
-    if args.update:
-        update(server, args)
 
-    if args.fix_paths:
-        fix_mod_paths(server)
+def manage(args: Namespace, servers: ServerRegistry, selected: list[Server]) -> int:
+    """Runs the selected actions on the selected servers."""
 
-    if args.install_keys:
-        install_keys(server, overwrite=args.overwrite)
+    if args.profile is None:
+        return _manage(args, servers, selected)
 
-    if args.list_mods:
-        print_mods(server.mods)
+    from dzdsu.profiling import PROFILER, Profiler
 
-    if args.list_server_mods:
-        print_mods(server.server_mods)
+    token = PROFILER.set(profiler := Profiler(args.profile, args.profile_phase))
 
-    if args.installed_mods:
-        print_mods(
-            sorted(map(lambda installed_mod: installed_mod.mod, server.installed_mods))
-        )
+    try:
+        return _manage(args, servers, selected)
+    finally:
+        PROFILER.reset(token)
+        profiler.write()
 
-    if args.shutdown and not shutdown(
-        server, args.message or MESSAGE_TEMPLATE_SHUTDOWN, args.countdown
-    ):
-        return 3
 
-    if args.backup and not backup(server, set(args.backup), args.backups_dir):
-        return 4
+def _manage(args: Namespace, servers: ServerRegistry, selected: list[Server]) -> int:
+    """Runs the selected actions on the selected servers."""
+
+    if not selected:
+        LOGGER.error("No server selected.")
+        return 2
+
+    if len(selected) > 1 and (args.watch or args.follow_adm):
+        LOGGER.error("Watching and following logs require a single server.")
+        return 2
+
+    if args.layout:
+        from dzdsu.scheduling import place
+
+        for placement in place(servers.pinned()).values():
+            print(placement)
+
+    if args.schedule:
+        from dzdsu.scheduler import RestartScheduler
+
+        with suppress(KeyboardInterrupt):
+            RestartScheduler(selected).run()
+
+        return 0
+
+    if args.rolling_restart is not None:
+        from dzdsu.utility.rolling import rolling_restart
+
+        return rolling_restart(selected, args)
+
+    if len(selected) > 1:
+        return manage_fleet(selected, args)
+
+    prepare(server := selected[0], args)
 
-    if args.wipe and not wipe(server, set(args.wipe)):
-        return 5
+    if args.shutdown:
+        from dzdsu.utility.shutdown import shutdown
 
-    if args.needs_restart and not server.needs_restart:
-        return 1
+        if not shutdown(
+            server, args.message or MESSAGE_TEMPLATE_SHUTDOWN, args.countdown
+        ):
+            return 3
 
-    return 0
+    return finish(server, args)
@@ -0,0 +1,90 @@
+"""Actions on a single server."""
+
+from argparse import Namespace
+from typing import TextIO
+
+from dzdsu.mods import print_mods
+from dzdsu.server import Server
+from dzdsu.utility.backup import backup
+from dzdsu.utility.mods import clean_mods, fix_mod_paths, install_keys
+from dzdsu.utility.mods import list_installed_mods
+from dzdsu.utility.usage import print_disk_usage
+from dzdsu.utility.wipe import wipe
+
+
+__all__ = ["finish", "prepare"]
+
+
+def prepare(server: Server, args: Namespace, file: TextIO | None = None) -> int:
+    """Runs the actions that precede a shutdown."""
+
+    if args.clean_mods:
+        clean_mods(server)
+
+    # Actions requiring asyncio, subprocess or RCon are imported on demand.
+    if args.update:
+        from dzdsu.utility.update import update
+
+        update(server, args)
+
+    if args.fix_paths:
+        fix_mod_paths(server)
+
+    if args.install_keys:
+        install_keys(server, overwrite=args.overwrite)
+
+    if args.list_mods:
+        print_mods(server.mods, file)
+
+    if args.list_server_mods:
+        print_mods(server.server_mods, file)
+
+    if args.installed_mods:
+        list_installed_mods(server, file)
+
+    if args.disk_usage:
+        print_disk_usage(server, args.backups_dir, file)
+
+    return 0
+
+
+def finish(server: Server, args: Namespace, file: TextIO | None = None) -> int:
+    """Runs the actions that follow a shutdown."""
+
+    if args.backup and not backup(server, set(args.backup), args.backups_dir):
+        return 4
+
+    if args.wipe and not wipe(server, set(args.wipe)):
+        return 5
+
+    if args.probe:
+        from dzdsu.health import probe_servers
+
+        print(health := probe_servers([server])[0], file=file)
+
+        if not health.healthy:
+            return 6
+
+    if (
+        args.index_adm
+        or args.follow_adm
+        or args.sessions is not None
+        or args.events is not None
+    ):
+        from dzdsu.utility.admlog import admlog
+
+        admlog(server, args, file)
+
+    if args.watch:
+        from contextlib import suppress
+
+        from dzdsu.watcher import ChangeWatcher
+
+        with suppress(KeyboardInterrupt), ChangeWatcher(server) as watcher:
+            while True:
+                print(watcher.wait(), file=file, flush=True)
+
+    if args.needs_restart and not server.needs_restart:
+        return 1
+
+    return 0
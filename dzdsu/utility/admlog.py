@@ -0,0 +1,37 @@
+"""Admin log indexing and queries."""
+
+from argparse import Namespace
+from contextlib import suppress
+from typing import TextIO
+
+from dzdsu.admlog import AdmIndex
+from dzdsu.server import Server
+from dzdsu.utility.logger import LOGGER
+
+
+__all__ = ["admlog"]
+
+
+def admlog(server: Server, args: Namespace, file: TextIO | None = None) -> None:
+    """Updates the admin log index and lists sessions and events."""
+
+    with AdmIndex(server.adm_index_file) as index:
+        LOGGER.info("Indexed %i events.", index.update(server.logs_dir))
+
+        if args.sessions is not None:
+            for session in index.sessions(
+                args.sessions or None, since=args.since, until=args.until
+            ):
+                print(session, file=file)
+
+        if args.events is not None:
+            for event in index.events(
+                args.events or None, since=args.since, until=args.until
+            ):
+                print(event, file=file)
+
+        if args.follow_adm:
+            with suppress(KeyboardInterrupt):
+                for count in index.follow(server.logs_dir):
+                    if count:
+                        LOGGER.info("Indexed %i events.", count)
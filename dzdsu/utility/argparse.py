@@ -1,6 +1,7 @@
 """CLI argument parsing."""
 
 from argparse import ArgumentParser, Namespace
+from datetime import datetime
 from pathlib import Path
 
 from dzdsu.constants import BACKUPS_DIR, JSON_FILE
@@ -9,11 +10,23 @@ from dzdsu.constants import BACKUPS_DIR, JSON_FILE
 __all__ = ["get_args"]
 
 
-def get_args(description: str) -> Namespace:
+def get_args(description: str, argv: list[str] | None = None) -> Namespace:
     """Return the parsed command line arguments."""
 
     parser = ArgumentParser(description=description)
-    parser.add_argument("server", help="the server to operate on")
+    parser.add_argument(
+        "server", nargs="*", help="the servers to operate on, may be glob patterns"
+    )
+    parser.add_argument(
+        "-a", "--all", action="store_true", help="operate on all servers"
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        metavar="n",
+        help="maximum servers to operate on in parallel",
+    )
     parser.add_argument(
         "-f",
         "--servers-file",
@@ -34,6 +47,46 @@ def get_args(description: str) -> Namespace:
     parser.add_argument(
         "-m", "--update-mods", action="store_true", help="update the server's mods"
     )
+    parser.add_argument(
+        "--staging-dir",
+        type=Path,
+        metavar="dir",
+        help="directory to download mods shared by several servers to"
+        " (default: .workshop next to the servers)",
+    )
+    parser.add_argument(
+        "--steam-sessions",
+        type=int,
+        default=1,
+        metavar="n",
+        help="parallel steamcmd sessions to download shared mods with",
+    )
+    parser.add_argument(
+        "--steam-retries",
+        type=int,
+        default=1,
+        metavar="n",
+        help="times to retry failed workshop items",
+    )
+    parser.add_argument(
+        "--steam-backoff",
+        type=float,
+        default=30,
+        metavar="seconds",
+        help="delay before the first retry, doubled with each further one",
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="download all items again instead of resuming an interrupted update",
+    )
+    parser.add_argument(
+        "--steam-stall-timeout",
+        type=float,
+        default=600,
+        metavar="seconds",
+        help="kill steamcmd if it neither writes output nor downloads for this long",
+    )
     parser.add_argument(
         "-F", "--fix-paths", action="store_true", help="fix mod file paths"
     )
@@ -55,6 +108,12 @@ def get_args(description: str) -> Namespace:
     parser.add_argument(
         "-I", "--installed-mods", action="store_true", help="list installed mods"
     )
+    parser.add_argument(
+        "-D",
+        "--disk-usage",
+        action="store_true",
+        help="show the disk usage of mods, missions and backups",
+    )
     parser.add_argument(
         "-T",
         "--shutdown",
@@ -73,6 +132,79 @@ def get_args(description: str) -> Namespace:
         action="store_true",
         help="check whether the server needs a restart",
     )
+    parser.add_argument(
+        "-R",
+        "--rolling-restart",
+        type=int,
+        metavar="n",
+        help="restart the servers n at a time, emptiest first",
+    )
+    parser.add_argument(
+        "--schedule",
+        action="store_true",
+        help="run the servers' restart schedules until interrupted",
+    )
+    parser.add_argument(
+        "--health-timeout",
+        type=float,
+        default=600,
+        metavar="seconds",
+        help="time to wait for a restarted server to become healthy",
+    )
+    parser.add_argument(
+        "-L",
+        "--layout",
+        action="store_true",
+        help="show the CPU placement of all servers",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="watch the server for changes that need a restart",
+    )
+    parser.add_argument(
+        "-A",
+        "--index-adm",
+        action="store_true",
+        help="index new admin log entries",
+    )
+    parser.add_argument(
+        "--follow-adm",
+        action="store_true",
+        help="keep indexing admin log entries as they are written",
+    )
+    parser.add_argument(
+        "--sessions",
+        nargs="?",
+        const="",
+        metavar="player",
+        help="list sessions, optionally of a player by GUID or name",
+    )
+    parser.add_argument(
+        "--events",
+        nargs="?",
+        const="",
+        metavar="player",
+        help="list admin log events, optionally of a player by GUID or name",
+    )
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        metavar="timestamp",
+        help="list sessions and events since this time",
+    )
+    parser.add_argument(
+        "--until",
+        type=datetime.fromisoformat,
+        metavar="timestamp",
+        help="list sessions and events until this time",
+    )
+    parser.add_argument(
+        "-P",
+        "--probe",
+        action="store_true",
+        help="probe the server's responsiveness via A2S and RCon",
+    )
     parser.add_argument(
         "-b",
         "--backups-dir",
@@ -92,6 +224,19 @@ def get_args(description: str) -> Namespace:
         metavar="seconds",
         help="countdown time",
     )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="file",
+        help="write a JSON timeline of the phases' durations to the file",
+    )
+    parser.add_argument(
+        "--profile-phase",
+        action="append",
+        default=[],
+        metavar="phase",
+        help="also capture cProfile statistics of the phase",
+    )
     parser.add_argument(
         "-d", "--debug", action="store_true", help="show debug messages"
     )
@@ -99,4 +244,7 @@ def get_args(description: str) -> Namespace:
         "-q", "--quiet", action="store_true", help="suppress info messages"
     )
     parser.add_argument("--force", action="store_true", help="force update")
-    return parser.parse_args()
+    parser.add_argument(
+        "--local", action="store_true", help="do not delegate to a running dzdsud"
+    )
+    return parser.parse_args(argv)
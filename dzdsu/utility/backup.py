@@ -4,7 +4,9 @@ from datetime import datetime
 from os import name
 from pathlib import Path
 
+from dzdsu.profiling import span
 from dzdsu.server import Server
+from dzdsu.usage import MISSION_DEPTH
 from dzdsu.utility.logger import LOGGER
 
 
@@ -37,6 +39,13 @@ def backup_mission(server: Server, mission: str, backups_dir: Path) -> bool:
         LOGGER.debug(str(error))
         return False
 
+    with server.usage_index as index:
+        LOGGER.info(
+            "Backing up mission %s (%s).",
+            mission.name,
+            index.usage(mission.path, MISSION_DEPTH),
+        )
+
     mission.backup(file)
     return True
 
@@ -50,4 +59,7 @@ def backup(server: Server, missions: set[str], backups_dir: Path) -> bool:
         LOGGER.error("Cannot create backup directory: %s", backups_dir)
         return False
 
-    return all({backup_mission(server, mission, backups_dir) for mission in missions})
+    with span("backup", server.name):
+        return all(
+            {backup_mission(server, mission, backups_dir) for mission in missions}
+        )
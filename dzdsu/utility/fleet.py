@@ -0,0 +1,145 @@
+"""Operations on several servers."""
+
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from fnmatch import fnmatchcase
+from io import StringIO
+from os import name
+from subprocess import CalledProcessError
+from threading import current_thread
+from typing import Callable, Iterable, Mapping, TextIO
+
+from dzdsu.constants import MESSAGE_TEMPLATE_SHUTDOWN
+from dzdsu.server import Server
+from dzdsu.utility.actions import finish, prepare
+from dzdsu.utility.logger import LOGGER
+
+
+__all__ = ["EXIT_ERROR", "manage_fleet", "run_parallel", "select_servers"]
+
+
+EXIT_ERROR = 7
+
+Action = Callable[[Server, TextIO], int]
+
+
+def select_servers(
+    servers: Mapping[str, Server], patterns: Iterable[str], *, every: bool = False
+) -> list[Server]:
+    """Selects servers by names or glob patterns in the order of the servers file.
+
+    Raises a KeyError if a pattern matches no server.
+    """
+
+    if every:
+        return list(servers.values())
+
+    selected = {}
+
+    for pattern in patterns:
+        if pattern in servers:
+            selected[pattern] = True
+            continue
+
+        if not (matches := [name for name in servers if fnmatchcase(name, pattern)]):
+            raise KeyError(pattern)
+
+        selected.update(dict.fromkeys(matches, True))
+
+    return [server for name, server in servers.items() if name in selected]
+
+
+def run_parallel(
+    servers: Iterable[Server], action: Action, jobs: int | None = None
+) -> dict[str, tuple[int, str]]:
+    """Runs the action on the servers in a bounded worker pool.
+
+    Returns the exit code and captured output per server.
+    A failing server does not affect the others.
+    """
+
+    with ThreadPoolExecutor(jobs) as executor:
+        futures = {
+            server.name: executor.submit(copy_context().run, _run, action, server)
+            for server in servers
+        }
+
+    return {name: future.result() for name, future in futures.items()}
+
+
+def _run(action: Action, server: Server) -> tuple[int, str]:
+    """Runs the action on a server, capturing its output."""
+
+    current_thread().name = server.name
+    file = StringIO()
+
+    try:
+        returncode = action(server, file)
+    except Exception:
+        LOGGER.exception("Unexpected error.")
+        returncode = EXIT_ERROR
+
+    return returncode, file.getvalue()
+
+
+def manage_fleet(servers: list[Server], args: Namespace) -> int:
+    """Runs the selected actions on several servers in parallel.
+
+    Returns the first non-zero exit code in the order of the servers.
+    """
+
+    current_thread().name = "fleet"
+    failed = False
+
+    # Mods shared by several servers are downloaded once and linked into each.
+    if args.update and args.update_mods and name == "posix":
+        from dzdsu.utility.update import update_mods
+
+        try:
+            update_mods(servers, args)
+        except (CalledProcessError, OSError) as error:
+            LOGGER.error("Could not update mods: %s", error)
+            failed = True
+
+        args = Namespace(
+            **{
+                **vars(args),
+                "update": args.update if args.update_server else None,
+                "update_mods": False,
+            }
+        )
+
+    results = run_parallel(
+        servers, lambda server, file: prepare(server, args, file), args.jobs
+    )
+
+    if args.shutdown:
+        from dzdsu.utility.shutdown import shutdown_all
+
+        for server_name, success in shutdown_all(
+            [server for server in servers if not results[server.name][0]],
+            args.message or MESSAGE_TEMPLATE_SHUTDOWN,
+            args.countdown,
+        ).items():
+            if not success:
+                results[server_name] = (3, results[server_name][1])
+
+    for server_name, (returncode, output) in run_parallel(
+        [server for server in servers if not results[server.name][0]],
+        lambda server, file: finish(server, args, file),
+        args.jobs,
+    ).items():
+        results[server_name] = (returncode, results[server_name][1] + output)
+
+    for server_name, (returncode, output) in results.items():
+        if output:
+            print(f"[{server_name}]", output, sep="\n", end="")
+
+        if returncode:
+            LOGGER.warning("%s: Failed with exit code %i.", server_name, returncode)
+
+    return next(
+        (returncode for returncode, _ in results.values() if returncode),
+        EXIT_ERROR if failed else 0,
+    )
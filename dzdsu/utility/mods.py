@@ -1,37 +1,77 @@
 """Mod-related actions."""
 
+from typing import TextIO
+
+from dzdsu.profiling import count, span
 from dzdsu.server import Server
+from dzdsu.usage import Usage, format_size
 from dzdsu.utility.logger import LOGGER
 
 
-__all__ = ["clean_mods", "fix_mod_paths", "install_keys"]
+__all__ = ["clean_mods", "fix_mod_paths", "install_keys", "list_installed_mods"]
 
 
 def clean_mods(server: Server) -> None:
     """Remove unused mods."""
 
-    for installed_mod in server.unused_mods:
-        LOGGER.info("Removing unused mod: %s", installed_mod.mod)
-        installed_mod.remove()
+    with span("clean", server.name), server.usage_index as index:
+        usages = {
+            installed_mod: index.usage(installed_mod.path)
+            for installed_mod in server.unused_mods
+        }
+
+        if usages:
+            LOGGER.info(
+                "Removing %i unused mods, reclaiming %s.",
+                len(usages),
+                format_size(Usage.total(usages.values()).reclaimable),
+            )
+
+        for installed_mod, usage in usages.items():
+            LOGGER.info(
+                "Removing unused mod: %s (%s)",
+                installed_mod.mod,
+                format_size(usage.reclaimable),
+            )
+            installed_mod.remove()
+            index.discard(installed_mod.path)
+            count(usage.reclaimable, usage.files)
 
 
 def fix_mod_paths(server: Server) -> None:
     """Fix paths of the server mods."""
 
-    for installed_mod in server.installed_mods:
-        LOGGER.debug("Fixing paths of: %s", installed_mod.mod)
-        installed_mod.fix_paths()
+    with span("fix_paths", server.name):
+        for installed_mod in server.installed_mods:
+            LOGGER.debug("Fixing paths of: %s", installed_mod.mod)
+            installed_mod.fix_paths()
+            count()
 
 
 def install_keys(server: Server, *, overwrite: bool = False) -> None:
     """Installs the keys for all mods of the server."""
 
-    for installed_mod in server.installed_mods:
-        for key in installed_mod.bikeys:
-            if (installed := server.base_dir / "keys" / key.name).exists():
-                if not overwrite:
-                    LOGGER.debug('Key "%s" already installed.', key.name)
-                    continue
+    with span("keys", server.name):
+        for installed_mod in server.installed_mods:
+            for key in installed_mod.bikeys:
+                if (installed := server.base_dir / "keys" / key.name).exists():
+                    if not overwrite:
+                        LOGGER.debug('Key "%s" already installed.', key.name)
+                        continue
+
+                with key.open("rb") as src, installed.open("wb") as dst:
+                    count(dst.write(src.read()))
+
+
+def list_installed_mods(server: Server, file: TextIO | None = None) -> None:
+    """Lists the installed mods with their disk usage."""
 
-            with key.open("rb") as src, installed.open("wb") as dst:
-                dst.write(src.read())
+    with server.usage_index as index:
+        for installed_mod in sorted(
+            server.installed_mods, key=lambda installed_mod: installed_mod.mod
+        ):
+            print(
+                f"{format_size(index.usage(installed_mod.path).bytes):>10}",
+                installed_mod.mod,
+                file=file,
+            )
@@ -0,0 +1,42 @@
+"""Rolling restarts of the fleet."""
+
+from argparse import Namespace
+
+from dzdsu.constants import MESSAGE_TEMPLATE_SHUTDOWN
+from dzdsu.rolling import RollingRestart
+from dzdsu.server import Server
+from dzdsu.utility.logger import LOGGER
+
+
+__all__ = ["rolling_restart"]
+
+
+def rolling_restart(servers: list[Server], args: Namespace) -> int:
+    """Restarts the servers a few at a time and prints the timeline."""
+
+    restarts = RollingRestart(
+        servers,
+        batch=args.rolling_restart,
+        message=args.message or MESSAGE_TEMPLATE_SHUTDOWN,
+        countdown=args.countdown,
+        timeout=args.health_timeout,
+    ).run()
+
+    for restart in restarts:
+        print(restart)
+
+    if downtimes := [r.downtime for r in restarts if r.downtime is not None]:
+        LOGGER.info(
+            "Restarted %i of %i servers, longest downtime %s.",
+            len(downtimes),
+            len(restarts),
+            max(downtimes),
+        )
+
+    if skipped := sum(restart.skipped for restart in restarts):
+        LOGGER.info("Skipped %i servers that were not running.", skipped)
+
+    if any(restart.error == "shutdown failed" for restart in restarts):
+        return 3
+
+    return 0 if all(restart.success for restart in restarts) else 6
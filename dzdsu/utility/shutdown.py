@@ -1,10 +1,15 @@
 """Server shutdown."""
 
+from asyncio import gather, run
+from typing import Iterable
+
+from dzdsu.aiorcon import RCON_ERRORS, AsyncClient
+from dzdsu.profiling import span
 from dzdsu.server import Server
 from dzdsu.utility.logger import LOGGER
 
 
-__all__ = ["shutdown"]
+__all__ = ["shutdown", "shutdown_all", "shutdown_async"]
 
 
 def shutdown(server: Server, message: str, countdown: int) -> bool:
@@ -13,24 +18,70 @@ def shutdown(server: Server, message: str, countdown: int) -> bool:
     if not server.is_running:
         return True
 
+    with span("shutdown", server.name):
+        return run(shutdown_async(server, message, countdown))
+
+
+def shutdown_all(
+    servers: Iterable[Server], message: str, countdown: int
+) -> dict[str, bool]:
+    """Shut down several servers concurrently on one event loop."""
+
+    servers = [server for server in servers if server.is_running]
+
+    with span("shutdown"):
+        return dict(
+            zip(
+                (server.name for server in servers),
+                run(_gather_shutdowns(servers, message, countdown)),
+            )
+        )
+
+
+async def _gather_shutdowns(
+    servers: list[Server], message: str, countdown: int
+) -> list[bool]:
+    """Gathers the shutdowns of the given servers."""
+
+    return await gather(
+        *(shutdown_async(server, message, countdown) for server in servers)
+    )
+
+
+async def shutdown_async(server: Server, message: str, countdown: int) -> bool:
+    """Notify users, kick remaining players and shut down the server."""
+
+    try:
+        async with server.rcon_session() as rcon:
+            return await _shutdown_session(server, rcon, message, countdown)
+    except RCON_ERRORS as error:
+        LOGGER.error("%s: Could not connect to RCon: %s", server.name, error)
+        return False
+
+
+async def _shutdown_session(
+    server: Server, rcon: AsyncClient, message: str, countdown: int
+) -> bool:
+    """Run the shutdown sequence over an established RCon session."""
+
     try:
-        server.countdown(message, countdown=countdown)
-    except (ConnectionRefusedError, TimeoutError, ConnectionResetError):
-        LOGGER.error("Could not notify users about shutdown.")
+        await rcon.countdown(message, countdown)
+    except RCON_ERRORS:
+        LOGGER.error("%s: Could not notify users about shutdown.", server.name)
         return False
 
-    LOGGER.info("Kicking remaining players.")
+    LOGGER.info("%s: Kicking remaining players.", server.name)
 
     try:
-        server.kick_all("Server restart.")
-    except (ConnectionRefusedError, TimeoutError, ConnectionResetError):
-        LOGGER.warning("Could not kick all remaining players.")
+        await rcon.kick_all(server.max_players, reason="Server restart.")
+    except RCON_ERRORS:
+        LOGGER.warning("%s: Could not kick all remaining players.", server.name)
 
-    LOGGER.info("Stopping server.")
+    LOGGER.info("%s: Stopping server.", server.name)
 
     try:
-        server.shutdown()
-    except (ConnectionRefusedError, TimeoutError, ConnectionResetError):
+        await rcon.shutdown()
+    except RCON_ERRORS:
         return False
 
     return True
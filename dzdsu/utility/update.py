@@ -1,11 +1,15 @@
 """Updating of the server."""
 
 from argparse import Namespace
+from contextlib import ExitStack
 from os import name
 from time import sleep
 
 from dzdsu.constants import MESSAGE_TEMPLATE_UPDATE, UNSUPPORTED_OS
 from dzdsu.hash import hash_changed
+from dzdsu.lockfile import LockFile
+from dzdsu.planner import UpdatePlan, default_staging_dir
+from dzdsu.profiling import span
 from dzdsu.server import Server
 from dzdsu.update import Updater
 from dzdsu.utility.logger import LOGGER
@@ -13,21 +17,60 @@ from dzdsu.utility.mods import clean_mods
 from dzdsu.utility.shutdown import shutdown
 
 
-__all__ = ["update"]
+__all__ = ["update", "update_mods"]
 
 
 def update(server: Server, args: Namespace) -> None:
     """Updates the server."""
 
     if name == "nt":
-        return _update_nt(server, args)
+        with span("update", server.name):
+            return _update_nt(server, args)
 
     if name == "posix":
-        return _update_posix(server, args)
+        with span("update", server.name):
+            return _update_posix(server, args)
 
     raise UNSUPPORTED_OS
 
 
+def update_mods(servers: list[Server], args: Namespace) -> None:
+    """Updates the mods of several servers, downloading each item only once."""
+
+    plan = UpdatePlan.from_servers(
+        servers,
+        args.staging_dir or default_staging_dir(servers),
+        args.steam_sessions,
+    )
+
+    if not plan.mods:
+        return
+
+    with span("update"), ExitStack() as stack:
+        # Locks are taken in a fixed order to not deadlock concurrent updaters.
+        for lockfile in sorted({server.update_lockfile.file for server in servers}):
+            stack.enter_context(LockFile(lockfile, "Server update."))
+
+        with span("steamcmd"):
+            plan.download(
+                args.update,
+                retries=args.steam_retries,
+                backoff=args.steam_backoff,
+                stall_timeout=args.steam_stall_timeout,
+                resume=not (args.no_resume or args.force),
+            )
+
+        with span("fan_out"):
+            methods = plan.fan_out()
+
+    LOGGER.info(
+        "Updated %i mods of %i servers: %s",
+        len(plan.mods),
+        len(servers),
+        ", ".join(f"{count} files {method}" for method, count in methods.items()),
+    )
+
+
 def _update_nt(server: Server, args: Namespace) -> None:
     """Update NT systems."""
 
@@ -97,7 +140,14 @@ def _nt_needs_update(server: Server, args: Namespace) -> bool:
 def _update(server: Server, args: Namespace) -> None:
     """Perform server and mod updates."""
 
-    updater = Updater(server, args.update)
+    updater = Updater(
+        server,
+        args.update,
+        retries=args.steam_retries,
+        backoff=args.steam_backoff,
+        stall_timeout=args.steam_stall_timeout,
+        resume=not (args.no_resume or args.force),
+    )
 
     if args.update_server:
         updater.update_server()
@@ -0,0 +1,73 @@
+"""Disk usage listing."""
+
+from os import scandir
+from pathlib import Path
+from typing import TextIO
+
+from dzdsu.server import Server
+from dzdsu.usage import MISSION_DEPTH, Usage, format_size
+
+
+__all__ = ["backups_usage", "print_disk_usage"]
+
+
+def backups_usage(server: Server, backups_dir: Path) -> Usage:
+    """Returns the disk usage of the server's backups."""
+
+    try:
+        with scandir(backups_dir) as entries:
+            sizes = [
+                entry.stat().st_size
+                for entry in entries
+                if entry.name.startswith(f"{server.name}-")
+                and entry.name.endswith(".tar.gz")
+            ]
+    except FileNotFoundError:
+        return Usage()
+
+    return Usage(sum(sizes), len(sizes), sum(sizes))
+
+
+def print_disk_usage(
+    server: Server, backups_dir: Path, file: TextIO | None = None
+) -> None:
+    """Lists the disk usage of the server's mods, missions and backups."""
+
+    with server.usage_index as index:
+        mods = {
+            installed_mod: index.usage(installed_mod.path)
+            for installed_mod in server.installed_mods
+        }
+        missions = (
+            {
+                mission.name: index.usage(mission, MISSION_DEPTH)
+                for mission in sorted(server.mpmissions.iterdir())
+                if mission.is_dir()
+            }
+            if server.mpmissions.is_dir()
+            else {}
+        )
+
+    unused = Usage.total(mods[installed_mod] for installed_mod in server.unused_mods)
+    print("Mods:", file=file)
+
+    for installed_mod, usage in sorted(mods.items(), key=lambda item: item[0].mod):
+        print(f"{format_size(usage.bytes):>10}", installed_mod.mod, file=file)
+
+    print(
+        f"{format_size(Usage.total(mods.values()).bytes):>10}",
+        f"in total, {format_size(unused.reclaimable)} reclaimable by cleaning",
+        file=file,
+    )
+    print("Missions:", file=file)
+
+    for name, usage in missions.items():
+        print(f"{format_size(usage.bytes):>10}", name, file=file)
+
+    usage = backups_usage(server, backups_dir)
+    print("Backups:", file=file)
+    print(
+        f"{format_size(usage.bytes):>10}",
+        f"in {usage.files} archives in {backups_dir}",
+        file=file,
+    )
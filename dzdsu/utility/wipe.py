@@ -1,5 +1,6 @@
 """Wiping of servers."""
 
+from dzdsu.profiling import span
 from dzdsu.utility.logger import LOGGER
 from dzdsu.server import Server
 
@@ -24,4 +25,5 @@ def wipe_mission(server: Server, mission: str) -> bool:
 def wipe(server: Server, missions: set[str]) -> bool:
     """Wipes a mission on a server."""
 
-    return all({wipe_mission(server, mission) for mission in missions})
+    with span("wipe", server.name):
+        return all({wipe_mission(server, mission) for mission in missions})
@@ -0,0 +1,268 @@
+"""Watching servers for changes that require a restart."""
+
+from __future__ import annotations
+from logging import getLogger
+from os import close, read
+from pathlib import Path
+from select import select
+from time import monotonic, sleep, time
+from typing import NamedTuple, Optional
+
+from dzdsu.constants import DAYZ_APP_ID
+from dzdsu.constants import MODS_DIR
+from dzdsu.hash import hash_changed, sha1_file
+from dzdsu.server import Server
+
+
+__all__ = ["ChangeWatcher", "RestartEvent"]
+
+
+LOGGER = getLogger("dzdsu")
+WORKSHOP_ACF = Path("steamapps/workshop") / f"appworkshop_{DAYZ_APP_ID}.acf"
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+
+Stat = Optional[tuple[int, int]]
+
+
+class RestartEvent(NamedTuple):
+    """Indicates that a server needs a restart."""
+
+    server: str
+    changed: frozenset[str]
+    timestamp: float
+
+    def __str__(self) -> str:
+        return f"{self.server}: restart needed ({', '.join(sorted(self.changed))})"
+
+
+class Inotify:
+    """Minimal inotify binding watching directories."""
+
+    def __init__(self):
+        from ctypes import CDLL, get_errno
+        from ctypes.util import find_library
+
+        self._libc = CDLL(find_library("c"), use_errno=True)
+
+        if (fd := self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)) < 0:
+            raise OSError(get_errno(), "inotify_init1() failed")
+
+        self.fd = fd
+
+    def close(self) -> None:
+        """Closes the inotify instance."""
+        close(self.fd)
+
+    def watch(self, directory: Path) -> bool:
+        """Watches the given directory if it exists.
+
+        Watching a directory again only updates its watch.
+        """
+        return self._libc.inotify_add_watch(self.fd, bytes(directory), WATCH_MASK) >= 0
+
+    def wait(self, timeout: float | None) -> bool:
+        """Waits for events, discards them and returns True iff any occurred."""
+        if not select([self.fd], [], [], timeout)[0]:
+            return False
+
+        while True:
+            try:
+                read(self.fd, 65536)
+            except BlockingIOError:
+                return True
+
+
+class ChangeWatcher:
+    """Watches the server executable and its mods for changes.
+
+    Uses inotify where available and falls back to polling the files'
+    modification times otherwise. Bursts of changes are debounced until the
+    files settled and no update is running. Only then are the changed files
+    hashed and compared to the hashes of the running server.
+    """
+
+    def __init__(
+        self, server: Server, *, settle: float = 10.0, poll_interval: float = 5.0
+    ):
+        self.server = server
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.inotify: Inotify | None = None
+        self._stats: dict[str, tuple[Path, Stat]] = {}
+        self._reported: dict[str, str] | None = None
+        self._changed_at: float | None = None
+
+    def __enter__(self):
+        try:
+            self.inotify = Inotify()
+        except (AttributeError, OSError) as error:
+            LOGGER.debug("inotify unavailable, polling for changes: %s", error)
+        else:
+            self._watch()
+
+        self._refresh()
+        self._changed_at = monotonic() - self.settle
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
+
+    @property
+    def directories(self) -> list[Path]:
+        """Returns the directories to watch."""
+        directories = [
+            self.server.base_dir,
+            self.server.executable_path.parent,
+            *(
+                self.server.base_dir / parent
+                for parent in (*reversed(MODS_DIR.parents[:-1]), MODS_DIR)
+            ),
+        ]
+        directories.extend(path.parent for path, _ in self._stats.values())
+        return directories
+
+    @property
+    def files(self) -> dict[str, Path]:
+        """Returns the files that determine whether a restart is needed."""
+        return {
+            "server": self.server.executable_path,
+            **{
+                str(installed_mod.mod.id): installed_mod.metadata
+                for installed_mod in self.server.installed_mods
+                if installed_mod.mod.enabled
+            },
+        }
+
+    def wait(self, timeout: float | None = None) -> RestartEvent | None:
+        """Waits for the server to need a restart.
+
+        Returns None if the timeout expired first.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+
+        while True:
+            now = monotonic()
+
+            if self._changed_at is not None and now - self._changed_at >= self.settle:
+                if self.server.update_lockfile.locked:
+                    self._changed_at = now
+                else:
+                    self._changed_at = None
+
+                    if (event := self.check()) is not None:
+                        return event
+
+                    continue
+
+            if deadline is not None and now >= deadline:
+                return None
+
+            wakeup = deadline
+
+            if self._changed_at is not None:
+                settled = self._changed_at + self.settle
+                wakeup = settled if wakeup is None else min(wakeup, settled)
+
+            if (
+                self._block(None if wakeup is None else wakeup - now)
+                and self._refresh()
+            ):
+                LOGGER.debug("%s: files changed.", self.server.name)
+                self._changed_at = monotonic()
+
+    def check(self) -> RestartEvent | None:
+        """Returns a restart event iff the server needs a restart.
+
+        Each change is reported only once.
+        """
+        hashes = {
+            key: digest
+            for key, path in self.files.items()
+            if (digest := self._digest(path)) is not None
+        }
+
+        if hashes == self._reported or not hash_changed(
+            hashes, stored := self.server.load_hashes()
+        ):
+            return None
+
+        self._reported = hashes
+        return RestartEvent(
+            self.server.name,
+            frozenset(
+                key for key, digest in hashes.items() if stored.get(key) != digest
+            ),
+            time(),
+        )
+
+    def _block(self, timeout: float | None) -> bool:
+        """Blocks until files may have changed."""
+        if self.inotify is not None:
+            if not self.inotify.wait(timeout):
+                return False
+
+            self._watch()
+            return True
+
+        sleep(
+            self.poll_interval if timeout is None else min(timeout, self.poll_interval)
+        )
+        return True
+
+    def _watch(self) -> None:
+        """Watches all existing directories."""
+        for directory in self.directories:
+            self.inotify.watch(directory)
+
+    def _refresh(self) -> bool:
+        """Updates the files' stats and returns True iff they changed."""
+        files = {**self.files, "acf": self.server.base_dir / WORKSHOP_ACF}
+        stats = {key: (path, _stat(path)) for key, path in files.items()}
+        changed, self._stats = stats != self._stats, stats
+
+        if changed and self.inotify is not None:
+            self._watch()
+
+        return changed
+
+    def _digest(self, path: Path) -> str | None:
+        """Returns the SHA-1 digest of a file or None if it does not exist."""
+        try:
+            return sha1_file(path)
+        except FileNotFoundError:
+            return None
+
+
+def _stat(path: Path) -> Stat:
+    """Returns the modification time and size of a file."""
+
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+
+    return stat.st_mtime_ns, stat.st_size
@@ -1,12 +1,17 @@
 """Server wrapper."""
 
 from argparse import ArgumentParser, Namespace
+from contextlib import ExitStack
 from logging import DEBUG, INFO, WARNING, basicConfig, getLogger
 from pathlib import Path
 from subprocess import Popen
 
 from dzdsu.constants import JSON_FILE
-from dzdsu.server import load_servers
+from dzdsu.lockfile import LockFile
+from dzdsu.logs import LogArchiver, LogCapture, RotatingLog
+from dzdsu.registry import load_servers
+from dzdsu.scheduling import Placement, apply_scheduling, place
+from dzdsu.server import Server
 
 
 __all__ = ["main"]
@@ -31,6 +36,94 @@ def get_args(description: str = __doc__) -> Namespace:
     parser.add_argument(
         "-F", "--fork", action="store_true", help="fork server process to background"
     )
+    parser.add_argument(
+        "-S",
+        "--supervise",
+        action="store_true",
+        help="restart the server on crashes and pending updates",
+    )
+    parser.add_argument(
+        "-i",
+        "--poll-interval",
+        type=float,
+        default=5,
+        metavar="seconds",
+        help="interval to poll for changes if inotify is unavailable",
+    )
+    parser.add_argument(
+        "-s",
+        "--settle",
+        type=float,
+        default=10,
+        metavar="seconds",
+        help="time without changes before checking whether to restart",
+    )
+    parser.add_argument(
+        "-c",
+        "--countdown",
+        type=int,
+        default=120,
+        metavar="seconds",
+        help="countdown before restarting the server for updates",
+    )
+    parser.add_argument(
+        "-b",
+        "--max-backoff",
+        type=float,
+        default=300,
+        metavar="seconds",
+        help="maximum delay between restarts after crashes",
+    )
+    parser.add_argument(
+        "-l",
+        "--log-dir",
+        type=Path,
+        metavar="dir",
+        help="capture the server's output into rotated logs in this directory",
+    )
+    parser.add_argument(
+        "--log-size",
+        type=int,
+        default=64,
+        metavar="MiB",
+        help="size after which to rotate the captured output",
+    )
+    parser.add_argument(
+        "--log-age",
+        type=float,
+        default=24,
+        metavar="hours",
+        help="age after which to rotate the captured output",
+    )
+    parser.add_argument(
+        "-A",
+        "--archive",
+        action="store_true",
+        help="compress rotated logs and delete them after the retention period",
+    )
+    parser.add_argument(
+        "-r",
+        "--retention",
+        type=float,
+        default=14,
+        metavar="days",
+        help="retention period of compressed logs",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        metavar="n",
+        help="parallel compression jobs",
+    )
+    parser.add_argument(
+        "-w",
+        "--update-timeout",
+        type=float,
+        default=600,
+        metavar="seconds",
+        help="time to wait for a running update to finish",
+    )
     parser.add_argument(
         "-d", "--debug", action="store_true", help="show debug messages"
     )
@@ -46,7 +139,6 @@ def main() -> int:
     args = get_args()
     basicConfig(level=DEBUG if args.debug else WARNING if args.quiet else INFO)
     servers = load_servers(args.servers_file)
-    env = None
 
     try:
         server = servers[args.server]
@@ -54,12 +146,73 @@ def main() -> int:
         LOGGER.error("No such server: %s", args.server)
         return 2
 
-    if server.update_lockfile.exists():
-        LOGGER.error("Server is currently updating.")
+    if args.fork and (args.supervise or args.log_dir or args.archive):
+        LOGGER.error("Cannot fork a supervised server or capture its logs.")
+        return 1
+
+    with ExitStack() as stack:
+        capture = None
+
+        if args.log_dir is not None:
+            capture = stack.enter_context(
+                LogCapture(
+                    RotatingLog(
+                        args.log_dir / f"{server.name}.log",
+                        max_bytes=args.log_size * 1024 * 1024,
+                        max_age=args.log_age * 3600,
+                    )
+                )
+            )
+
+        if args.archive:
+            archiver = LogArchiver(
+                filter(None, [server.profiles_dir, args.log_dir]),
+                retention=args.retention * 86400,
+                jobs=args.jobs,
+            )
+            archiver.start()
+            stack.callback(archiver.stop)
+
+        return run(args, server, place(servers.pinned()).get(server.name), capture)
+
+
+def run(
+    args: Namespace,
+    server: Server,
+    placement: Placement | None,
+    capture: LogCapture | None,
+) -> int:
+    """Runs the server."""
+
+    if args.supervise:
+        from dzdsu.supervisor import Supervisor
+
+        return Supervisor(
+            server,
+            poll_interval=args.poll_interval,
+            settle=args.settle,
+            countdown=args.countdown,
+            max_backoff=args.max_backoff,
+            placement=placement,
+            capture=capture,
+        ).run()
+
+    try:
+        with LockFile(
+            server.update_lockfile.file,
+            "Server start.",
+            shared=True,
+            timeout=args.update_timeout,
+        ):
+            server.update_hashes()
+            proc = (Popen if capture is None else capture.popen)(
+                server.command, cwd=server.base_dir
+            )
+    except TimeoutError as error:
+        LOGGER.error("Server is currently updating: %s", error)
         return 3
 
-    server.update_hashes()
-    proc = Popen(server.command, cwd=server.base_dir, env=env)
+    apply_scheduling(proc.pid, server.scheduling, placement)
 
     if args.fork:
         return 0
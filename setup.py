@@ -11,9 +11,15 @@ setup(
     author_email="mail@richard-neumann.de",
     install_requires=["psutil", "rcon"],
     python_requires=">=3.10",
-    packages=["dzdsu", "dzdsu.utility"],
+    packages=["dzdsu", "dzdsu.benchmark", "dzdsu.emulator", "dzdsu.utility"],
     entry_points={
-        "console_scripts": ["dzdsu = dzdsu.utility:main", "dzdsw = dzdsu.wrapper:main"]
+        "console_scripts": [
+            "dzdsb = dzdsu.benchmark:main",
+            "dzdsm = dzdsu.metrics:main",
+            "dzdsu = dzdsu.utility:main",
+            "dzdsud = dzdsu.daemon:main",
+            "dzdsw = dzdsu.wrapper:main",
+        ]
     },
     url="https://github.com/conqp/dzdsu",
     license="GPLv3",
@@ -0,0 +1,76 @@
+"""Tests of the admin log index."""
+
+from datetime import date, datetime
+
+from dzdsu.admlog import AdmIndex, parse_adm_line
+
+DAY = date(2024, 5, 1)
+LOG = """AdminLog started on 2024-05-01 at 10:00:00
+10:01:00 | Player "Alice" (id=AbC123= pos=<1.0, 2.0, 3.0>) is connected
+10:02:00 | Player "Bob" (id=XyZ789= pos=<4.0, 5.0, 6.0>) is connected
+10:03:00 | Player "Bob" (DEAD) (id=XyZ789= pos=<4.0, 5.0, 6.0>) killed by Player "Alice" (id=AbC123= pos=<1.0, 2.0, 3.0>) with M4A1 from 20 meters
+"""
+DISCONNECT = '10:04:00 | Player "Alice"(id=AbC123=) has been disconnected\n'
+
+
+def test_parse_adm_line():
+    kill = parse_adm_line(LOG.splitlines()[3], DAY)
+
+    assert kill.time == datetime(2024, 5, 1, 10, 3)
+    assert kill.kind == "kill"
+    assert (kill.guid, kill.name) == ("XyZ789", "Bob")
+    assert (kill.other_guid, kill.other_name) == ("AbC123", "Alice")
+    assert parse_adm_line(DISCONNECT, DAY).kind == "disconnect"
+    assert parse_adm_line("10:05:00 | Chat message", DAY) is None
+    assert parse_adm_line("Invalid", DAY) is None
+
+
+def test_incremental_update(tmp_path):
+    (log := tmp_path / "DayZServer_x64.ADM").write_text(LOG)
+
+    with AdmIndex(tmp_path / "index.sqlite") as index:
+        assert index.update(tmp_path) == 3
+        assert index.update(tmp_path) == 0
+
+        with log.open("a") as file:
+            file.write(DISCONNECT + "10:05:00 | Player")
+
+        assert index.update(tmp_path) == 1
+        assert index.connection.execute(
+            "SELECT inode, offset FROM files WHERE path = ?", (str(log),)
+        ).fetchone() == (log.stat().st_ino, len(LOG) + len(DISCONNECT))
+
+    with AdmIndex(tmp_path / "index.sqlite") as index:
+        assert index.update(tmp_path) == 0
+        assert [
+            (session.name, session.disconnected) for session in index.sessions()
+        ] == [("Alice", datetime(2024, 5, 1, 10, 4)), ("Bob", None)]
+
+
+def test_padded_guid_lookup(tmp_path):
+    (tmp_path / "DayZServer_x64.ADM").write_text(LOG)
+
+    with AdmIndex(tmp_path / "index.sqlite") as index:
+        index.update(tmp_path)
+
+        assert [session.name for session in index.sessions("AbC123=")] == ["Alice"]
+        assert [event.kind for event in index.events("XyZ789=")] == ["connect", "kill"]
+
+
+def test_replaced_log_is_not_indexed_twice(tmp_path):
+    (log := tmp_path / "DayZServer_x64.ADM").write_text(LOG)
+
+    with AdmIndex(tmp_path / "index.sqlite") as index:
+        index.update(tmp_path)
+        (copy := tmp_path / "copy").write_text(LOG + DISCONNECT)
+        copy.replace(log)
+
+        assert index.update(tmp_path) == 1
+
+        log.write_text(LOG)
+
+        assert index.update(tmp_path) == 0
+        assert len(list(index.events())) == 4
+        assert [
+            (session.name, session.disconnected) for session in index.sessions()
+        ] == [("Alice", datetime(2024, 5, 1, 10, 4)), ("Bob", None)]
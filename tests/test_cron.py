@@ -0,0 +1,52 @@
+"""Tests of the cron-like restart schedules."""
+
+from datetime import datetime
+
+import pytest
+
+from dzdsu.cron import CronExpression, RestartSchedule
+
+
+@pytest.mark.parametrize(
+    "text, after, expected",
+    [
+        ("0 */6 * * *", datetime(2024, 5, 1, 5, 59), datetime(2024, 5, 1, 6, 0)),
+        ("0 */6 * * *", datetime(2024, 5, 1, 6, 0), datetime(2024, 5, 1, 12, 0)),
+        ("0 */6 * * *", datetime(2024, 5, 1, 18, 1), datetime(2024, 5, 2, 0, 0)),
+        ("30 4 * * *", datetime(2024, 5, 1, 4, 29, 59), datetime(2024, 5, 1, 4, 30)),
+        ("15,45 * * * *", datetime(2024, 5, 1, 10, 20), datetime(2024, 5, 1, 10, 45)),
+        ("0 0 29 2 *", datetime(2024, 3, 1), datetime(2028, 2, 29)),
+        ("0 3 * * 7", datetime(2024, 5, 1), datetime(2024, 5, 5, 3, 0)),
+        ("0 3 * * 1-5", datetime(2024, 5, 4), datetime(2024, 5, 6, 3, 0)),
+        ("@daily", datetime(2024, 12, 31, 23, 59), datetime(2025, 1, 1)),
+    ],
+)
+def test_next(text, after, expected):
+    assert CronExpression.parse(text).next(after) == expected
+
+
+def test_day_and_weekday_match_either():
+    cron = CronExpression.parse("0 0 13 * 5")
+
+    assert cron.next(datetime(2024, 9, 1)) == datetime(2024, 9, 6)
+    assert cron.next(datetime(2024, 9, 6)) == datetime(2024, 9, 13)
+
+
+@pytest.mark.parametrize(
+    "text", ["* * * *", "60 * * * *", "* 24 * * *", "5-1 * * * *", "*/0 * * * *"]
+)
+def test_invalid(text):
+    with pytest.raises(ValueError):
+        CronExpression.parse(text)
+
+
+def test_never_fires():
+    with pytest.raises(ValueError):
+        CronExpression.parse("0 0 31 2 *").next(datetime(2024, 1, 1))
+
+
+def test_schedule_sorts_warnings():
+    schedule = RestartSchedule.from_json({"cron": "@hourly", "warnings": [60, 300, 60]})
+
+    assert schedule.warnings == (300, 60)
+    assert schedule.message is None
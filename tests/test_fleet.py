@@ -0,0 +1,44 @@
+"""Tests of operations on several servers."""
+
+from os import name
+
+import pytest
+
+from dzdsu.registry import ServerRegistry
+from dzdsu.utility import update
+from dzdsu.utility.argparse import get_args
+from dzdsu.utility.fleet import manage_fleet, select_servers
+
+SERVERS = {
+    "alpha": {"basedir": "/srv/alpha", "mods": [1]},
+    "alpha-test": {"basedir": "/srv/alpha-test", "mods": [1, 2]},
+    "beta": {"basedir": "/srv/beta", "mods": [2]},
+}
+
+
+def test_select_servers():
+    servers = ServerRegistry(SERVERS)
+
+    assert [server.name for server in select_servers(servers, ["beta", "alpha*"])] == [
+        "alpha",
+        "alpha-test",
+        "beta",
+    ]
+    assert len(select_servers(servers, [], every=True)) == 3
+
+    with pytest.raises(KeyError):
+        select_servers(servers, ["gamma"])
+
+
+@pytest.mark.skipif(name != "posix", reason="Shared mod updates require POSIX.")
+def test_shared_mod_update(monkeypatch):
+    servers = list(ServerRegistry(SERVERS).values())
+    updates = []
+    monkeypatch.setattr(
+        update, "update_mods", lambda servers, args: updates.append(servers)
+    )
+    monkeypatch.setattr(update, "update", lambda server, args: updates.append(server))
+    args = get_args("", ["alpha", "beta", "-U", "steam", "-m"])
+
+    assert manage_fleet(servers, args) == 0
+    assert updates == [servers]
@@ -0,0 +1,81 @@
+"""Tests of the update journal."""
+
+from json import dumps, loads
+from time import time
+
+from dzdsu import steamcmd
+from dzdsu.journal import UpdateJournal
+from dzdsu.steamcmd import Event, ItemResult, Transcript, download
+
+
+def record(journal: UpdateJournal, item: int, success: bool) -> None:
+    """Records the outcome of a workshop item."""
+
+    if success:
+        journal.record(Event("success", item, 0))
+    else:
+        journal.record(Event("failure", item, 0, reason="Failure"))
+
+
+def test_resume(tmp_path):
+    journal = UpdateJournal(file := tmp_path / "journal.json", [1, 2, 3])
+    record(journal, 1, True)
+    record(journal, 2, False)
+    record(journal, 2, False)
+    resumed = UpdateJournal(file, [3, 2, 1]).load()
+
+    assert resumed.pending([1, 2, 3]) == [2, 3]
+    assert resumed.entries[2].attempts == 2
+    assert resumed.entries[2].reason == "Failure"
+
+
+def test_progress_is_not_recorded(tmp_path):
+    journal = UpdateJournal(file := tmp_path / "journal.json", [1])
+    journal.record(Event("start", 1, 0))
+
+    assert not journal.entries
+    assert not file.exists()
+
+
+def test_other_job_is_ignored(tmp_path):
+    record(UpdateJournal(file := tmp_path / "journal.json", [1, 2]), 1, True)
+
+    assert not UpdateJournal(file, [1, 3]).load().entries
+    assert not UpdateJournal(file, [1, 2], 223350).load().entries
+    assert UpdateJournal(file, [1, 2]).load().done(1)
+
+
+def test_outdated_journal_is_ignored(tmp_path):
+    record(UpdateJournal(file := tmp_path / "journal.json", [1]), 1, True)
+    json = loads(file.read_text())
+    json["created"] = time() - 3600
+    file.write_text(dumps(json))
+
+    assert UpdateJournal(file, [1]).load().done(1)
+    assert not UpdateJournal(file, [1], max_age=60).load().entries
+
+
+def test_invalid_journal_is_ignored(tmp_path):
+    (file := tmp_path / "journal.json").write_text("{")
+
+    assert not UpdateJournal(file, [1]).load().entries
+
+
+def test_download_skips_completed_items(tmp_path, monkeypatch):
+    record(UpdateJournal(file := tmp_path / "journal.json", [1, 2]), 1, True)
+    sessions = []
+
+    def run_steamcmd(command, *, app_id, stall_timeout, activity, listener):
+        listener(Event("success", 2, 0))
+        return Transcript(0, {2: ItemResult(2, True, None)})
+
+    monkeypatch.setattr(steamcmd, "run_steamcmd", run_steamcmd)
+    transcript = download(
+        lambda items, app: sessions.append(items) or [],
+        [1, 2],
+        journal=UpdateJournal(file, [1, 2]).load(),
+    )
+
+    assert sessions == [[2]]
+    assert transcript.success
+    assert not file.exists()
@@ -0,0 +1,64 @@
+"""Tests of the inter-process lock."""
+
+from os import getpid
+from threading import Timer
+
+import pytest
+
+from dzdsu.lockfile import Holder, LockFile
+
+
+def test_exclusive(tmp_path):
+    file = tmp_path / "lock"
+
+    with LockFile(file, "Server update.") as lock:
+        other = LockFile(file)
+
+        assert other.locked
+        assert other.holder.pid == getpid()
+        assert other.holder.reason == "Server update."
+        assert not other.acquire(timeout=0.1)
+
+        with pytest.raises(TimeoutError, match=f"PID {getpid()}"):
+            with LockFile(file, timeout=0):
+                pass
+
+    assert not lock.locked
+    assert lock.holder is None
+
+
+def test_shared(tmp_path):
+    file = tmp_path / "lock"
+
+    with LockFile(file, shared=True), LockFile(file, shared=True):
+        assert not LockFile(file).acquire(timeout=0)
+
+    assert LockFile(file).acquire(timeout=0)
+
+
+def test_waiters_wake_up_on_release(tmp_path):
+    (lock := LockFile(file := tmp_path / "lock")).acquire()
+    Timer(0.2, lock.release).start()
+
+    assert LockFile(file).wait(timeout=5)
+    assert LockFile(file).acquire(timeout=5)
+
+
+def test_wait_times_out(tmp_path):
+    with LockFile(file := tmp_path / "lock"):
+        assert not LockFile(file).wait(timeout=0.1)
+
+
+def test_stale_holder_is_ignored(tmp_path):
+    holder = Holder(getpid(), 0.0, 0.0, "Crashed.")
+    (file := tmp_path / "lock").write_text(holder.to_text())
+
+    assert Holder.from_text(holder.to_text()) == holder
+    assert not holder.alive
+    assert LockFile(file).holder is None
+    assert not LockFile(file).locked
+
+
+def test_invalid_holder(tmp_path):
+    assert Holder.from_text("") is None
+    assert Holder.from_text("pid\n0\n0\nreason\n") is None
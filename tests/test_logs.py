@@ -0,0 +1,36 @@
+"""Tests of the log archiver."""
+
+from gzip import decompress
+from os import utime
+from time import time
+
+from dzdsu.logs import LogArchiver
+
+
+def touch(file, age: float, content: bytes = b"") -> None:
+    """Creates a file that was last modified age seconds ago."""
+
+    file.write_bytes(content)
+    utime(file, (mtime := time() - age, mtime))
+
+
+def test_archive(tmp_path):
+    touch(tmp_path / "DayZServer_x64_2024-05-01_10-00-00.RPT", 3600, b"old")
+    touch(tmp_path / "DayZServer_x64_2024-05-02_10-00-00.RPT", 3600, b"current")
+    touch(tmp_path / "DayZServer_x64_2024-04-01_10-00-00.ADM.gz", 30 * 86400)
+    touch(tmp_path / "backup.tar.gz", 30 * 86400)
+    touch(tmp_path / "mod_data.gz", 30 * 86400)
+
+    assert LogArchiver([tmp_path]).archive() == (1, 1)
+    assert sorted(file.name for file in tmp_path.iterdir()) == [
+        "DayZServer_x64_2024-05-01_10-00-00.RPT.gz",
+        "DayZServer_x64_2024-05-02_10-00-00.RPT",
+        "backup.tar.gz",
+        "mod_data.gz",
+    ]
+    assert (
+        decompress(
+            (tmp_path / "DayZServer_x64_2024-05-01_10-00-00.RPT.gz").read_bytes()
+        )
+        == b"old"
+    )
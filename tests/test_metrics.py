@@ -0,0 +1,44 @@
+"""Tests of the resource metrics exporter."""
+
+from os import getppid
+
+from psutil import Process
+
+from dzdsu.metrics import MetricsCollector
+
+
+class FakeServer:
+    """A server whose process can be replaced."""
+
+    def __init__(self, name: str, process: Process | None):
+        self.name = name
+        self.process = process
+
+
+def test_exposition():
+    collector = MetricsCollector(
+        [FakeServer("running", Process()), FakeServer("stopped", None)]
+    )
+    collector.sample()
+    collector.sample()
+    exposition = collector.exposition()
+
+    assert 'dzdsu_up{server="running"} 1' in exposition
+    assert 'dzdsu_up{server="stopped"} 0' in exposition
+    assert 'dzdsu_cpu_usage_peak_ratio{server="running"}' in exposition
+    assert 'dzdsu_resident_memory_peak_bytes{server="running"}' in exposition
+    assert len(collector.samples["running"]) == 2
+
+
+def test_samples_are_cleared_when_the_process_is_replaced():
+    collector = MetricsCollector([server := FakeServer("test", Process())])
+    collector.sample()
+    collector.sample()
+
+    # The process exited and the server was started again.
+    collector.processes["test"] = None
+    server.process = Process(getppid())
+    collector.sample()
+
+    assert len(collector.samples["test"]) == 1
+    assert collector.processes["test"].pid == getppid()
@@ -0,0 +1,108 @@
+"""Tests of the config file parsers."""
+
+from os import utime
+
+import pytest
+
+from dzdsu.battleye import resolve_battleye_cfg
+from dzdsu.parsers import CfgSyntaxError, load_server_cfg, parse_battleye_cfg
+from dzdsu.parsers import parse_server_cfg, parse_server_cfg_lenient
+
+SERVER_CFG = """\
+hostname = "My ""DayZ"" Server";  // The name
+password = "";
+maxPlayers = 60;
+verifySignatures = 2;
+/* Multi-line
+   comment */
+#include "extra.cfg"
+    #define DEBUG
+guaranteedUpdates=1
+;
+timeStampFormat = Short;
+lightingConfig = -1;
+serverTimeAcceleration = 0.5;
+motd[] = {"Welcome", "Have fun"};
+motd[] += {"Bye"};
+class Missions
+{
+    class DayZ
+    {
+        template = "dayzOffline.chernarusplus";
+    };
+};
+"""
+
+
+def test_server_cfg():
+    config = parse_server_cfg(SERVER_CFG)
+
+    assert config["hostname"] == 'My "DayZ" Server'
+    assert config.getint("MAXPLAYERS") == 60
+    assert config["guaranteedUpdates"] == 1
+    assert config["timeStampFormat"] == "Short"
+    assert config["lightingConfig"] == -1
+    assert config.getfloat("serverTimeAcceleration") == 0.5
+    assert config["motd"] == ("Welcome", "Have fun", "Bye")
+    assert config["Missions"]["DayZ"]["template"] == "dayzOffline.chernarusplus"
+    assert config.get("missing", 42) == 42
+
+
+@pytest.mark.parametrize(
+    "text, line",
+    [
+        ("maxPlayers = ;", 1),
+        ("hostname = 'x';", 1),
+        ('maxPlayers = 60;\nhostname = "x" #include;', 2),
+        ("class Missions {\n", 1),
+        ("motd[] = {1, 2;", 1),
+    ],
+)
+def test_syntax_error(text, line):
+    with pytest.raises(CfgSyntaxError) as error:
+        parse_server_cfg(text)
+
+    assert error.value.line == line
+
+
+def test_lenient():
+    config = parse_server_cfg_lenient(
+        ['hostname = "x"; // comment\n', "maxPlayers = 60;\n", "broken = {\n"]
+    )
+
+    assert config["hostname"] == "x"
+    assert config.getint("maxPlayers") == 60
+    assert "broken" not in config
+
+
+def test_load_server_cfg_is_cached(tmp_path):
+    (file := tmp_path / "serverDZ.cfg").write_text("maxPlayers = 60;\n")
+    config = load_server_cfg(file)
+
+    assert load_server_cfg(file) is config
+
+    file.write_text("maxPlayers = 100;\n")
+
+    assert load_server_cfg(file).getint("maxPlayers") == 100
+
+
+def test_battleye_cfg():
+    assert dict(
+        parse_battleye_cfg(
+            ["# comment\n", "RConPassword secret\n", "RConPort 2306\n", "\n"]
+        )
+    ) == {"RConPassword": "secret", "RConPort": 2306}
+
+
+def test_resolve_battleye_cfg_follows_rewritten_files(tmp_path):
+    (tmp_path / "beserver_x64.cfg").write_text("RConPassword old\n")
+    (first := tmp_path / "beserver_x64_active_1.cfg").write_text("RConPassword a\n")
+    (second := tmp_path / "beserver_x64_active_2.cfg").write_text("RConPassword b\n")
+    utime(first, ns=(1, 1))
+
+    assert resolve_battleye_cfg(tmp_path) == second
+
+    # Rewriting a file in place does not change the directory's mtime.
+    first.write_text("RConPassword new\n")
+
+    assert resolve_battleye_cfg(tmp_path) == first
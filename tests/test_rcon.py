@@ -0,0 +1,90 @@
+"""Tests of the RCon client and of sessions against the BattlEye emulator."""
+
+from asyncio import run, sleep
+
+import pytest
+from rcon.battleye.proto import Header
+from rcon.exceptions import WrongPassword
+
+from dzdsu.aiorcon import AsyncClient
+from dzdsu.benchmark.rcon import make_server
+from dzdsu.emulator import BattlEyeEmulator
+from dzdsu.server import Server
+
+PASSWD = "secret"
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    """Records the RCon clients created by servers."""
+
+    clients = []
+    async_rcon = Server.async_rcon
+
+    def record(self, *args, **kwargs):
+        clients.append(client := async_rcon(self, *args, **kwargs))
+        return client
+
+    monkeypatch.setattr(Server, "async_rcon", record)
+    return clients
+
+
+async def session(server: Server, emulator: BattlEyeEmulator, passwd: str) -> str:
+    """Runs a command in an RCon session with the given password."""
+
+    await emulator.start()
+    (server.battleye_dir / "beserver_x64.cfg").write_text(
+        f"RConPassword {passwd}\nRConIP 127.0.0.1\nRConPort {emulator.port}\n"
+    )
+
+    try:
+        async with server.rcon_session(retries=1, backoff=0) as rcon:
+            return await rcon.run("players")
+    finally:
+        emulator.close()
+
+
+def test_session(tmp_path, clients):
+    emulator = BattlEyeEmulator(PASSWD, max_players=10, seed=0)
+    emulator.populate(3)
+    players = run(session(make_server(tmp_path, 10), emulator, PASSWD))
+
+    assert "(3 players in total)" in players
+    assert len(clients) == 1
+    assert not clients[0].connected
+
+
+def test_wrong_password_closes_session(tmp_path, clients):
+    emulator = BattlEyeEmulator(PASSWD, max_players=10, seed=0)
+
+    with pytest.raises(WrongPassword):
+        run(session(make_server(tmp_path, 10), emulator, "wrong"))
+
+    assert len(clients) == 1
+    assert not clients[0].connected
+
+
+def test_message_on_closed_session():
+    client = AsyncClient("127.0.0.1", 2302, message_handler=(messages := []).append)
+    payload = b"\x00Server restart."
+    client.datagram_received(bytes(Header.create(0x02, payload)) + payload)
+
+    assert messages == ["Server restart."]
+
+
+def test_kick_all_waits_for_all_kicks():
+    client, kicked = AsyncClient("127.0.0.1", 2302), []
+
+    async def kick(player, reason=None):
+        await sleep(0.01 * player)
+        kicked.append(player)
+
+        if player < 2:
+            raise TimeoutError(f"Player {player} was not kicked.")
+
+    client.kick = kick
+
+    with pytest.raises(TimeoutError, match="Player 0"):
+        run(client.kick_all(4))
+
+    assert kicked == [0, 1, 2, 3]
@@ -0,0 +1,54 @@
+"""Tests of the server registry."""
+
+from json import dumps
+
+import pytest
+
+from dzdsu import server
+from dzdsu.registry import ServerRegistry, load_servers, validate_servers_json
+
+SERVERS = {
+    "alpha": {"basedir": "/srv/alpha", "mods": [1559212036]},
+    "beta": {"basedir": "/srv/beta", "params": {"cpuCount": 2}},
+}
+
+
+def test_load_servers(tmp_path):
+    (file := tmp_path / "servers.json").write_text(dumps(SERVERS))
+    cache_dir = tmp_path / "cache"
+    registry = load_servers(file, cache_dir=cache_dir)
+
+    assert list(registry) == ["alpha", "beta"]
+    assert not registry._servers
+    assert registry["alpha"].base_dir.name == "alpha"
+    assert list(registry._servers) == ["alpha"]
+    assert any(cache_dir.iterdir())
+    assert load_servers(file, cache_dir=cache_dir).json == SERVERS
+
+
+def test_load_servers_is_reexported():
+    assert server.load_servers is load_servers
+
+
+def test_pinned():
+    registry = ServerRegistry(
+        {**SERVERS, "gamma": {**SERVERS["beta"], "scheduling": {"pin": True}}}
+    )
+
+    assert [server.name for server in registry.pinned()] == ["gamma"]
+    assert list(registry._servers) == ["gamma"]
+
+
+@pytest.mark.parametrize(
+    "json",
+    [
+        [],
+        {"alpha": {}},
+        {"alpha": {"basedir": "/srv/alpha", "mods": [True]}},
+        {"alpha": {"basedir": "/srv/alpha", "scheduling": {"pin": 1}}},
+        {"alpha": {"basedir": "/srv/alpha", "restarts": [{"cron": "* *"}]}},
+    ],
+)
+def test_invalid(json):
+    with pytest.raises(ValueError):
+        validate_servers_json(json)
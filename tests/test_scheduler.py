@@ -0,0 +1,54 @@
+"""Tests of the restart scheduler."""
+
+from asyncio import run
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from rcon.exceptions import WrongPassword
+
+from dzdsu.cron import RestartSchedule
+from dzdsu.scheduler import RestartScheduler, Timer
+from dzdsu.server import Server
+
+
+class FakeServer:
+    """A server whose RCon session fails to log in."""
+
+    name = "test"
+
+    @asynccontextmanager
+    async def rcon_session(self):
+        raise WrongPassword()
+        yield
+
+
+def timer(message: str | None = None) -> Timer:
+    """Returns a warning timer of a fake server."""
+
+    schedule = RestartSchedule.from_json({"cron": "@hourly", "message": message})
+    return Timer(0, 0, FakeServer(), schedule, datetime(2024, 5, 1), 300)
+
+
+def test_schedule():
+    server = Server.from_json(
+        "test", {"basedir": "/srv/test", "restarts": [{"cron": "0 */6 * * *"}]}
+    )
+    scheduler = RestartScheduler([server])
+    restart = scheduler.schedule(
+        server, server.restarts[0], datetime(2024, 5, 1, 5, 50)
+    )
+
+    assert restart == datetime(2024, 5, 1, 6)
+    assert [timer.remaining for timer in sorted(scheduler.timers)] == [300, 60, 0]
+
+
+def test_wrong_password_is_logged(caplog):
+    run(RestartScheduler([]).fire(timer()))
+
+    assert "test: Could not send warning" in caplog.text
+
+
+def test_invalid_message_is_logged(caplog):
+    run(RestartScheduler([]).fire(timer("Restart in {minutes}")))
+
+    assert "test: Invalid restart message" in caplog.text
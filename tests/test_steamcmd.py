@@ -0,0 +1,213 @@
+"""Tests of the steamcmd output parser and downloads."""
+
+import sys
+from itertools import count
+from pathlib import Path
+
+import pytest
+
+from dzdsu import steamcmd
+from dzdsu.steamcmd import ItemResult, SteamCmdParser, Transcript, download
+from dzdsu.constants import DOWNLOADS_DIR
+from dzdsu.steamcmd import run_steamcmd, workshop_activity
+
+TRANSCRIPTS = Path(__file__).parent / "transcripts"
+DAYZ_SERVER = 223350
+
+
+def lines(name: str) -> list[str]:
+    """Returns the lines of a recorded transcript."""
+
+    return (TRANSCRIPTS / name).read_text(encoding="utf-8").splitlines()
+
+
+def parser() -> SteamCmdParser:
+    """Returns a parser whose clock advances by one second per line."""
+
+    return SteamCmdParser(clock=count().__next__)
+
+
+def test_workshop_success():
+    events = (parse := parser()).parse(lines("workshop_success.txt"))
+
+    assert [(event.kind, event.item) for event in events] == [
+        ("start", 1559212036),
+        ("success", 1559212036),
+        ("start", 1564026768),
+        ("success", 1564026768),
+    ]
+    assert parse.results == {
+        1559212036: ItemResult(1559212036, True, 1, True, 41812941),
+        1564026768: ItemResult(1564026768, True, 1, True, 5233210),
+    }
+    assert parse.current is None
+
+
+def test_workshop_failure_and_timeout():
+    (parse := parser()).parse(lines("workshop_failure.txt"))
+    transcript = Transcript(0, parse.results)
+
+    assert parse.results[1559212036].success
+    assert parse.results[1564026768].reason == "Failure"
+    assert parse.results[1828439124].reason == "Timeout"
+    assert transcript.failed == [1564026768, 1828439124]
+    assert not transcript.success
+
+
+def test_app_progress_and_success():
+    (parse := parser()).expect_app(DAYZ_SERVER)
+    events = parse.parse(lines("app_update.txt"))
+
+    assert [event.kind for event in events] == ["progress"] * 4 + ["success"]
+    assert not any(event.workshop for event in events)
+    assert events[1].reason == "downloading"
+    assert (events[1].bytes, events[1].total) == (262144000, 2097152000)
+    assert events[3].reason == "verifying update"
+    assert parse.results[DAYZ_SERVER].success
+    assert Transcript(0, parse.results).failed == []
+
+
+def test_app_failure():
+    (parse := parser()).expect_app(DAYZ_SERVER)
+    events = parse.parse(lines("app_failure.txt"))
+
+    assert events[-1].kind == "failure"
+    assert parse.results[DAYZ_SERVER].reason == "state is 0x202 after update job."
+
+
+def test_app_progress_is_ignored_unless_expected():
+    events = parser().parse(lines("app_update.txt"))
+
+    assert [(event.kind, event.item) for event in events] == [("success", DAYZ_SERVER)]
+
+
+def test_stall_fails_current_item():
+    parse = parser()
+    parse.feed("Downloading item 1559212036 ...")
+    event = parse.stall()
+
+    assert (event.kind, event.item, event.reason) == ("failure", 1559212036, "Stalled")
+    assert parse.stall() is None
+
+
+def test_run_steamcmd_streams_output():
+    script = f"print(open({str(TRANSCRIPTS / 'workshop_failure.txt')!r}).read())"
+    events = []
+    transcript = run_steamcmd(
+        [sys.executable, "-c", script], listener=events.append, echo=False
+    )
+
+    assert transcript.returncode == 0
+    assert not transcript.stalled
+    assert transcript.failed == [1564026768, 1828439124]
+    assert len(events) == 6
+
+
+def test_run_steamcmd_kills_stalled_session():
+    script = (
+        "import sys, time;"
+        "print('Downloading item 1559212036 ...', flush=True);"
+        "time.sleep(60)"
+    )
+    transcript = run_steamcmd(
+        [sys.executable, "-c", script], stall_timeout=0.5, echo=False
+    )
+
+    assert transcript.stalled
+    assert transcript.results[1559212036].reason == "Stalled"
+    assert not transcript.success
+
+
+def test_silent_download_is_not_stalled(tmp_path):
+    (tmp_path / "item").touch()
+    script = (
+        "import sys, time;"
+        "print('Downloading item 1559212036 ...', flush=True);"
+        f"file = open({str(tmp_path / 'item')!r}, 'ab');"
+        "[(file.write(b'x'), file.flush(), time.sleep(0.1)) for _ in range(15)];"
+        "print('Success. Downloaded item 1559212036 to \"x\" (15 bytes)')"
+    )
+    transcript = run_steamcmd(
+        [sys.executable, "-c", script],
+        stall_timeout=0.5,
+        activity=lambda: (tmp_path / "item").stat().st_size,
+        echo=False,
+    )
+
+    assert not transcript.stalled
+    assert transcript.success
+
+
+def test_workshop_activity(tmp_path):
+    assert workshop_activity(tmp_path) == (0, 0)
+
+    (downloads := tmp_path / DOWNLOADS_DIR / "1559212036").mkdir(parents=True)
+    (downloads / "chunk").write_bytes(b"x" * 10)
+    size, mtime = workshop_activity(tmp_path)
+
+    assert size == 10
+    assert mtime == (downloads / "chunk").stat().st_mtime_ns
+
+
+class FakeSteamCmd:
+    """Simulates steamcmd sessions by feeding their output to a parser.
+
+    Each session fails the items listed for it and downloads the others.
+    """
+
+    def __init__(self, failures: list[set[int]]):
+        self.failures = failures
+        self.sessions: list[tuple[list[int], bool]] = []
+
+    def command(self, items: list[int], app: bool) -> list[str]:
+        self.sessions.append((items, app))
+        return [str(item) for item in items]
+
+    def __call__(
+        self, command, *, app_id=None, stall_timeout=None, activity=None, listener=None
+    ):
+        failures = self.failures[len(self.sessions) - 1]
+        parse = parser()
+
+        for item in map(int, command):
+            parse.feed(f"Downloading item {item} ...")
+
+            if item in failures:
+                line = f"ERROR! Download item {item} failed (Failure)."
+            else:
+                line = f'Success. Downloaded item {item} to "x" (1 bytes)'
+
+            listener(parse.feed(line))
+
+        return Transcript(0, parse.results)
+
+
+@pytest.fixture
+def fake_steamcmd(monkeypatch):
+    """Returns a factory of fake steamcmd sessions."""
+
+    def factory(*failures: set[int]) -> FakeSteamCmd:
+        monkeypatch.setattr(steamcmd, "run_steamcmd", fake := FakeSteamCmd(failures))
+        monkeypatch.setattr(steamcmd, "sleep", lambda _: None)
+        return fake
+
+    return factory
+
+
+def test_download_retries_only_failed_items(fake_steamcmd):
+    fake = fake_steamcmd({2, 3}, {3}, set())
+    transcript = download(fake.command, [1, 2, 3, 4], retries=2)
+
+    assert fake.sessions == [([1, 2, 3, 4], False), ([2, 3], False), ([3], False)]
+    assert transcript.success
+    assert sorted(transcript.results) == [1, 2, 3, 4]
+
+
+def test_download_gives_up_after_retries(fake_steamcmd):
+    fake = fake_steamcmd({2}, {2})
+    transcript = download(fake.command, [1, 2], retries=1)
+
+    assert fake.sessions == [([1, 2], False), ([2], False)]
+    assert not transcript.success
+    assert transcript.failed == [2]
+    assert transcript.returncode == 1